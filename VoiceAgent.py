@@ -1,42 +1,37 @@
 import streamlit as st
-import speech_recognition as sr
-import pyttsx3
 import requests
 import os
 from dotenv import load_dotenv
-import threading
-import time
-from io import BytesIO
-import tempfile
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-try:
-    from langdetect import detect
-    LANGDETECT_AVAILABLE = True
-except ImportError:
-    print("Warning: langdetect not available. Using fallback language detection.")
-    LANGDETECT_AVAILABLE = False
-import re
-from collections import Counter
-from gtts import gTTS
-import pygame
-import base64
-from collections import defaultdict
-import math
-import numpy as np
-
-# Initialize pygame mixer with error handling
-try:
-    pygame.mixer.init()
-    PYGAME_AVAILABLE = True
-except Exception as e:
-    PYGAME_AVAILABLE = False
-    # Only print warning once
-    if not hasattr(st.session_state, 'pygame_warning_shown'):
-        st.warning("Pygame audio not available. Using alternative audio playback.")
-        st.session_state.pygame_warning_shown = True
+import time
+import uuid
+from conversation_history import ConversationLog
+from conversation_memory import ConversationMemory
+from conversation_store import get_conversation_store
+from coordination import TTS_CACHE_TTL, cache_key, get_coordinator
+from prompt_audio import get_prompt_bundle
+from turn_scheduler import INTERACTIVE, NOTIFY, PERIODIC, PRIORITY_NAMES, SUMMARY, WorkShed, get_scheduler
+from language_detection import detect_language, detect_segments, merge_short_segments
+from language_prior import LanguagePrior
+from recognition_results import recognize_nbest
+from session_warmup import SessionWarmup, warmup_tasks
+from session_memory import compact_detection_details, get_session_memory
+from turn_profiler import get_turn_profiler, stage as profile_stage
+from speculative_prefetch import SpeculativePrefetcher, estimate_tokens
+from watsonx_client import build_summary_prompt, get_bearer_token, get_generation_stats
+from model_router import get_router
+from startup_profiler import lazy_import, start_rerun, finish_rerun, get_startup_report
+from language_registry import (
+    LANGUAGE_NAMES,
+    LANGUAGE_NAMES_EN,
+    LANGUAGE_OPTIONS,
+    SUPPORTED_LANGUAGES,
+)
+
+_rerun_started = start_rerun()
 
 # Load environment variables
 load_dotenv()
@@ -50,312 +45,19 @@ st.set_page_config(
 
 bot_name = "ava"
 
-# Script ranges for Indian languages
-SCRIPT_RANGES = {
-    'en': (0x0041, 0x007A),  # Latin (English)
-    'hi': (0x0900, 0x097F),  # Devanagari
-    'ta': (0x0B80, 0x0BFF),  # Tamil
-}
-
-# Common words and patterns for each language
-LANGUAGE_PATTERNS = {
-    'hi': {
-        'words': [
-            # Common verbs
-            'हैं', 'है', 'था', 'थी', 'थे', 'होगा', 'होगी', 'होंगे', 'करना', 'करेंगे', 'करूंगा', 'करेंगी',
-            'आना', 'जाना', 'खाना', 'पीना', 'सोना', 'उठना', 'बैठना', 'देखना', 'सुनना', 'बोलना',
-            'पढ़ना', 'लिखना', 'चलना', 'दौड़ना', 'हंसना', 'रोना', 'गाना', 'नाचना', 'खेलना', 'काम करना',
-            # Common pronouns
-            'मैं', 'हम', 'तुम', 'आप', 'वह', 'यह', 'वे', 'ये', 'मुझे', 'हमें', 'तुम्हें', 'आपको',
-            'मेरा', 'मेरी', 'मेरे', 'हमारा', 'हमारी', 'हमारे', 'तुम्हारा', 'तुम्हारी', 'तुम्हारे',
-            'आपका', 'आपकी', 'आपके', 'उसका', 'उसकी', 'उसके', 'इसका', 'इसकी', 'इसके',
-            # Common postpositions
-            'का', 'के', 'की', 'को', 'में', 'से', 'पर', 'तक', 'द्वारा', 'साथ', 'बिना', 'लिए',
-            'ऊपर', 'नीचे', 'आगे', 'पीछे', 'बीच', 'पास', 'दूर', 'अंदर', 'बाहर', 'सामने',
-            # Common conjunctions
-            'और', 'या', 'लेकिन', 'क्योंकि', 'अगर', 'तो', 'मगर', 'परंतु', 'इसलिए', 'कि',
-            'जब', 'जैसे', 'जितना', 'जहां', 'तब', 'वैसे', 'उतना', 'वहां', 'फिर', 'अभी',
-            # Common question words
-            'क्या', 'कौन', 'कहाँ', 'कब', 'कैसे', 'क्यों', 'कितना', 'कौन सा', 'किसका', 'किससे',
-            # Common adjectives
-            'अच्छा', 'बुरा', 'बड़ा', 'छोटा', 'नया', 'पुराना', 'ठंडा', 'गरम', 'सुंदर', 'बदसूरत',
-            'लंबा', 'छोटा', 'मोटा', 'पतला', 'तेज़', 'धीमा', 'ऊंचा', 'नीचा', 'रंगीन', 'सफ़ेद',
-            'काला', 'लाल', 'हरा', 'नीला', 'पीला', 'गुलाबी', 'भूरा', 'धूसर',
-            # Common adverbs
-            'बहुत', 'थोड़ा', 'ज्यादा', 'कम', 'अभी', 'फिर', 'भी', 'नहीं', 'हां', 'जी',
-            'कल', 'आज', 'कभी', 'हमेशा', 'जल्दी', 'देर', 'धीरे', 'तेज़ी', 'यहाँ', 'वहाँ',
-            # Numbers
-            'एक', 'दो', 'तीन', 'चार', 'पांच', 'छह', 'सात', 'आठ', 'नौ', 'दस',
-            'ग्यारह', 'बारह', 'तेरह', 'चौदह', 'पंद्रह', 'सोलह', 'सत्रह', 'अठारह', 'उन्नीस', 'बीस',
-            # Time expressions
-            'सुबह', 'दोपहर', 'शाम', 'रात', 'दिन', 'हफ्ता', 'महीना', 'साल', 'समय', 'घंटा',
-            # Common nouns
-            'घर', 'परिवार', 'माता', 'पिता', 'भाई', 'बहन', 'बच्चा', 'आदमी', 'औरत', 'लड़का', 'लड़की',
-            'पानी', 'खाना', 'रोटी', 'चावल', 'दूध', 'चाय', 'कॉफी', 'फल', 'सब्जी'
-        ],
-        'patterns': [
-            # Verb patterns - Present tense
-            r'[ता|ती|ते]\s+[हैं|है|हूं]',
-            r'[रहा|रही|रहे]\s+[हैं|है|हूं]',
-            r'[चुका|चुकी|चुके]\s+[हैं|है|हूं]',
-            # Verb patterns - Past tense
-            r'[आ|ई|ए]\s+[था|थी|थे]',
-            r'[करके|आकर|जाकर|देखकर]',
-            # Verb patterns - Future tense
-            r'[गा|गी|गे]',
-            r'[ऊंगा|ऊंगी|ेंगे|ेंगी]',
-            # Postposition patterns
-            r'[का|के|की|को|में|से|पर|तक]',
-            r'[द्वारा|साथ|बिना|लिए]',
-            r'[ऊपर|नीचे|आगे|पीछे|बीच|पास|दूर|अंदर|बाहर]',
-            # Question patterns
-            r'क्[या|यों|या]',
-            r'[कहाँ|कब|कैसे|क्यों|कितना|कौन]',
-            # Word ending patterns
-            r'[ने|से|को|में|पर|ता|ती|ते]$',
-            r'[गा|गी|गे|ना|नी|ने]$',
-            r'[वाला|वाली|वाले]$',
-            r'[इया|ियां|इयों]$',
-            # Honorific patterns
-            r'[जी|साहब|महोदय|श्रीमान|श्रीमती]',
-            # Conjunctive particles
-            r'[भी|तो|ही|तक|सिर्फ|केवल]',
-            # Common Hindi word patterns
-            r'[हिंदी|भारत|देश|समय|दिन|रात|सुबह|शाम]',
-            # Compound verb patterns
-            r'[दे|ले|आ|जा]\s+[दिया|लिया|आया|गया]',
-            # Negative patterns
-            r'न[हीं|ही]',
-            r'मत',
-            # Conditional patterns
-            r'[अगर|यदि].*तो',
-            # Relative-correlative patterns
-            r'[जो|जिस|जहां].*[वो|उस|वहां]'
-        ]
-    },
-    'ta': {
-        'words': [
-            # Common pronouns
-            'நான்', 'நாங்கள்', 'நாம்', 'நீ', 'நீங்கள்', 'அவன்', 'அவள்', 'அவர்', 'அவர்கள்', 
-            'இது', 'அது', 'இவை', 'அவை', 'எது', 'யார்', 'எவர்',
-            'என்', 'எங்கள்', 'எனது', 'எங்களது', 'உன்', 'உங்கள்', 'உனது', 'உங்களது',
-            'அவன்', 'அவனது', 'அவள்', 'அவளது', 'அவர்', 'அவரது', 'அவர்கள்', 'அவர்களது',
-            # Common verbs
-            'உள்ளது', 'இல்லை', 'வருகிறேன்', 'போகிறேன்', 'செய்கிறேன்', 'பார்க்கிறேன்', 'கேட்கிறேன்',
-            'வந்தேன்', 'போனேன்', 'செய்தேன்', 'பார்த்தேன்', 'கேட்டேன்', 'சாப்பிட்டேன்', 'குடித்தேன்',
-            'வருவேன்', 'போவேன்', 'செய்வேன்', 'பார்ப்பேன்', 'கேட்பேன்', 'சாப்பிடுவேன்', 'குடிப்பேன்',
-            'படிக்கிறேன்', 'எழுதுகிறேன்', 'நடக்கிறேன்', 'ஓடுகிறேன்', 'சிரிக்கிறேன்', 'அழுகிறேன்',
-            'பாடுகிறேன்', 'ஆடுகிறேன்', 'விளையாடுகிறேன்', 'வேலை செய்கிறேன்',
-            # Common postpositions
-            'இல்', 'இடம்', 'வரை', 'மூலம்', 'ஆக', 'ஆல்', 'உடன்', 'இல்லாமல்', 'போல்',
-            'மேல்', 'கீழ்', 'முன்', 'பின்', 'நடுவில்', 'அருகில்', 'தொலைவில்', 'உள்ளே', 'வெளியே',
-            # Common conjunctions
-            'மற்றும்', 'அல்லது', 'ஆனால்', 'என்றால்', 'ஏனெனில்', 'ஆகையால்', 'எனவே',
-            'எப்போது', 'போல்', 'எவ்வளவு', 'எங்கே', 'எப்படி', 'இன்னும்', 'கூட',
-            # Common question words
-            'என்ன', 'எப்படி', 'எங்கே', 'எப்போது', 'ஏன்', 'எத்தனை', 'எந்த', 'யார்',
-            'எது', 'எவர்', 'எவை', 'எதை', 'யாரை', 'எங்கிருந்து', 'எங்கு',
-            # Common adjectives
-            'நல்ல', 'கெட்ட', 'பெரிய', 'சிறிய', 'புதிய', 'பழைய', 'குளிர்ந்த', 'சூடான',
-            'நீண்ட', 'குறுகிய', 'தடிமான', 'மெல்லிய', 'வேகமான', 'மெதுவான', 'உயர்ந்த', 'தாழ்ந்த',
-            'அழகான', 'அசிங்கமான', 'வெள்ளை', 'கருப்பு', 'சிவப்பு', 'பச்சை', 'நீலம்', 'மஞ்சள்',
-            'இளஞ்சிவப்பு', 'பழுப்பு', 'சாம்பல்',
-            # Common adverbs
-            'மிகவும்', 'கொஞ்சம்', 'அதிகம்', 'குறைவாக', 'இப்போது', 'மீண்டும்', 'உம்', 'இல்லை',
-            'நேற்று', 'இன்று', 'நாளை', 'எப்போதும்', 'எப்போதாவது', 'சீக்கிரம்', 'தாமதம்', 'மெதுவாக',
-            # Numbers
-            'ஒன்று', 'இரண்டு', 'மூன்று', 'நான்கு', 'ஐந்து', 'ஆறு', 'ஏழு', 'எட்டு', 'ஒன்பது', 'பத்து',
-            'பதினொன்று', 'பனிரெண்டு', 'பதிமூன்று', 'பதினான்கு', 'பதினைந்து', 'பதினாறு', 'பதினேழு',
-            'பதினெட்டு', 'பத்தொன்பது', 'இருபது',
-            # Time expressions
-            'காலை', 'மதியம்', 'மாலை', 'இரவு', 'நாள்', 'வாரம்', 'மாதம்', 'வருடம்', 'நேரம்', 'மணி',
-            # Common nouns
-            'வீடு', 'குடும்பம்', 'அம்மா', 'அப்பா', 'அண்ணன்', 'தம்பி', 'அக்காள்', 'தங்கை',
-            'குழந்தை', 'ஆண்', 'பெண்', 'பையன்', 'பெண்',
-            'தண்ணீர்', 'சாப்பாடு', 'சோறு', 'ரொட்டி', 'பால்', 'டீ', 'காபி', 'பழம்', 'காய்கறி'
-        ],
-        'patterns': [
-            # Verb patterns - Present tense
-            r'[கிற|ற][ேன்|ாய்|ான்|ாள்|ார்|ோம்|ீர்கள்|ார்கள்]',
-            r'[ன்|ள்|ர்|ம்|ங்கள்]$',
-            # Verb patterns - Past tense
-            r'[ந்த|ட்ட|த்த|ற்ற][ேன்|ாய்|ான்|ாள்|ார்|ோம்|ீர்கள்|ார்கள்]',
-            r'[த்|ட்|ன்|ர்][த|ட]',
-            # Verb patterns - Future tense
-            r'[வ|ப்ப|ட்][ேன்|ாய்|ான்|ாள்|ார்|ோம்|ீர்கள்|ார்கள்]',
-            # Question patterns
-            r'[என்ன|எப்படி|எங்கே|எப்போது|ஏன்|எத்தனை|யார்]',
-            r'[எது|எந்த|எவர்|எவை]',
-            # Word ending patterns
-            r'[ன்|ள்|ர்|து|ும்|ேன்|ோம்|ால்|உக்கு|இல்|அது]$',
-            r'[கிற|ந்த|வ|க்கு|வில்|டு|ஆல்|உடன்]',
-            # Postposition patterns
-            r'[இல்|வில்|ஆல்|உடன்|மூலம்|வரை|பிறகு]',
-            r'[மேல்|கீழ்|முன்|பின்|அருகில்|நடுவில்]',
-            # Case marker patterns
-            r'[ஐ|அ|உக்கு|ஆல்|இல்|ிடம்|ோடு]$',
-            # Honorific patterns
-            r'[அவர்கள்|தாங்கள்|இவர்கள்]',
-            # Plural patterns
-            r'[கள்|ங்கள்]$',
-            # Compound verb patterns
-            r'[கொண்டு|விட்டு|போட்டு]\s+[வர|போ|கொள்|தர|கொடு]',
-            # Common Tamil word patterns
-            r'[தமிழ்|இந்தியா|நாடு|காலம்|நாள்|இரவு|காலை|மாலை]',
-            # Number patterns with Tamil numerals
-            r'[௧|௨|௩|௪|௫|௬|௭|௮|௯|௦]',
-            # Conjunctive particles
-            r'[உம்|ேனும்|ாவது|கூட|மட்டும்|தான்]',
-            # Relative patterns
-            r'[எந்த|எவ].*[அந்த|அவ]',
-            # Negative patterns
-            r'[இல்லை|மாட்|ாமல்|வேண்டாம்]',
-            # Special Telugu patterns
-            r'[ஆ|ஈ|ஊ|ஏ|ஐ|ஓ|ஔ]',
-            r'[க்|ங்|ச்|ஞ்|ட்|ண்|த்|ந்|ப்|ம்|ய்|ர்|ல்|வ்|ழ்|ள்|ற்|ன்]'
-        ]
-    },
-    'en': {
-        'words': [
-            # Common verbs
-            'is', 'are', 'was', 'were', 'will', 'have', 'has', 'had', 'do', 'does', 'did',
-            'can', 'could', 'would', 'should', 'may', 'might', 'must', 'shall', 'ought',
-            'go', 'come', 'see', 'get', 'make', 'take', 'give', 'know', 'think', 'feel',
-            'want', 'need', 'like', 'love', 'hate', 'work', 'play', 'run', 'walk', 'talk',
-            'eat', 'drink', 'sleep', 'wake', 'read', 'write', 'listen', 'watch', 'look',
-            # Common pronouns
-            'I', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-            'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours', 'hers', 'ours', 'theirs',
-            'this', 'that', 'these', 'those', 'who', 'whom', 'whose', 'which', 'what',
-            'myself', 'yourself', 'himself', 'herself', 'itself', 'ourselves', 'themselves',
-            # Common prepositions and articles
-            'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'from', 'of',
-            'up', 'down', 'over', 'under', 'above', 'below', 'between', 'among', 'through',
-            'during', 'before', 'after', 'since', 'until', 'about', 'around', 'near', 'far',
-            'inside', 'outside', 'behind', 'beside', 'against', 'toward', 'towards',
-            # Common conjunctions
-            'and', 'or', 'but', 'because', 'if', 'then', 'although', 'while', 'since',
-            'unless', 'until', 'when', 'where', 'why', 'how', 'whether', 'either', 'neither',
-            'both', 'not only', 'as well as', 'however', 'therefore', 'moreover', 'furthermore',
-            # Common question words
-            'what', 'who', 'where', 'when', 'how', 'why', 'which', 'whose', 'whom',
-            # Common adjectives
-            'good', 'bad', 'big', 'small', 'new', 'old', 'hot', 'cold', 'long', 'short',
-            'tall', 'high', 'low', 'fast', 'slow', 'easy', 'hard', 'light', 'dark', 'heavy',
-            'beautiful', 'ugly', 'nice', 'kind', 'mean', 'smart', 'stupid', 'funny', 'serious',
-            'happy', 'sad', 'angry', 'excited', 'tired', 'hungry', 'thirsty', 'sick', 'healthy',
-            'rich', 'poor', 'young', 'old', 'strong', 'weak', 'clean', 'dirty', 'full', 'empty',
-            # Common adverbs
-            'very', 'much', 'many', 'few', 'now', 'then', 'also', 'not', 'yes', 'no',
-            'here', 'there', 'everywhere', 'somewhere', 'nowhere', 'always', 'never', 'sometimes',
-            'often', 'usually', 'rarely', 'today', 'yesterday', 'tomorrow', 'soon', 'late',
-            'early', 'quickly', 'slowly', 'carefully', 'loudly', 'quietly', 'well', 'badly',
-            # Numbers
-            'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
-            'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen',
-            'eighteen', 'nineteen', 'twenty', 'thirty', 'forty', 'fifty', 'hundred', 'thousand',
-            # Time expressions
-            'morning', 'afternoon', 'evening', 'night', 'day', 'week', 'month', 'year', 'time', 'hour',
-            'minute', 'second', 'moment', 'while', 'period', 'season', 'spring', 'summer', 'fall', 'winter',
-            # Common nouns
-            'person', 'people', 'man', 'woman', 'child', 'family', 'friend', 'house', 'home', 'school',
-            'work', 'job', 'money', 'food', 'water', 'car', 'book', 'phone', 'computer', 'internet'
-        ],
-        'patterns': [
-            # Common word patterns with word boundaries
-            r'\b(the|and|that|have|with|this|but|from|they|would|there|been|many|some|time)\b',
-            r'\b(which|their|said|each|she|way|make|use|her|could|water|than|first|who)\b',
-            r'\b(its|now|find|long|down|day|did|get|come|made|may|part)\b',
-            
-            # Verb patterns
-            r'\b\w+ing\b',  # Present participle
-            r'\b\w+ed\b',   # Past tense/past participle
-            r'\b\w+s\b',    # Third person singular
-            r'\b\w+ly\b',   # Adverbs
-            
-            # Modal verbs
-            r'\b(can|could|will|would|shall|should|may|might|must|ought)\b',
-            
-            # Auxiliary verbs
-            r'\b(is|are|was|were|am|be|being|been)\b',
-            r'\b(have|has|had|having)\b',
-            r'\b(do|does|did|doing|done)\b',
-            
-            # Common prefixes
-            r'\bun\w+',     # un-
-            r'\bre\w+',     # re-
-            r'\bpre\w+',    # pre-
-            r'\bdis\w+',    # dis-
-            r'\bmis\w+',    # mis-
-            r'\bover\w+',   # over-
-            r'\bunder\w+',  # under-
-            r'\bout\w+',    # out-
-            r'\bup\w+',     # up-
-            
-            # Common suffixes
-            r'\w+tion\b',   # -tion
-            r'\w+sion\b',   # -sion
-            r'\w+ness\b',   # -ness
-            r'\w+ment\b',   # -ment
-            r'\w+able\b',   # -able
-            r'\w+ible\b',   # -ible
-            r'\w+ful\b',    # -ful
-            r'\w+less\b',   # -less
-            r'\w+ship\b',   # -ship
-            r'\w+hood\b',   # -hood
-            
-            # Comparative and superlative
-            r'\w+er\b',     # -er (comparative)
-            r'\w+est\b',    # -est (superlative)
-            
-            # Question patterns
-            r'\b(what|who|where|when|why|how|which|whose)\b.*\?',
-            r'\b(is|are|do|does|did|can|could|will|would)\b.*\?',
-            
-            # Contractions
-            r"\b\w+'(t|s|re|ve|ll|d|m)\b",  # Common contractions
-            
-            # Possessive patterns
-            r"\b\w+'s\b",   # Possessive 's
-            r"\b\w+s'\b",   # Plural possessive
-            
-            # Sentence starters
-            r'\b(The|A|An|This|That|These|Those|My|Your|His|Her|Our|Their)\b',
-            
-            # Common English phrases
-            r'\b(as well as|in order to|such as|more than|less than|at least|at most)\b',
-            r'\b(not only|but also|either or|neither nor|both and)\b',
-            
-            # Time expressions
-            r'\b(in the morning|in the afternoon|in the evening|at night)\b',
-            r'\b(last year|next year|this year|every day|every week)\b',
-            
-            # Frequency adverbs
-            r'\b(always|usually|often|sometimes|rarely|never|seldom)\b',
-            
-            # Intensifiers
-            r'\b(very|quite|rather|pretty|fairly|extremely|incredibly|absolutely)\b'
-        ]
-    }
-}
-
-# Supported languages for speech recognition
-SUPPORTED_LANGUAGES = {
-    'en': 'en-US',      # English
-    'hi': 'hi-IN',      # Hindi
-    'ta': 'ta-IN',      # Tamil
-}
-
-# TTS Language mapping for gTTS
-TTS_LANGUAGE_MAPPING = {
-    'en': 'en',
-    'hi': 'hi',
-    'ta': 'ta',
-}
+# Number of turns shown per page of conversation history
+HISTORY_PAGE_SIZE = 20
+
+# Speak text segment by segment when at least this share of it is in a second language
+CODE_MIX_TTS_THRESHOLD = 0.15
 
 # Initialize session state
 if 'conversation_history' not in st.session_state:
-    st.session_state.conversation_history = []
+    st.session_state.conversation_history = ConversationLog()
+if 'history_window' not in st.session_state:
+    st.session_state.history_window = HISTORY_PAGE_SIZE
+if 'rendered_messages' not in st.session_state:
+    st.session_state.rendered_messages = {}
 if 'is_listening' not in st.session_state:
     st.session_state.is_listening = False
 if 'bearer_token' not in st.session_state:
@@ -368,200 +70,118 @@ if 'auto_detect' not in st.session_state:
     st.session_state.auto_detect = True
 if 'continuous_mode' not in st.session_state:
     st.session_state.continuous_mode = False
+if 'auth_attempted' not in st.session_state:
+    st.session_state.auth_attempted = False
+if 'history_unloaded' not in st.session_state:
+    st.session_state.history_unloaded = 0
+if 'last_summary_turns' not in st.session_state:
+    st.session_state.last_summary_turns = None
+if 'language_prior' not in st.session_state:
+    st.session_state.language_prior = LanguagePrior(SUPPORTED_LANGUAGES.keys())
+if 'recognition_calls' not in st.session_state:
+    st.session_state.recognition_calls = []
+if 'speculative_prefetcher' not in st.session_state:
+    st.session_state.speculative_prefetcher = SpeculativePrefetcher()
+if 'conversation_memory' not in st.session_state:
+    st.session_state.conversation_memory = ConversationMemory()
+if 'profile_turns' not in st.session_state:
+    st.session_state.profile_turns = st.query_params.get("profile") == "1"
+# The audio slot belongs to the voice loop of the current script run only
+st.session_state.audio_slot = None
+
+# Durable conversation store; sessions are resumed with the ?session=<id> URL parameter
+conversation_store = get_conversation_store()
+
+def start_new_session():
+    """Start a fresh stored session and expose its id in the URL"""
+    if 'session_id' in st.session_state:
+        get_scheduler().end_session(st.session_state.session_id)
+    st.session_state.session_id = uuid.uuid4().hex
+    st.session_state.conversation_history = ConversationLog()
+    st.session_state.history_unloaded = 0
+    st.session_state.last_summary = None
+    st.session_state.last_summary_turns = None
+    st.session_state.conversation_memory = ConversationMemory()
+    st.query_params["session"] = st.session_state.session_id
+
+def resume_session(session_id):
+    """Restore a stored session, loading its recent turns and every turn the stored summary does not cover"""
+    stored = conversation_store.load_session(session_id)
+    if not stored:
+        return False
+    covered = min(stored['last_summary_turns'] or 0, stored['turn_count']) if stored['last_summary'] else 0
+    history = ConversationLog()
+    limit = max(HISTORY_PAGE_SIZE, stored['turn_count'] - covered)
+    for seq, role, text in conversation_store.load_turns(session_id, limit=limit):
+        history.append(role, text, seq)
+    st.session_state.session_id = session_id
+    st.session_state.conversation_history = history
+    st.session_state.history_unloaded = stored['turn_count'] - len(history)
+    if stored['detected_language']:
+        st.session_state.detected_language = stored['detected_language']
+        st.session_state.language_prior.update(stored['detected_language'])
+    st.session_state.last_summary = stored['last_summary']
+    st.session_state.last_summary_turns = stored['last_summary_turns']
+    # Every turn that was not loaded is covered by the stored summary; loaded ones it covers are not resent
+    st.session_state.conversation_memory = ConversationMemory(
+        summary=stored['last_summary'], summarized_turns=covered
+    )
+    for _, text in history:
+        st.session_state.conversation_memory.observe(text)
+    return True
+
+if 'session_id' not in st.session_state:
+    requested_session = st.query_params.get("session")
+    if not (requested_session and resume_session(requested_session)):
+        start_new_session()
+
+def total_turns():
+    """Number of turns in the session, including ones not yet loaded from the store"""
+    return len(st.session_state.conversation_history) + st.session_state.history_unloaded
+
+def record_turn(role, text):
+    """Append a turn to the in-memory history and persist it off the hot path"""
+    message_id = st.session_state.conversation_history.append(role, text)
+    conversation_store.append_turn(st.session_state.session_id, message_id, role, text)
+    st.session_state.conversation_memory.observe(text)
+    return message_id
+
+def store_summary(summary):
+    """Keep the latest summary in session state and in the store"""
+    st.session_state.last_summary = summary
+    st.session_state.last_summary_turns = total_turns()
+    conversation_store.update_session(
+        st.session_state.session_id,
+        last_summary=summary,
+        last_summary_turns=st.session_state.last_summary_turns
+    )
 
-# Language n-gram models
-LANGUAGE_NGRAMS = {
-    'en': {
-        'unigrams': defaultdict(float),
-        'bigrams': defaultdict(float),
-        'trigrams': defaultdict(float)
-    },
-    'hi': {
-        'unigrams': defaultdict(float),
-        'bigrams': defaultdict(float),
-        'trigrams': defaultdict(float)
-    },
-    'ta': {
-        'unigrams': defaultdict(float),
-        'bigrams': defaultdict(float),
-        'trigrams': defaultdict(float)
-    }
-}
-
-# Pre-computed language statistics
-LANGUAGE_STATS = {
-    'en': {
-        'avg_word_length': 4.7,
-        'common_chars': set('etaoinshrdlu'),
-        'vowel_ratio': 0.4,
-        'consonant_clusters': ['th', 'st', 'ch', 'sh', 'ph', 'wh'],
-        'common_endings': ['ing', 'ed', 'ion', 'ity', 'ment', 'ness'],
-        'script_ratio': 0.95
-    },
-    'hi': {
-        'avg_word_length': 5.2,
-        'common_chars': set('कखगघङचछजझञटठडढणतथदधनपफबभमयरलवशषसह'),
-        'vowel_ratio': 0.35,
-        'consonant_clusters': ['क्र', 'त्र', 'श्र', 'ज्ञ', 'द्व'],
-        'common_endings': ['ता', 'ती', 'ते', 'गा', 'गी', 'गे'],
-        'script_ratio': 0.98
-    },
-    'ta': {
-        'avg_word_length': 4.8,
-        'common_chars': set('கஙசஞடணதநபமயரலவழளறன'),
-        'vowel_ratio': 0.38,
-        'consonant_clusters': ['க்ஷ', 'ஸ்ரீ', 'ஜ்ஞ'],
-        'common_endings': ['கிற', 'ந்த', 'வ', 'ப்ப', 'ட்'],
-        'script_ratio': 0.97
-    }
-}
-
-def calculate_ngrams(text, n):
-    """Calculate n-grams from text"""
-    words = text.split()
-    ngrams = defaultdict(int)
-    for word in words:
-        for i in range(len(word) - n + 1):
-            ngram = word[i:i+n]
-            ngrams[ngram] += 1
-    return ngrams
-
-def calculate_language_features(text):
-    """Calculate various language features from text"""
-    words = text.split()
-    chars = ''.join(words)
-    
-    # Basic statistics
-    avg_word_length = sum(len(word) for word in words) / len(words) if words else 0
-    
-    # Character distribution
-    char_freq = defaultdict(int)
-    for char in chars:
-        char_freq[char] += 1
-    
-    # Vowel and consonant analysis
-    vowels = set('aeiouAEIOU')
-    vowel_count = sum(1 for char in chars if char in vowels)
-    vowel_ratio = vowel_count / len(chars) if chars else 0
-    
-    # Script analysis
-    script_chars = {
-        'en': sum(1 for c in chars if 0x0041 <= ord(c) <= 0x007A),
-        'hi': sum(1 for c in chars if 0x0900 <= ord(c) <= 0x097F),
-        'ta': sum(1 for c in chars if 0x0B80 <= ord(c) <= 0x0BFF)
-    }
-    
-    # Common patterns
-    common_endings = defaultdict(int)
-    for word in words:
-        if len(word) >= 3:
-            common_endings[word[-3:]] += 1
-    
-    # Consonant clusters
-    consonant_clusters = defaultdict(int)
-    for word in words:
-        for i in range(len(word) - 1):
-            if word[i].isalpha() and word[i+1].isalpha():
-                consonant_clusters[word[i:i+2]] += 1
-    
-    return {
-        'avg_word_length': avg_word_length,
-        'char_freq': dict(char_freq),
-        'vowel_ratio': vowel_ratio,
-        'script_chars': script_chars,
-        'common_endings': dict(common_endings),
-        'consonant_clusters': dict(consonant_clusters)
-    }
-
-def calculate_language_score(text, lang):
-    """Calculate language score using multiple features"""
-    features = calculate_language_features(text)
-    stats = LANGUAGE_STATS[lang]
-    score = 0.0
-    weights = {
-        'script': 0.4,
-        'word_length': 0.1,
-        'vowel_ratio': 0.1,
-        'endings': 0.2,
-        'clusters': 0.1,
-        'char_freq': 0.1
-    }
-    
-    # Script score
-    script_ratio = features['script_chars'][lang] / len(text) if text else 0
-    script_score = 1.0 if abs(script_ratio - stats['script_ratio']) < 0.1 else 0.0
-    score += script_score * weights['script']
-    
-    # Word length score
-    word_length_diff = abs(features['avg_word_length'] - stats['avg_word_length'])
-    word_length_score = 1.0 if word_length_diff < 0.5 else 0.0
-    score += word_length_score * weights['word_length']
-    
-    # Vowel ratio score
-    vowel_ratio_diff = abs(features['vowel_ratio'] - stats['vowel_ratio'])
-    vowel_ratio_score = 1.0 if vowel_ratio_diff < 0.1 else 0.0
-    score += vowel_ratio_score * weights['vowel_ratio']
-    
-    # Common endings score
-    endings_score = 0.0
-    for ending in stats['common_endings']:
-        if ending in features['common_endings']:
-            endings_score += 1
-    endings_score = min(1.0, endings_score / len(stats['common_endings']))
-    score += endings_score * weights['endings']
-    
-    # Consonant clusters score
-    clusters_score = 0.0
-    for cluster in stats['consonant_clusters']:
-        if cluster in features['consonant_clusters']:
-            clusters_score += 1
-    clusters_score = min(1.0, clusters_score / len(stats['consonant_clusters']))
-    score += clusters_score * weights['clusters']
-    
-    # Character frequency score
-    char_freq_score = 0.0
-    common_chars = stats['common_chars']
-    text_chars = set(features['char_freq'].keys())
-    if common_chars and text_chars:
-        char_freq_score = len(common_chars.intersection(text_chars)) / len(common_chars)
-    score += char_freq_score * weights['char_freq']
-    
-    return score
+def load_older_turns():
+    """Fetch the next page of older turns from the store into the history"""
+    history = st.session_state.conversation_history
+    older = conversation_store.load_turns(
+        st.session_state.session_id,
+        before_seq=history.first_id(),
+        limit=HISTORY_PAGE_SIZE
+    )
+    history.prepend(older)
+    st.session_state.history_unloaded = max(0, st.session_state.history_unloaded - len(older))
 
 def detect_language_from_text(text):
     """New language detection method using statistical analysis"""
-    if not text or len(text.strip()) < 2:
-        return 'en'
-    
-    text = text.strip()
-    
-    # Calculate scores for each language
-    scores = {}
-    for lang in ['en', 'hi', 'ta']:
-        scores[lang] = calculate_language_score(text, lang)
-    
-    # Get the best matching language
-    best_lang = max(scores.items(), key=lambda x: x[1])
-    confidence = best_lang[1]
-    
-    # Store detection details
-    st.session_state.last_detection_details = {
-        'detected_lang': best_lang[0],
-        'confidence': confidence,
-        'scores': scores,
-        'features': calculate_language_features(text)
-    }
-    
-    # Only return a language if confidence is high enough
-    if confidence >= 0.7:  # 70% confidence threshold
-        return best_lang[0]
-    
-    # If confidence is too low, return English as fallback
-    st.session_state.last_detection_details['fallback'] = True
-    return 'en'
-
-def listen_for_speech_multilingual():
-    """Enhanced speech recognition with advanced language detection"""
+    detected_lang, details = detect_language(text)
+    if details is not None:
+        # Store detection details, without the per-character feature tables
+        st.session_state.last_detection_details = compact_detection_details(details)
+    return detected_lang
+
+def listen_for_speech_multilingual(on_partial=None):
+    """Enhanced speech recognition with advanced language detection
+
+    ``on_partial`` receives each candidate recognition result in auto-detect
+    mode as soon as it is available, before the remaining languages are tried.
+    """
+    sr = lazy_import("speech_recognition")
     recognizer = sr.Recognizer()
     
     with sr.Microphone() as source:
@@ -583,45 +203,63 @@ def listen_for_speech_multilingual():
                 timeout=45,           # Increased timeout to 45 seconds
                 phrase_time_limit=45  # Increased phrase time limit to 45 seconds
             )
+            # Turn latency is measured from the end of capture
+            st.session_state.speech_captured_at = time.perf_counter()
+            
+            # Trim silence and resample to 16 kHz once; every language attempt reuses the encoded payload
+            with profile_stage("preprocess"):
+                audio, audio_stats = lazy_import("audio_preprocessing").prepare_for_recognition(audio)
+            st.session_state.last_audio_prep = audio_stats
+            
+            # Replays and repeated phrases reuse the transcript of an earlier recording
+            transcript_cache = lazy_import("transcript_cache")
+            cache = transcript_cache.get_transcript_cache()
+            cache_namespace = 'auto' if st.session_state.auto_detect else st.session_state.detected_language
+            with profile_stage("transcript_cache"):
+                fingerprint = transcript_cache.fingerprint_audio(audio.frame_data, audio.sample_rate)
+                cached = cache.lookup(fingerprint, cache_namespace, st.session_state.session_id)
+            st.session_state.transcript_cache_stats = dict(cache.stats)
+            if cached is not None:
+                st.session_state.last_detection_details = dict(
+                    cached['details'] or {}, cached=cached['match'], recognition_calls=0
+                )
+                if st.session_state.auto_detect:
+                    st.session_state.recognition_calls.append(0)
+                    del st.session_state.recognition_calls[:-100]
+                    st.session_state.detected_language = cached['language']
+                    st.session_state.language_prior.update(
+                        cached['language'], st.session_state.last_detection_details.get('confidence', 0.5)
+                    )
+                return cached['text'], cached['language']
             
             # If auto-detect is enabled, try multiple languages with advanced detection
             if st.session_state.auto_detect:
-                recognition_results = []
-                
-                # Priority order: commonly used languages first
-                priority_languages = ['en', 'hi', 'ta']
-                other_languages = [lang for lang in SUPPORTED_LANGUAGES.keys() if lang not in priority_languages]
-                languages_to_try = priority_languages + other_languages
+                language_prior = st.session_state.language_prior
                 
-                # Try recognition with each language
-                for lang_code in languages_to_try:
+                def recognize(lang_code):
                     try:
                         google_lang_code = SUPPORTED_LANGUAGES[lang_code]
-                        text = recognizer.recognize_google(audio, language=google_lang_code)
-                        
-                        if text.strip():
-                            # Use language detection
-                            detected_lang = detect_language_from_text(text)
-                            
-                            # Get detection details from session state
-                            detection_details = st.session_state.get('last_detection_details', {})
-                            detection_confidence = detection_details.get('confidence', 0.5)
-                            
-                            # Calculate total score (recognition success + language match + confidence)
-                            lang_match_bonus = 1.0 if detected_lang == lang_code else 0.5
-                            total_score = detection_confidence + lang_match_bonus + (len(text.split()) * 0.1)
-                            
-                            recognition_results.append({
-                                'text': text,
-                                'recognition_lang': lang_code,
-                                'detected_lang': detected_lang,
-                                'confidence': detection_confidence,
-                                'total_score': total_score
-                            })
-                            
+                        if not get_coordinator().acquire("google_asr"):
+                            st.warning(f"Speech recognition is busy; skipped {lang_code}")
+                            return None
+                        # Ask for the full alternatives list so one call can settle the language
+                        return recognizer.recognize_google(audio, language=google_lang_code, show_all=True)
                     except (sr.UnknownValueError, sr.RequestError, Exception) as e:
                         st.warning(f"Failed to recognize speech in {lang_code}: {str(e)}")
-                        continue
+                        return None
+                
+                def detect(text):
+                    detected_lang = detect_language_from_text(text)
+                    detection_details = st.session_state.get('last_detection_details', {})
+                    return detected_lang, detection_details.get('confidence', 0.5)
+                
+                # Rescore every alternative; try further languages in prior order only while ambiguous
+                with profile_stage("detection"):
+                    recognition_results, recognition_calls = recognize_nbest(
+                        recognize, detect, language_prior, on_result=on_partial
+                    )
+                st.session_state.recognition_calls.append(recognition_calls)
+                del st.session_state.recognition_calls[:-100]
                 
                 # Select the best result based on total score
                 if recognition_results:
@@ -633,11 +271,15 @@ def listen_for_speech_multilingual():
                         'detected_lang': best_result['detected_lang'],
                         'confidence': best_result['confidence'],
                         'total_score': best_result['total_score'],
-                        'all_results': len(recognition_results)
+                        'all_results': len(recognition_results),
+                        'recognition_calls': recognition_calls
                     }
                     
                     final_lang = best_result['detected_lang']
                     st.session_state.detected_language = final_lang
+                    language_prior.update(final_lang, best_result['confidence'])
+                    cache.store(fingerprint, cache_namespace, st.session_state.session_id, best_result['text'], final_lang,
+                                st.session_state.last_detection_details)
                     
                     return best_result['text'], final_lang
                 else:
@@ -649,6 +291,9 @@ def listen_for_speech_multilingual():
                 selected_lang = st.session_state.detected_language
                 google_lang_code = SUPPORTED_LANGUAGES[selected_lang]
                 try:
+                    if not get_coordinator().acquire("google_asr"):
+                        st.error("Speech recognition is busy. Please try speaking again.")
+                        return "Could not understand audio", 'en'
                     text = recognizer.recognize_google(audio, language=google_lang_code)
                     
                     # Still run language detection for validation
@@ -664,6 +309,8 @@ def listen_for_speech_multilingual():
                         'confidence': detection_confidence,
                         'manual_mode': True
                     }
+                    cache.store(fingerprint, cache_namespace, st.session_state.session_id, text, detected_lang,
+                                st.session_state.last_detection_details)
                     
                     return text, detected_lang
                 except sr.UnknownValueError:
@@ -686,163 +333,267 @@ def listen_for_speech_multilingual():
             st.error(f"Error during speech recognition: {str(e)}")
             return f"Error during speech recognition: {str(e)}", 'en'
 
+def speech_parts(text, language):
+    """Split text into (language, text) parts, one per language segment for code-mixed text"""
+    segmentation = detect_segments(text)
+    if segmentation['mix_ratio'] >= CODE_MIX_TTS_THRESHOLD:
+        segments = merge_short_segments(text, segmentation['segments'])
+        if len({segment['lang'] for segment in segments}) > 1:
+            return [(segment['lang'], segment['text']) for segment in segments]
+    return [(language, text)]
+
+def synthesize_cached(parts, engine):
+    """Synthesize speech parts, sharing rendered clips with other workers through the TTS cache"""
+    coordinator = get_coordinator()
+    key = cache_key(engine, parts)
+    cached = coordinator.cache_get("tts", key)
+    if cached is not None:
+        audio_format, _, data = cached.partition(b"\n")
+        return {'data': data, 'format': audio_format.decode('ascii')}
+    with profile_stage("encode"):
+        audio = lazy_import("audio_pipeline").synthesize_speech(parts, engine=engine)
+    coordinator.cache_set("tts", key, audio['format'].encode('ascii') + b"\n" + audio['data'], TTS_CACHE_TTL)
+    return audio
+
 def speak_text_multilingual(text, language='en'):
     """Convert text to speech with enhanced language support using gTTS"""
+    # Code-mixed text is spoken segment by segment in the matching voices
+    parts = speech_parts(text, language)
     try:
-        # Get the appropriate language code for gTTS
-        tts_lang = TTS_LANGUAGE_MAPPING.get(language, 'en')
-        
-        # Create a temporary file to store the audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-            temp_filename = temp_file.name
-        
-        # Generate speech using gTTS
-        tts = gTTS(text=text, lang=tts_lang, slow=False)
-        tts.save(temp_filename)
-        
-        # Always use Streamlit's audio component for playback
-        with open(temp_filename, 'rb') as audio_file:
-            audio_bytes = audio_file.read()
-            st.audio(audio_bytes, format='audio/mp3')
-            
-        # Clean up the temporary file
-        try:
-            os.unlink(temp_filename)
-        except:
-            pass
-            
+        audio = synthesize_cached(parts, 'gtts')
+        play_audio(audio)
     except Exception as e:
         st.error(f"Error in text-to-speech: {e}")
-        # Fallback to pyttsx3 if gTTS fails
+        # Fallback to pyttsx3 if gTTS fails; rendered to memory so remote users hear it too
         try:
-            engine = pyttsx3.init()
-            voices = engine.getProperty('voices')
-            
-            # Try to find a voice for the detected language
-            for voice in voices:
-                voice_lang = getattr(voice, 'languages', [])
-                voice_id = voice.id.lower()
-                
-                if language != 'en':
-                    if (any(language in lang for lang in voice_lang) or 
-                        language in voice_id or 
-                        TTS_LANGUAGE_MAPPING.get(language, '') in voice_id):
-                        engine.setProperty('voice', voice.id)
-                        break
-            else:
-                engine.setProperty('voice', voices[0].id)
-            
-            engine.setProperty('rate', 150)
-            engine.setProperty('volume', 0.9)
-            
-            engine.say(text)
-            engine.runAndWait()
-            engine.stop()
+            audio = synthesize_cached(parts, 'pyttsx3')
+            play_audio(audio)
         except Exception as e2:
             st.error(f"Fallback TTS also failed: {e2}")
 
+def play_prompt(key, language=None):
+    """Play a pre-synthesized status prompt from the audio bundle (no TTS call); skipped if it is not bundled"""
+    bundle = get_prompt_bundle()
+    language = language or st.session_state.detected_language
+    audio = bundle.lookup(key, language)
+    if audio is not None:
+        play_audio(audio)
+    elif bundle.error and key in bundle.catalog:
+        # The bundle file is damaged: speak the prompt live instead of staying silent
+        spoken = language if language in bundle.catalog[key] else 'en'
+        speak_text_multilingual(bundle.text(key, spoken), spoken)
+
+def play_audio(audio):
+    """Play a clip; inside the voice loop it replaces the previous clip so that one can be released"""
+    slot = st.session_state.get('audio_slot')
+    (slot if slot is not None else st).audio(audio['data'], format=audio['format'])
+
+def enforce_memory_budget():
+    """Release replaced audio, measure this session and evict summarized turns when it is over budget"""
+    manager = get_session_memory()
+    manager.release_played_audio()
+    history = st.session_state.conversation_history
+    rendered = st.session_state.rendered_messages
+    _, evicted = manager.enforce(
+        st.session_state.session_id,
+        {
+            'history': history,
+            'rendered': rendered,
+            'memory': st.session_state.conversation_memory,
+            'detection': st.session_state.get('last_detection_details'),
+            'speculation': st.session_state.speculative_prefetcher.log,
+        },
+        history,
+        rendered,
+        st.session_state.history_unloaded,
+        st.session_state.conversation_memory.summarized_turns,
+        max(HISTORY_PAGE_SIZE, st.session_state.history_window)
+    )
+    st.session_state.history_unloaded += evicted
+
 def process_voice_input():
     """Process voice input with multilingual support"""
     if not st.session_state.bearer_token:
         st.error("Please authenticate first!")
         return
     
+    prefetcher = st.session_state.speculative_prefetcher
+    scheduler = get_scheduler()
+    session_id = st.session_state.session_id
+    turn_profiler = get_turn_profiler()
+    # One audio slot for the whole loop: each clip replaces the last, which is then released
+    st.session_state.audio_slot = st.empty()
+    play_prompt('greeting')
+    
     while st.session_state.continuous_mode:
-        try:
-            # Listen for speech
-            result = listen_for_speech_multilingual()
+        # Profile this turn if the session asked for it or it is the N-th turn
+        with turn_profiler.turn(session_id, st.session_state.profile_turns):
+            try:
+                # Keep the session within its memory budget however long the loop runs
+                with profile_stage("memory"):
+                    enforce_memory_budget()
             
-            if isinstance(result, tuple):
-                user_text, detected_lang = result
-            else:
-                user_text, detected_lang = result, 'en'
+                # Speculatively fetch the LLM response for the first usable transcript candidate
+                prefetcher.cancel()
+                # Prompt context: conversation memory plus the turns it does not cover yet
+                with profile_stage("prompt"):
+                    memory = st.session_state.conversation_memory
+                    memory_text = memory.render()
+                    turn_count = total_turns()
+                    history_snapshot = memory.prompt_turns(st.session_state.conversation_history, turn_count)
+                    bearer_token = st.session_state.bearer_token
+                    history_tokens = estimate_tokens(memory_text + "".join(text for _, text in history_snapshot))
+                # A new turn: anything still queued for the previous one is stale
+                generation = scheduler.new_generation(session_id)
             
-            # Check if the text is too short (might indicate cutoff)
-            if len(user_text.split()) < 3 and not any(error in user_text for error in ["Error", "Timeout", "Could not"]):
-                st.warning("Speech might have been cut off. Please try speaking again.")
-                continue
+                def speculate(candidate):
+                    if prefetcher.pending or len(candidate['text'].split()) < 3:
+                        return
+                    lang = candidate['detected_lang']
+                    prefetcher.speculate(
+                        candidate['text'],
+                        lang,
+                        lambda text: scheduler.run(
+                            'llm',
+                            lambda: get_router().generate(
+                                history_snapshot + [("user", text)], text, bearer_token, lang, memory=memory_text,
+                                total_turns=turn_count + 1
+                            ),
+                            INTERACTIVE, session_id=session_id, generation=generation
+                        ),
+                        prompt_tokens=history_tokens
+                    )
             
-            if user_text and not any(error in user_text for error in ["Error", "Timeout", "Could not"]):
-                # Display detected language
-                lang_names = {
-                    'en': 'English', 'hi': 'Hindi (हिंदी)', 'ta': 'Tamil (தமிழ்)'
-                }
-                
-                detected_lang_name = lang_names.get(detected_lang, detected_lang)
-                st.success(f"🗣️ **Detected Language:** {detected_lang_name}")
+                # Listen for speech
+                with profile_stage("recognition"):
+                    result = listen_for_speech_multilingual(on_partial=speculate)
+            
+                if isinstance(result, tuple):
+                    user_text, detected_lang = result
+                else:
+                    user_text, detected_lang = result, 'en'
+            
+                # Check if the text is too short (might indicate cutoff)
+                if len(user_text.split()) < 3 and not any(error in user_text for error in ["Error", "Timeout", "Could not"]):
+                    st.warning("Speech might have been cut off. Please try speaking again.")
+                    play_prompt('cut_off')
+                    continue
+            
+                if user_text and not any(error in user_text for error in ["Error", "Timeout", "Could not"]):
+                    # Display detected language
+                    lang_names = LANGUAGE_NAMES
+                    detected_lang_name = lang_names.get(detected_lang, detected_lang)
+                    st.success(f"🗣️ **Detected Language:** {detected_lang_name}")
                 
-                # Show detection details if available
-                if hasattr(st.session_state, 'last_detection_details'):
-                    details = st.session_state.last_detection_details
-                    with st.expander("🔍 Detection Details"):
-                        if details.get('manual_mode'):
-                            st.info(f"**Manual Mode:** Used {lang_names.get(details['recognition_lang'], details['recognition_lang'])}")
-                        else:
-                            st.info(f"**Recognition Language:** {lang_names.get(details['recognition_lang'], details['recognition_lang'])}")
-                            st.info(f"**Detected Language:** {lang_names.get(details['detected_lang'], details['detected_lang'])}")
-                            st.info(f"**Confidence Score:** {details['confidence']:.2f}")
-                            st.info(f"**Total Score:** {details['total_score']:.2f}")
-                            st.info(f"**Languages Tried:** {details['all_results']}")
+                    # Show detection details if available
+                    if hasattr(st.session_state, 'last_detection_details'):
+                        details = st.session_state.last_detection_details
+                        with st.expander("🔍 Detection Details"):
+                            if details.get('manual_mode'):
+                                st.info(f"**Manual Mode:** Used {lang_names.get(details['recognition_lang'], details['recognition_lang'])}")
+                            else:
+                                st.info(f"**Recognition Language:** {lang_names.get(details['recognition_lang'], details['recognition_lang'])}")
+                                st.info(f"**Detected Language:** {lang_names.get(details['detected_lang'], details['detected_lang'])}")
+                                st.info(f"**Confidence Score:** {details['confidence']:.2f}")
+                                st.info(f"**Total Score:** {details['total_score']:.2f}")
+                                st.info(f"**Languages Tried:** {details['all_results']}")
+                                st.info(f"**Recognition Calls:** {details.get('recognition_calls', details['all_results'])}")
+                            if details.get('cached'):
+                                st.info(f"**Transcript Cache:** {details['cached']} match, recognition skipped")
                 
-                st.success(f"📝 **You said:** {user_text}")
+                    st.success(f"📝 **You said:** {user_text}")
                 
-                # Add user input to conversation history
-                st.session_state.conversation_history.append(("user", user_text))
+                    # Add user input to conversation history
+                    record_turn("user", user_text)
+                    conversation_store.update_session(st.session_state.session_id, detected_language=detected_lang)
                 
-                # Get AI response with language context
-                with st.spinner("Getting AI response..."):
-                    ai_response = get_watsonx_response(
-                        st.session_state.conversation_history, 
-                        user_text, 
-                        st.session_state.bearer_token,
-                        detected_lang
-                    )
+                    # Get AI response with language context, adopting the speculative one if it matches
+                    with st.spinner("Getting AI response..."), profile_stage("llm"):
+                        ai_response = prefetcher.resolve(user_text, detected_lang)
+                        if ai_response is None or ai_response.startswith("Error"):
+                            try:
+                                ai_response = scheduler.run(
+                                    'llm',
+                                    lambda: get_router().generate(
+                                        history_snapshot + [("user", user_text)], 
+                                        user_text, 
+                                        st.session_state.bearer_token,
+                                        detected_lang,
+                                        memory=memory_text,
+                                        total_turns=turn_count + 1
+                                    ),
+                                    INTERACTIVE, session_id=session_id, generation=generation
+                                )
+                            except WorkShed as e:
+                                ai_response = f"Error: {e}"
                 
-                if ai_response and not ai_response.startswith("Error"):
-                    # Add AI response to conversation history
-                    st.session_state.conversation_history.append(("assistant", ai_response))
-                    st.session_state.last_response = ai_response
+                    if ai_response and not ai_response.startswith("Error"):
+                        # Add AI response to conversation history
+                        record_turn("assistant", ai_response)
+                        st.session_state.last_response = ai_response
+                    
+                        st.success(f"🤖 **AI Response:** {ai_response}")
                     
-                    st.success(f"🤖 **AI Response:** {ai_response}")
+                        # Fold older turns into the memory in the background once enough have piled up
+                        memory.maybe_fold(
+                            st.session_state.conversation_history,
+                            total_turns(),
+                            lambda turns, previous: get_conversation_summary(
+                                turns, PERIODIC, previous_summary=previous, bearer_token=bearer_token
+                            ),
+                            # Persist the fold so a resumed session starts from it
+                            lambda summary, summarized_turns: conversation_store.update_session(
+                                session_id, last_summary=summary, last_summary_turns=summarized_turns
+                            )
+                        )
                     
-                    # Speak the response in appropriate language
-                    with st.spinner("Speaking response..."):
-                        speak_text_multilingual(ai_response, detected_lang)
+                        # Speak the response in appropriate language
+                        with st.spinner("Speaking response..."), profile_stage("tts"):
+                            try:
+                                scheduler.run(
+                                    'tts',
+                                    lambda: speak_text_multilingual(ai_response, detected_lang),
+                                    INTERACTIVE, session_id=session_id, generation=generation
+                                )
+                            except WorkShed as e:
+                                st.warning(f"Skipped speaking the response: {e}")
+                        st.session_state.warmup.record_turn(time.perf_counter() - st.session_state.speech_captured_at)
+                    else:
+                        st.error(f"AI Error: {ai_response}")
+                        play_prompt('busy' if "busy" in (ai_response or "") else 'ai_error', detected_lang)
                 else:
-                    st.error(f"AI Error: {ai_response}")
-            else:
-                st.error(f"Speech Recognition Error: {user_text}")
+                    st.error(f"Speech Recognition Error: {user_text}")
+                    play_prompt('timeout' if user_text.startswith("Timeout") else 'not_understood')
+                    # Don't break on error, continue listening
+                    continue
+                
+            except Exception as e:
+                st.error(f"Error in voice processing: {str(e)}")
                 # Don't break on error, continue listening
                 continue
-                
-        except Exception as e:
-            st.error(f"Error in voice processing: {str(e)}")
-            # Don't break on error, continue listening
-            continue
 
-def get_conversation_summary(conversation_history):
-    """Generate a summary of the conversation using Watsonx"""
+def get_conversation_summary(conversation_history, priority=SUMMARY, previous_summary=None, bearer_token=None):
+    """Generate a summary of the conversation using Watsonx
+
+    With ``previous_summary`` the summary is updated incrementally: only the
+    new turns are sent along with the summary so far. Pass ``bearer_token``
+    when calling from a background thread.
+    """
     if not conversation_history:
         return "No conversation to summarize."
+    bearer_token = bearer_token or st.session_state.bearer_token
     
-    # Format conversation for summary
-    conversation_text = "\n".join([f"{role}: {text}" for role, text in conversation_history])
-    
-    # Create summary prompt
-    summary_prompt = f"""Please provide a concise summary of the following conversation:
-
-{conversation_text}
-
-Summary:"""
+    summary_prompt = build_summary_prompt(conversation_history, previous_summary)
     
     # Get summary from Watsonx
     try:
-        summary = get_watsonx_response(
+        summary = get_scheduler().run('llm', lambda: get_router().generate(
             [],  # Empty history for summary
             summary_prompt,
-            st.session_state.bearer_token,
-            'en'  # Always use English for summaries
-        )
+            bearer_token,
+            'en',  # Always use English for summaries
+            profile='summary'
+        ), priority)
         return summary
     except Exception as e:
         return f"Error generating summary: {str(e)}"
@@ -902,6 +653,13 @@ def send_to_slack(summary, webhook_url, bot_name="Ava"):
 
 def send_summary_email(summary, recipient_email):
     """Send conversation summary via email and Slack"""
+    try:
+        return get_scheduler().run('notify', lambda: deliver_summary_email(summary, recipient_email), NOTIFY)
+    except WorkShed as e:
+        return f"Error sending summary: {e}"
+
+def deliver_summary_email(summary, recipient_email):
+    """Deliver the summary email and Slack message (called through the notify stage)"""
     try:
         # Get email configuration from environment variables
         sender_email = os.getenv("EMAIL_SENDER")
@@ -957,121 +715,94 @@ def send_summary_email(summary, recipient_email):
     except Exception as e:
         return f"Error sending summary: {str(e)}"
 
-def get_bearer_token(api_key):
-    """Get bearer token for Watsonx API authentication"""
-    url = "https://iam.cloud.ibm.com/identity/token"
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    data = f"apikey={api_key}&grant_type=urn:ibm:params:oauth:grant-type:apikey"
-
-    response = requests.post(url, headers=headers, data=data)
+def fetch_bearer_token():
+    """Bearer token for the configured API key (run by the session warm-up)"""
+    return get_bearer_token(os.getenv("API_KEY"))
 
-    if response.status_code == 200:
-        return response.json()["access_token"]
-    else:
-        st.error(f"Failed to retrieve access token: {response.text}")
-        return None
-
-def clean_ai_response(response_text):
-    """Clean the AI response by removing template tags and unwanted text"""
-    if not response_text:
-        return response_text
-    
-    # Remove common template tags
-    unwanted_patterns = [
-        "assistant<|end_header_id|>",
-        "<|start_header_id|>assistant<|end_header_id|>",
-        "<|eot_id|>",
-        "<|start_header_id|>",
-        "<|end_header_id|>",
-        "**",
-        "assistant<|end_header_id|>\n\n",
-        "assistant<|end_header_id|>\n",
-    ]
-    
-    cleaned_response = response_text
-    for pattern in unwanted_patterns:
-        cleaned_response = cleaned_response.replace(pattern, "")
+def render_message_markdown(message_id, role, history, index):
+    """Return the markdown for a history message, memoized by message id"""
+    rendered = st.session_state.rendered_messages.get(message_id)
+    if rendered is None:
+        text = history.text_at(index)
+        if role == "user":
+            rendered = f"**👤 You:** {text}"
+        else:
+            rendered = f"**🤖 Assistant:** {text}"
+        st.session_state.rendered_messages[message_id] = rendered
+    return rendered
+
+def render_conversation_history(history):
+    """Render only the most recent window of turns, with a button to load older ones"""
+    if not history:
+        st.info("No conversation yet. Start by clicking 'Start Voice Chat' or typing a message.")
+        return
     
-    # Remove leading/trailing whitespace and newlines
-    cleaned_response = cleaned_response.strip()
+    hidden_count = total_turns() - st.session_state.history_window
+    if hidden_count > 0:
+        if st.button(f"⬆️ Load older messages ({hidden_count} hidden)", key="load_older_history"):
+            st.session_state.history_window += HISTORY_PAGE_SIZE
+            if st.session_state.history_window > len(history) and st.session_state.history_unloaded:
+                load_older_turns()
+            st.rerun()
     
-    return cleaned_response
-
-def get_watsonx_response(history, user_input, bearer_token, detected_lang='en'):
-    """Get response from Watsonx API"""
-    url = "https://us-south.ml.cloud.ibm.com/ml/v1/text/generation?version=2023-05-29"
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "Authorization": f"Bearer {bearer_token}"
-    }
-
-    # Add language context to the conversation
-    language_context = ""
-    if detected_lang != 'en':
-        lang_names = {
-            'hi': 'Hindi', 'ta': 'Tamil'
-        }
-        lang_name = lang_names.get(detected_lang, 'regional language')
-        language_context = f"The user is speaking in {lang_name}. Please respond appropriately and consider the cultural context. If needed, you can respond in English or the same language as appropriate."
-
-    # Construct the conversation history
-    conversation = ""
-    if language_context:
-        conversation += f"<|start_header_id|>system<|end_header_id|>\n\n{language_context}<|eot_id|>\n"
+    visible = history.window(st.session_state.history_window)
     
-    conversation += "".join(
-        f"<|start_header_id|>{role}<|end_header_id|>\n\n{text}<|eot_id|>\n" 
-        for role, text in history
-    )
+    # Keep the render cache bounded to roughly the visible window
+    rendered = st.session_state.rendered_messages
+    if len(rendered) > 2 * len(visible):
+        oldest_visible = visible[0][0]
+        for message_id in [mid for mid in rendered if mid < oldest_visible]:
+            del rendered[message_id]
     
-    conversation += f"<|start_header_id|>user<|end_header_id|>\n\n{user_input}<|eot_id|>\n"
-
-    payload = {
-        "input": conversation,
-        "parameters": {
-            "decoding_method": "greedy",
-            "max_new_tokens": 8100,
-            "min_new_tokens": 0,
-            "stop_sequences": [],
-            "repetition_penalty": 1
-        },
-        "model_id": "meta-llama/llama-3-3-70b-instruct",
-        "project_id": os.getenv("PROJECT_ID")
-    }
-
-    response = requests.post(url, headers=headers, json=payload)
-
-    if response.status_code == 200:
-        response_data = response.json()
-        if "results" in response_data and response_data["results"]:
-            raw_response = response_data["results"][0]["generated_text"]
-            return clean_ai_response(raw_response)
-        else:
-            return "Error: 'generated_text' not found in the response."
-    else:
-        return f"Error: Failed to fetch response from Watsonx.ai. Status code: {response.status_code}"
+    for message_id, role, index in visible:
+        st.markdown(render_message_markdown(message_id, role, history, index))
+        if role == "assistant":
+            # Add individual speak button for each response
+            if st.button("🔊 Speak", key=f"speak_{message_id}"):
+                speak_text_multilingual(history.text_at(index), st.session_state.detected_language)
 
 # Main UI
 st.title("🎙️ Multilingual Voice Bot with Watsonx LLM")
 st.markdown("### Supports English + Indian Regional Languages")
 st.markdown("---")
 
-# Auto-authentication on app start
-if not st.session_state.bearer_token:
+# Warm up the token, connections, TTS engines and detection tables in the background (once per session)
+if 'warmup' not in st.session_state:
+    has_credentials = os.getenv("API_KEY") and os.getenv("PROJECT_ID")
+    st.session_state.warmup = SessionWarmup(warmup_tasks(fetch_bearer_token if has_credentials else None))
+
+# Auto-authentication on app start (once per session, not on every rerun)
+if not st.session_state.bearer_token and not st.session_state.auth_attempted:
+    st.session_state.auth_attempted = True
     api_key = os.getenv("API_KEY")
     project_id = os.getenv("PROJECT_ID")
     
     if api_key and project_id:
         with st.spinner("Authenticating with Watsonx..."):
-            token = get_bearer_token(api_key)
+            # The warm-up started the fetch at session start; the other tasks keep running
+            token = st.session_state.warmup.result('token')
             if token:
                 st.session_state.bearer_token = token
                 st.success("✅ Authentication successful!")
             else:
-                st.error("❌ Authentication failed! Please check your API_KEY in .env file")
+                token_status = st.session_state.warmup.status().get('token') or {}
+                token_error = token_status.get('error')
+                if token_status.get('timed_out'):
+                    st.session_state.auth_error = "⏳ Authentication timed out: the IAM service did not answer in time" + (
+                        f" ({token_error})" if token_error else "") + ". Please retry."
+                else:
+                    st.session_state.auth_error = "❌ Authentication failed! Please check your API_KEY in .env file" + (
+                        f" ({token_error})" if token_error else "")
     else:
-        st.error("❌ Missing API_KEY or PROJECT_ID in environment variables. Please check your .env file.")
+        st.session_state.auth_error = "❌ Missing API_KEY or PROJECT_ID in environment variables. Please check your .env file."
+
+if not st.session_state.bearer_token and st.session_state.get('auth_error'):
+    st.error(st.session_state.auth_error)
+    if st.button("🔑 Retry Authentication"):
+        st.session_state.auth_attempted = False
+        st.session_state.auth_error = None
+        st.session_state.warmup.submit('token', fetch_bearer_token)
+        st.rerun()
 
 st.markdown("---")
 
@@ -1085,10 +816,7 @@ with col1:
 
 with col2:
     if not auto_detect:
-        lang_options = {
-            'English': 'en', 'Hindi (हिंदी)': 'hi', 'Tamil (தமிழ்)': 'ta'
-        }
-        
+        lang_options = LANGUAGE_OPTIONS
         selected_lang_name = st.selectbox(
             "Select Language:",
             options=list(lang_options.keys()),
@@ -1100,7 +828,7 @@ with col2:
 if st.session_state.auto_detect:
     st.info("🔍 **Mode:** Auto-detect (will try to identify the language you speak)")
 else:
-    current_lang = next(name for name, code in lang_options.items() if code == st.session_state.detected_language)
+    current_lang = LANGUAGE_NAMES.get(st.session_state.detected_language, st.session_state.detected_language)
     st.info(f"🗣️ **Selected Language:** {current_lang}")
 
 st.markdown("---")
@@ -1122,7 +850,9 @@ with col2:
 
 with col3:
     if st.button("🗑️ Clear Conversation"):
-        st.session_state.conversation_history = []
+        start_new_session()
+        st.session_state.rendered_messages = {}
+        st.session_state.history_window = HISTORY_PAGE_SIZE
         st.session_state.last_response = ""
         st.success("Conversation cleared!")
 
@@ -1130,17 +860,7 @@ st.markdown("---")
 
 # Conversation history display
 st.header("📝 Conversation History")
-if st.session_state.conversation_history:
-    for i, (role, text) in enumerate(st.session_state.conversation_history):
-        if role == "user":
-            st.markdown(f"**👤 You:** {text}")
-        else:
-            st.markdown(f"**🤖 Assistant:** {text}")
-            # Add individual speak button for each response
-            if st.button(f"🔊 Speak", key=f"speak_{i}"):
-                speak_text_multilingual(text, st.session_state.detected_language)
-else:
-    st.info("No conversation yet. Start by clicking 'Start Voice Chat' or typing a message.")
+render_conversation_history(st.session_state.conversation_history)
 
 # Add this after the conversation history display section
 st.markdown("---")
@@ -1158,8 +878,8 @@ with col1:
             st.markdown("### Summary")
             st.markdown(summary)
             
-            # Store summary in session state
-            st.session_state.last_summary = summary
+            # Store summary in session state and the conversation store
+            store_summary(summary)
 
 with col2:
     if st.button("Send Summary via Email"):
@@ -1173,39 +893,169 @@ with col2:
                 else:
                     st.error(result)
 
-# Add automatic summary every 5 messages
-if len(st.session_state.conversation_history) > 0 and len(st.session_state.conversation_history) % 5 == 0:
-    with st.spinner("Generating periodic summary..."):
-        summary = get_conversation_summary(st.session_state.conversation_history)
+# Add automatic summary every 5 messages (reusing the stored summary if it is current)
+if total_turns() > 0 and total_turns() % 5 == 0:
+    if st.session_state.last_summary_turns == total_turns() and st.session_state.last_summary:
+        summary = st.session_state.last_summary
         st.markdown("### Periodic Summary")
         st.markdown(summary)
-        
-        # Store summary in session state
-        st.session_state.last_summary = summary
-        
-        # If email is provided, offer to send the periodic summary
-        if email_address:
-            if st.button("Send Periodic Summary via Email"):
-                with st.spinner("Sending periodic summary via email..."):
-                    result = send_summary_email(summary, email_address)
-                    if "successfully" in result:
-                        st.success(result)
-                    else:
-                        st.error(result)
+    else:
+        with st.spinner("Generating periodic summary..."):
+            summary = get_conversation_summary(st.session_state.conversation_history, PERIODIC)
+            st.markdown("### Periodic Summary")
+            st.markdown(summary)
+            
+            # Store summary in session state and the conversation store
+            store_summary(summary)
+    
+    # If email is provided, offer to send the periodic summary
+    if email_address:
+        if st.button("Send Periodic Summary via Email"):
+            with st.spinner("Sending periodic summary via email..."):
+                result = send_summary_email(summary, email_address)
+                if "successfully" in result:
+                    st.success(result)
+                else:
+                    st.error(result)
 
 # Status indicators
 st.sidebar.header("📊 Status")
 st.sidebar.success("✅ Ready" if st.session_state.bearer_token else "❌ Not Authenticated")
-st.sidebar.info(f"💬 Messages: {len(st.session_state.conversation_history)}")
+warmup = st.session_state.warmup
+if warmup.done():
+    failed = [name for name, task in warmup.status().items() if task['state'] == 'failed']
+    st.sidebar.caption(f"🔥 Warm-up done in {warmup.elapsed():.1f}s" + (f" ({', '.join(failed)} failed)" if failed else ""))
+else:
+    st.sidebar.caption("🔥 Warming up: " + ", ".join(
+        f"{name} {'✅' if task['state'] == 'ready' else '⚠️' if task['state'] == 'failed' else '⏳'}"
+        for name, task in warmup.status().items()
+    ))
+turn_latency = warmup.latency_report()
+if turn_latency['turns']:
+    st.sidebar.caption(
+        f"⏱️ First turn: {turn_latency['first_seconds']:.1f}s"
+        + (f" · steady state: {turn_latency['steady_seconds']:.1f}s over {turn_latency['turns'] - 1} turns"
+           if turn_latency['steady_seconds'] is not None else "")
+    )
+st.sidebar.info(f"💬 Messages: {total_turns()}")
+st.sidebar.caption(f"🧾 Session: `{st.session_state.session_id}`")
+st.sidebar.checkbox("🔬 Profile voice turns", key='profile_turns')
+profiler_stats = get_turn_profiler().stats
+if profiler_stats['profiled']:
+    recent_profiles = get_turn_profiler().recent()
+    st.sidebar.caption(
+        f"🔬 Profiles: {profiler_stats['profiled']} of {profiler_stats['turns']} turns, "
+        f"{len(recent_profiles)} kept in `{get_turn_profiler().directory}`"
+        + (f" (latest `{recent_profiles[0]}`)" if recent_profiles else "")
+    )
+memory_state = st.session_state.conversation_memory
+if memory_state.summarized_turns or memory_state.entities:
+    st.sidebar.caption(
+        f"🧠 Memory: {memory_state.summarized_turns} turns summarized, "
+        f"{sum(len(values) for values in memory_state.entities.values())} key details"
+    )
+enforce_memory_budget()
+session_usage = get_session_memory().usage(st.session_state.session_id)
+process_bytes, active_sessions = get_session_memory().process_usage()
+st.sidebar.caption(
+    f"💾 Session state: {session_usage['total'] / 1024:.0f} KB of "
+    f"{get_session_memory().budget_for(st.session_state.session_id) / 1024:.0f} KB "
+    f"({', '.join(f'{name} {size / 1024:.0f} KB' for name, size in session_usage['parts'].items())}); "
+    f"process {process_bytes / 1024 / 1024:.1f} MB over {active_sessions} sessions"
+)
+prompt_bundle = get_prompt_bundle()
+st.sidebar.caption(
+    f"🔈 Prompt audio: {len(prompt_bundle)} clips, {prompt_bundle.stats['hits']} played"
+    if len(prompt_bundle) else
+    f"🔈 Prompt audio: {'damaged' if prompt_bundle.error else 'not built'} (run `python prompt_audio.py build`)"
+)
+if st.session_state.get('last_audio_prep'):
+    audio_prep = st.session_state.last_audio_prep
+    st.sidebar.caption(
+        f"🎚️ Last upload: {audio_prep['prepared_seconds']:.1f}s at 16 kHz "
+        f"(captured {audio_prep['original_seconds']:.1f}s at {audio_prep['original_rate'] // 1000} kHz)"
+    )
+if st.session_state.recognition_calls:
+    calls_per_turn = sum(st.session_state.recognition_calls) / len(st.session_state.recognition_calls)
+    st.sidebar.caption(f"🎯 Recognition calls/turn: {calls_per_turn:.1f}")
+if st.session_state.get('transcript_cache_stats'):
+    cache_stats = st.session_state.transcript_cache_stats
+    cache_hits = cache_stats['exact_hits'] + cache_stats['near_hits']
+    st.sidebar.caption(
+        f"🗂️ Transcript cache: {cache_hits}/{cache_stats['lookups']} hits "
+        f"({cache_stats['exact_hits']} exact, {cache_stats['near_hits']} near)"
+    )
+speculation_stats = st.session_state.speculative_prefetcher.stats
+if speculation_stats['started']:
+    st.sidebar.caption(
+        f"⚡ Speculation: {speculation_stats['adopted']}/{speculation_stats['started']} adopted, "
+        f"{speculation_stats['saved_seconds']:.1f}s saved, {speculation_stats['wasted_tokens']} tokens wasted"
+    )
 
 # Current language status
 if st.session_state.detected_language:
-    lang_names = {
-        'en': 'English', 'hi': 'Hindi', 'ta': 'Tamil'
-    }
-    current_lang = lang_names.get(st.session_state.detected_language, 'Unknown')
+    current_lang = LANGUAGE_NAMES_EN.get(st.session_state.detected_language, 'Unknown')
     st.sidebar.info(f"🗣️ Language: {current_lang}")
 
+# Generation profiles: token counts and time per profile
+generation_stats = get_generation_stats()
+if generation_stats:
+    with st.sidebar.expander("🧮 Generation Profiles"):
+        for profile_name, stats in generation_stats.items():
+            st.caption(
+                f"**{profile_name}**: {stats['calls']} calls, "
+                f"{stats['avg_input_tokens']:.0f} in / {stats['avg_generated_tokens']:.0f} out tokens avg, "
+                f"{stats['avg_seconds']:.1f}s avg, {stats['max_tokens_stops']} hit the cap"
+            )
+
+# Model routing: calls, latency, fallbacks and token spend per tier
+routing_stats = get_router().snapshot()
+if any(stats['calls'] for stats in routing_stats['tiers'].values()):
+    with st.sidebar.expander("🧭 Model Routing"):
+        for tier, stats in routing_stats['tiers'].items():
+            st.caption(
+                f"**{tier}** ({stats['model_id']}): {stats['calls']} calls, {stats['avg_seconds']:.1f}s avg, "
+                f"{stats['input_tokens']} in / {stats['generated_tokens']} out tokens, "
+                f"{stats['fallbacks']} fell back"
+            )
+        st.caption("Routed by: " + ", ".join(f"{reason} {count}" for reason, count in routing_stats['classes'].items()))
+
+# Shared coordination between workers: token, caches and rate limits
+coordination_stats = get_coordinator().stats
+with st.sidebar.expander("🔗 Coordination"):
+    st.caption(f"Backend: {get_coordinator().backend.name}")
+    st.caption(
+        f"IAM token: {coordination_stats['token_hits']} shared, {coordination_stats['token_fetches']} fetched"
+    )
+    st.caption(f"Cache: {coordination_stats['cache_hits']} hits, {coordination_stats['cache_misses']} misses")
+    st.caption(
+        f"Rate limits: {coordination_stats['admitted']} admitted, {coordination_stats['refused']} refused, "
+        f"{coordination_stats['waited_seconds']:.1f}s waited (max {coordination_stats['max_wait_seconds']:.1f}s)"
+    )
+
+# Admission control: queue depth, shedding and wait per stage
+with st.sidebar.expander("🚦 Scheduler"):
+    for stage_name, stage in get_scheduler().snapshot().items():
+        shed = stage['shed_deadline'] + stage['shed_stale'] + stage['shed_overflow']
+        st.caption(
+            f"**{stage_name}**: {stage['running']}/{stage['concurrency']} running, {stage['depth']} queued "
+            f"(max {stage['max_depth']}), {shed} shed, wait p50 {stage['wait_p50']:.2f}s / p99 {stage['wait_p99']:.2f}s"
+        )
+    st.caption("Priority: " + " > ".join(PRIORITY_NAMES[p] for p in sorted(PRIORITY_NAMES)))
+
+# Startup profile
+startup_report = get_startup_report()
+with st.sidebar.expander("⏱️ Startup Profile"):
+    budget_line = f"Imports: {startup_report['total_import_ms']:.0f} ms / {startup_report['budget_ms']:.0f} ms budget"
+    if startup_report['over_budget']:
+        st.warning(budget_line)
+    else:
+        st.caption(budget_line)
+    for module_name, import_ms in startup_report['imports'].items():
+        st.caption(f"{module_name}: {import_ms:.0f} ms")
+    if startup_report['cold_run_ms'] is not None:
+        st.caption(f"Cold run: {startup_report['cold_run_ms']:.0f} ms · Last rerun: {startup_report['last_run_ms']:.0f} ms")
+
 # Help section
 
 
@@ -1213,6 +1063,7 @@ if st.session_state.detected_language:
 def get_available_voices():
     """Get list of available voices for debugging"""
     try:
+        pyttsx3 = lazy_import("pyttsx3")
         engine = pyttsx3.init()
         voices = engine.getProperty('voices')
         voice_info = []
@@ -1226,3 +1077,6 @@ def get_available_voices():
         return voice_info
     except Exception as e:
         return [{'error': str(e)}]
+
+
+finish_rerun(_rerun_started)
@@ -0,0 +1,263 @@
+"""Audio output pipeline for synthesized speech.
+
+Both TTS engines render into a common intermediate: mono 16-bit PCM at
+``OUTPUT_SAMPLE_RATE``. gTTS MP3 chunks are decoded and pyttsx3 renders to
+an in-memory WAV instead of the local speakers. Sentence chunks are
+resampled and concatenated as PCM, loudness-capped, and encoded once to
+Opus, so every engine sends the same compact format to the browser.
+
+Opus encoding and MP3 decoding need an ``ffmpeg`` binary (on PATH or in
+``FFMPEG_BINARY``), so ffmpeg is required for the loudness-capped Opus
+path. Without it, gTTS chunks are joined at the MP3 frame level without
+re-encoding or the loudness cap, and pyttsx3 output is sent as
+loudness-capped 16 kHz WAV. Both fallbacks log a warning.
+
+pyttsx3's driver is initialized once per process (the session warm-up
+does it ahead of the first fallback) and shared; renders take turns on it.
+"""
+import io
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+
+import numpy as np
+
+from language_registry import TTS_LANGUAGE_MAPPING
+from startup_profiler import lazy_import
+
+# Intermediate PCM format (gTTS' native rate)
+OUTPUT_SAMPLE_RATE = 24000
+
+# Sample rate for the uncompressed fallback when ffmpeg is not available
+WAV_FALLBACK_SAMPLE_RATE = 16000
+
+# Loudness cap: RMS target and peak ceiling, in dBFS
+LOUDNESS_CAP_DBFS = -16.0
+PEAK_CAP_DBFS = -1.0
+
+OPUS_BITRATE = os.getenv("TTS_OPUS_BITRATE", "24k")
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY") or shutil.which("ffmpeg")
+
+# gTTS handles up to ~100 characters per request well; keep sentences near that
+MAX_SENTENCE_CHARS = 200
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r'(?<=[.!?।॥])\s+')
+
+_pyttsx3_engine = None
+_pyttsx3_lock = threading.Lock()
+
+
+def split_sentences(text, max_chars=MAX_SENTENCE_CHARS):
+    """Split text into sentence chunks no longer than ``max_chars``"""
+    chunks = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+def _run_ffmpeg(args, data):
+    """Run ffmpeg with ``data`` on stdin and return stdout"""
+    result = subprocess.run(
+        [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', *args],
+        input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout
+
+
+def decode_mp3(data, sample_rate=OUTPUT_SAMPLE_RATE):
+    """Decode MP3 bytes to mono int16 PCM at ``sample_rate`` (requires ffmpeg)"""
+    raw = _run_ffmpeg(['-i', 'pipe:0', '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'], data)
+    return np.frombuffer(raw, dtype=np.int16)
+
+
+def read_wav(data):
+    """Read WAV bytes into (mono int16 PCM, sample rate)"""
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    if width == 1:
+        pcm = (np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128) << 8
+    elif width == 2:
+        pcm = np.frombuffer(frames, dtype=np.int16)
+    elif width == 4:
+        pcm = (np.frombuffer(frames, dtype=np.int32) >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return pcm, rate
+
+
+def resample(pcm, source_rate, target_rate):
+    """Resample mono PCM with linear interpolation"""
+    if source_rate == target_rate or len(pcm) == 0:
+        return pcm
+    duration = len(pcm) / source_rate
+    target_length = int(round(duration * target_rate))
+    source_times = np.arange(len(pcm)) / source_rate
+    target_times = np.arange(target_length) / target_rate
+    return np.interp(target_times, source_times, pcm.astype(np.float32)).astype(np.int16)
+
+
+def cap_loudness(pcm, rms_cap_dbfs=LOUDNESS_CAP_DBFS, peak_cap_dbfs=PEAK_CAP_DBFS):
+    """Scale PCM down so neither its RMS nor its peak exceed the caps"""
+    if len(pcm) == 0:
+        return pcm
+    samples = pcm.astype(np.float32) / 32768.0
+    rms = float(np.sqrt(np.mean(samples ** 2)))
+    peak = float(np.max(np.abs(samples)))
+    gain = 1.0
+    if rms > 0:
+        gain = min(gain, 10 ** (rms_cap_dbfs / 20) / rms)
+    if peak > 0:
+        gain = min(gain, 10 ** (peak_cap_dbfs / 20) / peak)
+    if gain >= 1.0:
+        return pcm
+    return np.clip(samples * gain * 32768.0, -32768, 32767).astype(np.int16)
+
+
+def encode_pcm(pcm, sample_rate=OUTPUT_SAMPLE_RATE):
+    """Encode PCM once for the wire: Opus if ffmpeg is available, else 16 kHz WAV
+
+    Returns ``(bytes, mime_type)``.
+    """
+    if FFMPEG_BINARY:
+        data = _run_ffmpeg([
+            '-f', 's16le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+            '-c:a', 'libopus', '-b:a', OPUS_BITRATE, '-application', 'voip', '-f', 'ogg', 'pipe:1'
+        ], pcm.tobytes())
+        return data, 'audio/ogg'
+
+    logger.warning("ffmpeg not found; sending uncompressed WAV instead of Opus")
+    pcm = resample(pcm, sample_rate, WAV_FALLBACK_SAMPLE_RATE)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(WAV_FALLBACK_SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue(), 'audio/wav'
+
+
+def strip_id3(data):
+    """Remove a leading ID3v2 tag so MP3 chunks can be joined frame to frame"""
+    if data[:3] == b'ID3' and len(data) > 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return data[10 + size:]
+    return data
+
+
+def render_gtts(text, language):
+    """Synthesize one chunk with gTTS and return MP3 bytes"""
+    gTTS = lazy_import("gtts").gTTS
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=TTS_LANGUAGE_MAPPING.get(language, 'en'), slow=False).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def get_pyttsx3_engine():
+    """Process-wide pyttsx3 engine, initialized on first use"""
+    global _pyttsx3_engine
+    with _pyttsx3_lock:
+        if _pyttsx3_engine is None:
+            _pyttsx3_engine = lazy_import("pyttsx3").init()
+        return _pyttsx3_engine
+
+
+def render_pyttsx3(text, language):
+    """Synthesize text with pyttsx3 into memory and return (PCM, sample rate)"""
+    engine = get_pyttsx3_engine()
+    # The engine is shared: one render at a time, each setting its own voice
+    with _pyttsx3_lock:
+        return _render_with(engine, text, language)
+
+
+def _render_with(engine, text, language):
+    """Body of ``render_pyttsx3``; the caller holds the engine lock"""
+    voices = engine.getProperty('voices')
+
+    # Try to find a voice for the detected language
+    for voice in voices:
+        voice_lang = getattr(voice, 'languages', [])
+        voice_id = voice.id.lower()
+
+        if language != 'en':
+            if (any(language in lang for lang in voice_lang) or
+                    language in voice_id or
+                    TTS_LANGUAGE_MAPPING.get(language, '') in voice_id):
+                engine.setProperty('voice', voice.id)
+                break
+    else:
+        engine.setProperty('voice', voices[0].id)
+
+    engine.setProperty('rate', 150)
+    engine.setProperty('volume', 0.9)
+
+    # pyttsx3 can only render to a path; read it back and delete it straight away
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
+        temp_filename = temp_file.name
+    try:
+        engine.save_to_file(text, temp_filename)
+        engine.runAndWait()
+        engine.stop()
+        with open(temp_filename, 'rb') as audio_file:
+            return read_wav(audio_file.read())
+    finally:
+        try:
+            os.unlink(temp_filename)
+        except OSError:
+            pass
+
+
+def iter_speech_pcm(parts, engine='gtts'):
+    """Yield PCM chunks at OUTPUT_SAMPLE_RATE for each sentence of each (language, text) part"""
+    for language, text in parts:
+        for sentence in split_sentences(text):
+            if engine == 'gtts':
+                yield decode_mp3(render_gtts(sentence, language))
+            else:
+                pcm, rate = render_pyttsx3(sentence, language)
+                yield resample(pcm, rate, OUTPUT_SAMPLE_RATE)
+
+
+def synthesize_speech(parts, engine='gtts'):
+    """Synthesize (language, text) parts into one compact clip for the browser
+
+    Returns a dict with ``data`` (encoded bytes), ``format`` (MIME type) and
+    ``duration`` (seconds of speech).
+    """
+    if engine == 'gtts' and not FFMPEG_BINARY:
+        # No decoder: join the MP3 chunks frame to frame without re-encoding
+        logger.warning("ffmpeg not found; sending gTTS MP3 without the loudness cap or Opus encoding")
+        chunks = [
+            strip_id3(render_gtts(sentence, language))
+            for language, text in parts
+            for sentence in split_sentences(text)
+        ]
+        data = b''.join(chunks)
+        # gTTS streams are 32 kbit/s mono, which gives the duration
+        return {'data': data, 'format': 'audio/mp3', 'duration': len(data) / 4000}
+
+    pcm_chunks = list(iter_speech_pcm(parts, engine))
+    pcm = np.concatenate(pcm_chunks) if pcm_chunks else np.zeros(0, dtype=np.int16)
+    pcm = cap_loudness(pcm)
+    data, mime = encode_pcm(pcm)
+    return {'data': data, 'format': mime, 'duration': len(pcm) / OUTPUT_SAMPLE_RATE}
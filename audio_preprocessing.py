@@ -0,0 +1,126 @@
+"""Preprocessing of captured audio before speech recognition.
+
+``recognizer.listen`` returns everything it captured: up to 45 seconds
+at the device rate (often 44.1 or 48 kHz), including leading and trailing
+silence. Previously ``recognize_google`` converted and FLAC-encoded all
+of it for every language attempt. ``prepare_for_recognition``:
+
+  * trims leading and trailing silence using frame energy relative to
+    the clip's noise floor and peak, keeping a little padding
+  * normalizes the peak level, with a capped boost for quiet speakers
+  * low-pass filters and resamples to 16 kHz mono 16-bit, the format
+    the recognizer wants anyway
+  * returns a ``PreparedAudioData`` that encodes FLAC once and reuses
+    the payload for every later attempt
+"""
+import numpy as np
+import speech_recognition as sr
+
+RECOGNITION_SAMPLE_RATE = 16000
+
+# Silence trimming: analysis frame, margin over the noise floor, floor relative to the peak, padding kept
+FRAME_MS = 20
+NOISE_MARGIN_DB = 12.0
+PEAK_FLOOR_DB = -40.0
+PADDING_MS = 250
+
+# Gain normalization: target peak level and the largest boost applied
+TARGET_PEAK_DBFS = -3.0
+MAX_GAIN_DB = 20.0
+
+# Low-pass filter length (taps) used before downsampling
+LOWPASS_TAPS = 63
+
+
+class PreparedAudioData(sr.AudioData):
+    """AudioData whose encoded payloads are computed once and cached"""
+
+    def __init__(self, frame_data, sample_rate, sample_width):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self._flac_cache = {}
+        self.encodings = 0
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        key = (convert_rate, convert_width)
+        data = self._flac_cache.get(key)
+        if data is None:
+            data = super().get_flac_data(convert_rate, convert_width)
+            self._flac_cache[key] = data
+            self.encodings += 1
+        return data
+
+
+def audio_to_pcm(audio):
+    """Mono int16 samples from an AudioData"""
+    return np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16)
+
+
+def trim_silence(pcm, sample_rate, frame_ms=FRAME_MS, padding_ms=PADDING_MS):
+    """Return (start, end) sample bounds of the speech in ``pcm``, with padding
+
+    A frame counts as speech when its RMS is ``NOISE_MARGIN_DB`` above the
+    noise floor (the 10th percentile frame) and within ``PEAK_FLOOR_DB`` of
+    the loudest frame. If no frame qualifies, the whole clip is kept.
+    """
+    frame = max(1, sample_rate * frame_ms // 1000)
+    count = len(pcm) // frame
+    if count == 0:
+        return 0, len(pcm)
+    frames = pcm[:count * frame].astype(np.float32).reshape(count, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-3
+    noise_floor = np.percentile(rms, 10)
+    threshold = max(noise_floor * 10 ** (NOISE_MARGIN_DB / 20), rms.max() * 10 ** (PEAK_FLOOR_DB / 20))
+    speech = np.flatnonzero(rms > threshold)
+    if len(speech) == 0:
+        return 0, len(pcm)
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, speech[0] * frame - padding)
+    end = min(len(pcm), (speech[-1] + 1) * frame + padding)
+    return start, end
+
+
+def normalize_gain(pcm, target_peak_dbfs=TARGET_PEAK_DBFS, max_gain_db=MAX_GAIN_DB):
+    """Scale so the peak sits at ``target_peak_dbfs``, boosting by at most ``max_gain_db``"""
+    if len(pcm) == 0:
+        return pcm
+    peak = float(np.max(np.abs(pcm.astype(np.int32))))
+    if peak == 0:
+        return pcm
+    gain = min(10 ** (target_peak_dbfs / 20) * 32767 / peak, 10 ** (max_gain_db / 20))
+    return np.clip(pcm.astype(np.float32) * gain, -32768, 32767).astype(np.int16)
+
+
+def downsample(pcm, source_rate, target_rate=RECOGNITION_SAMPLE_RATE):
+    """Resample to ``target_rate``, low-pass filtering first when the rate drops"""
+    if source_rate == target_rate or len(pcm) == 0:
+        return pcm
+    samples = pcm.astype(np.float32)
+    if target_rate < source_rate:
+        # Windowed-sinc low-pass just below the new Nyquist frequency to avoid aliasing
+        cutoff = 0.45 * target_rate / source_rate
+        taps = np.arange(LOWPASS_TAPS) - (LOWPASS_TAPS - 1) / 2
+        kernel = np.sinc(2 * cutoff * taps) * np.hamming(LOWPASS_TAPS)
+        samples = np.convolve(samples, kernel / kernel.sum(), mode='same')
+    target_length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(target_length) * (source_rate / target_rate)
+    resampled = np.interp(positions, np.arange(len(samples)), samples)
+    return np.clip(resampled, -32768, 32767).astype(np.int16)
+
+
+def prepare_for_recognition(audio):
+    """Trim, normalize and resample captured audio once for all recognition attempts
+
+    Returns ``(PreparedAudioData, stats)``, where stats records the
+    original and prepared durations and raw sizes.
+    """
+    pcm = audio_to_pcm(audio)
+    start, end = trim_silence(pcm, audio.sample_rate)
+    prepared = downsample(normalize_gain(pcm[start:end]), audio.sample_rate)
+    stats = {
+        'original_seconds': len(pcm) / audio.sample_rate,
+        'prepared_seconds': len(prepared) / RECOGNITION_SAMPLE_RATE,
+        'original_bytes': len(audio.frame_data),
+        'prepared_bytes': prepared.nbytes,
+        'original_rate': audio.sample_rate,
+    }
+    return PreparedAudioData(prepared.tobytes(), RECOGNITION_SAMPLE_RATE, 2), stats
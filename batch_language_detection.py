@@ -0,0 +1,198 @@
+"""Batch language detection over transcript archives.
+
+Reads transcripts from JSONL or CSV in a streaming fashion and scores
+them in chunks with the trained model of ``language_model``. The n-grams
+of a whole chunk are hashed in one NumPy pass, and the chunk is scored
+with one matrix product. The language is then picked by
+``language_detection.language_from_scores``, so every row gets the same
+result as ``detect_language``. The per-row ``detect_segments`` pass is
+only needed for rows whose label can come from it: rows below the
+confidence threshold, and rows with letters of a script the model was
+not trained on. Those are the only rows segmented. Without a model file,
+and for utterances shorter than ``MODEL_MIN_LETTERS``, texts are scored
+and segmented one at a time by the statistical scorer.
+Chunks fan out over a process pool, and one JSONL result is written per
+input row, in input order.
+
+    python batch_language_detection.py transcripts.jsonl -o languages.jsonl --workers 8
+    python batch_language_detection.py calls.csv --text-field transcript --id-field call_id
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from language_detection import (
+    DETECTION_CONFIDENCE_THRESHOLD,
+    detect_segments,
+    language_from_scores,
+    scored_languages,
+    segment_languages,
+    too_short_for_model,
+    utterance_scores,
+)
+from language_model import feature_matrix, get_language_model
+from language_registry import REGISTRY
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def chunk_scores(texts, model, registry=REGISTRY):
+    """Model scores of each text as ``utterance_scores`` gives them, and the rows that need segmenting
+
+    A row needs ``detect_segments`` when its best score is below the
+    confidence threshold, or when it has letters of a script whose
+    segment language the model cannot score.
+    """
+    features = feature_matrix(texts, model.hash_bits)
+    languages = [lang for lang in registry.enabled if lang in model.languages]
+    if languages:
+        columns = [model.languages.index(lang) for lang in languages]
+        probabilities = model.probabilities_features(features, languages)[:, columns]
+        needs_segments = probabilities.max(axis=1) < DETECTION_CONFIDENCE_THRESHOLD
+    else:
+        probabilities = np.zeros((len(texts), 0))
+        needs_segments = np.ones(len(texts), dtype=bool)
+
+    unscored = [index for index, labels in enumerate(segment_languages(registry).values())
+                if not labels <= set(model.languages)]
+    if unscored:
+        shares = features[:, (1 << model.hash_bits) + np.array(unscored)]
+        needs_segments |= (shares > 0).any(axis=1)
+    return [dict(zip(languages, row)) for row in probabilities.tolist()], needs_segments.tolist()
+
+
+def detect_chunk(texts, registry=REGISTRY):
+    """Detect languages for a chunk of texts; returns (language, confidence, scores) per text"""
+    stripped = [text.strip() if text else '' for text in texts]
+    scorable = [i for i, text in enumerate(stripped) if len(text) >= 2]
+    model = get_language_model()
+    results = [('en', None, None)] * len(texts)
+    if not scorable:
+        return results
+    # Rows too short for the model are scored statistically, as detect_language does
+    statistical = {i for i in scorable if model is None or too_short_for_model(stripped[i])}
+    modelled = [i for i in scorable if i not in statistical]
+    scores, needs_segments = {}, {}
+    if modelled:
+        rows, flags = chunk_scores([stripped[i] for i in modelled], model, registry)
+        scores.update(zip(modelled, rows))
+        needs_segments.update(zip(modelled, flags))
+    for i in statistical:
+        scores[i] = utterance_scores(stripped[i], None, registry)
+        needs_segments[i] = True
+
+    for i in scorable:
+        row_model = None if i in statistical else model
+        if needs_segments[i]:
+            segmentation = detect_segments(stripped[i], registry)
+            text_scores = scores[i] if segmentation['dominant'] in scored_languages(row_model) else None
+            language, details = language_from_scores(segmentation, text_scores, row_model)
+            language_scores, confidence = details['scores'], details['confidence']
+        else:
+            # Confident, and every language segmenting could name is scored: the best score decides
+            language_scores = scores[i]
+            language, confidence = max(language_scores.items(), key=lambda x: x[1])
+        results[i] = (language, confidence, {lang: round(score, 4) for lang, score in language_scores.items()})
+    return results
+
+
+def read_records(path, text_field='text', id_field=None, input_format=None):
+    """Yield (record_id, text) from a JSONL or CSV file (``-`` for stdin), streaming"""
+    if input_format is None:
+        input_format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+    stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        if input_format == 'csv':
+            for line_number, row in enumerate(csv.DictReader(stream)):
+                yield row.get(id_field, line_number) if id_field else line_number, row.get(text_field) or ''
+        else:
+            for line_number, line in enumerate(stream):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield record.get(id_field, line_number) if id_field else line_number, record.get(text_field) or ''
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _chunks(records, chunk_size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def detect_records(records, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (record_id, language, confidence, scores) for each record, in input order
+
+    Chunks are scored in a process pool with a bounded number of chunks in
+    flight, so arbitrarily large inputs stream with constant memory.
+    """
+    if workers <= 1:
+        for chunk in _chunks(records, chunk_size):
+            for (record_id, _), result in zip(chunk, detect_chunk([text for _, text in chunk])):
+                yield (record_id, *result)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(records, chunk_size):
+            ids = [record_id for record_id, _ in chunk]
+            pending.append((ids, pool.submit(detect_chunk, [text for _, text in chunk])))
+            if len(pending) >= workers * 2:
+                ids, future = pending.popleft()
+                for record_id, result in zip(ids, future.result()):
+                    yield (record_id, *result)
+        while pending:
+            ids, future = pending.popleft()
+            for record_id, result in zip(ids, future.result()):
+                yield (record_id, *result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch language detection over transcript archives")
+    parser.add_argument("input", help="JSONL or CSV file, or - for JSONL on stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format (default: from extension)")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--id-field", help="field to copy into the output as 'id' (default: row number)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    records = read_records(args.input, args.text_field, args.id_field, args.format)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    count = 0
+    try:
+        for record_id, language, confidence, scores in detect_records(records, args.workers, args.chunk_size):
+            output.write(json.dumps({
+                'id': record_id,
+                'language': language,
+                'confidence': confidence,
+                'scores': scores
+            }, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{count} texts in {elapsed:.2f} s ({count / elapsed if elapsed else 0:.0f} texts/sec, "
+          f"{args.workers} workers)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
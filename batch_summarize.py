@@ -0,0 +1,406 @@
+"""Batch end-of-day summarization and delivery for stored conversations.
+
+Summaries used to be made one conversation at a time from the UI and
+emailed to a single address. This job works through a whole day instead:
+
+  * completed sessions are streamed from the conversation store: those
+    updated in the ``--since``/``--until`` window and idle for at least
+    ``--idle-minutes``
+  * they are summarized on a thread pool with at most ``--in-flight``
+    LLM requests outstanding. A stored summary that covers every turn is
+    reused, and one that covers the first turns is updated with the rest
+    only, as the UI does.
+  * each summary is appended to a JSONL checkpoint as soon as it is done.
+    A crashed run is started again with the same checkpoint and skips
+    every session already in it (unless it was updated since).
+  * summaries are grouped by recipient: routes map a session's language,
+    or ``*``, to email addresses and Slack webhook URLs. Each recipient
+    gets one digest email or a few Slack posts. Deliveries are recorded
+    in the checkpoint too, per session version, so a resumed run does not
+    send them twice and a session summarized again after an update is
+    sent again. ``--dry-run`` prints the digests and records nothing
+    as delivered.
+
+Rate limits and the IAM token are shared with the app through
+``coordination``, and summaries are routed to the small model like
+interactive ones.
+
+    python batch_summarize.py --since 2026-10-19 --routes routes.json
+    python batch_summarize.py --since 2026-10-19 --in-flight 16 --dry-run
+"""
+import argparse
+import html
+import json
+import os
+import smtplib
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from conversation_store import DEFAULT_DB_PATH, ConversationStore
+from http_pool import get_http_session
+from language_registry import LANGUAGE_NAMES_EN
+from model_router import get_router
+from watsonx_client import build_summary_prompt, get_bearer_token
+
+# LLM requests outstanding at once
+SUMMARY_IN_FLIGHT = int(os.getenv("SUMMARY_IN_FLIGHT", "8"))
+
+# Sessions idle for this long are complete
+SUMMARY_IDLE_MINUTES = float(os.getenv("SUMMARY_IDLE_MINUTES", "30"))
+
+# Attempts per summary, and the first backoff between them in seconds (doubled each time)
+SUMMARY_ATTEMPTS = 3
+SUMMARY_RETRY_BACKOFF = 2.0
+
+# Recipients of sessions without a language route: comma-separated emails and Slack webhook URLs
+SUMMARY_DIGEST_RECIPIENTS = os.getenv("SUMMARY_DIGEST_RECIPIENTS", "")
+
+# Conversations per Slack post (a message holds at most 50 blocks)
+SLACK_CONVERSATIONS_PER_POST = 40
+
+DIGEST_BOT_NAME = "Ava"
+
+
+def completed_sessions(store, since=None, until=None, idle_seconds=SUMMARY_IDLE_MINUTES * 60, now=None):
+    """Yield (session_id, updated_at) of sessions updated in the window and idle long enough, streaming"""
+    idle_cutoff = (now or time.time()) - idle_seconds
+    yield from store.list_sessions(since, min(until or float('inf'), idle_cutoff))
+
+
+def summarize_session(store, session_id, generate, attempts=SUMMARY_ATTEMPTS, backoff=SUMMARY_RETRY_BACKOFF):
+    """Summary record of a stored session, or None if it has no turns; ``generate(prompt)`` returns the LLM's text"""
+    session = store.load_session(session_id)
+    if session is None or not session['turn_count']:
+        return None
+    record = {
+        'session_id': session_id,
+        'updated_at': session['updated_at'],
+        'language': session['detected_language'] or 'en',
+        'turns': session['turn_count'],
+        'llm_calls': 0,
+    }
+    covered = session['last_summary_turns'] or 0
+    if session['last_summary'] and covered >= session['turn_count']:
+        return dict(record, summary=session['last_summary'])
+
+    turns = [(role, text) for _, role, text in store.load_turns(session_id, limit=session['turn_count'])]
+    if session['last_summary'] and covered:
+        prompt = build_summary_prompt(turns[covered:], session['last_summary'])
+    else:
+        prompt = build_summary_prompt(turns)
+
+    for attempt in range(attempts):
+        record['llm_calls'] += 1
+        summary = generate(prompt)
+        if summary and not summary.startswith("Error"):
+            return dict(record, summary=summary.strip())
+        if attempt + 1 < attempts:
+            time.sleep(backoff * 2 ** attempt)
+    raise RuntimeError(f"Could not summarize {session_id}: {summary}")
+
+
+def summarize_sessions(store, sessions, generate, in_flight=SUMMARY_IN_FLIGHT, skip=None):
+    """Yield (record, error) per session as summaries finish, with at most ``in_flight`` in progress
+
+    ``skip(session_id, updated_at)`` leaves out sessions that are already done.
+    """
+    with ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix="batch-summary") as pool:
+        pending = {}
+        for session_id, updated_at in sessions:
+            if skip is not None and skip(session_id, updated_at):
+                continue
+            pending[pool.submit(summarize_session, store, session_id, generate)] = session_id
+            if len(pending) >= in_flight:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield _outcome(pending.pop(future), future)
+        for future in as_completed(list(pending)):
+            yield _outcome(pending.pop(future), future)
+
+
+def _outcome(session_id, future):
+    try:
+        return future.result(), None
+    except Exception as e:
+        return {'session_id': session_id}, str(e)
+
+
+class Checkpoint:
+    """Append-only JSONL log of finished summaries and deliveries"""
+
+    def __init__(self, path):
+        self.path = path
+        self.summaries = {}
+        self.delivered = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as log:
+                for line in log:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash
+                        continue
+                    self._apply(entry)
+        self._log = open(path, "a", encoding="utf-8")
+
+    def _apply(self, entry):
+        if entry['type'] == 'summary':
+            self.summaries[entry['session_id']] = entry
+        elif entry['type'] == 'delivery':
+            self.delivered.update((entry['recipient'], session_id, updated_at)
+                                  for session_id, updated_at in entry['sessions'])
+
+    def _append(self, entry):
+        with self._lock:
+            self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._apply(entry)
+
+    def done(self, session_id, updated_at):
+        entry = self.summaries.get(session_id)
+        return entry is not None and entry['updated_at'] >= updated_at
+
+    def record_summary(self, record):
+        self._append(dict(record, type='summary'))
+
+    def record_delivery(self, recipient, records):
+        sessions = [[record['session_id'], record['updated_at']] for record in records]
+        self._append({'type': 'delivery', 'recipient': recipient, 'sessions': sessions})
+
+    def close(self):
+        self._log.close()
+
+
+def load_routes(path=None):
+    """Language code (or ``*``) -> recipients, from a JSON file or SUMMARY_DIGEST_RECIPIENTS"""
+    if path:
+        with open(path, encoding="utf-8") as routes_file:
+            return json.load(routes_file)
+    recipients = [recipient.strip() for recipient in SUMMARY_DIGEST_RECIPIENTS.split(",") if recipient.strip()]
+    return {'*': recipients} if recipients else {}
+
+
+def digest_groups(summaries, routes, delivered=()):
+    """Recipient -> summary records whose current version was not yet delivered to it, oldest first"""
+    groups = {}
+    for record in sorted(summaries, key=lambda record: record['updated_at']):
+        for recipient in routes.get(record['language'], routes.get('*', [])):
+            if (recipient, record['session_id'], record['updated_at']) not in delivered:
+                groups.setdefault(recipient, []).append(record)
+    return groups
+
+
+def is_slack_webhook(recipient):
+    return recipient.startswith(("https://", "http://"))
+
+
+def _conversation_heading(record):
+    language = LANGUAGE_NAMES_EN.get(record['language'], record['language'])
+    ended = datetime.fromtimestamp(record['updated_at']).strftime('%I:%M %p')
+    return f"Session {record['session_id'][:8]} · {language} · {record['turns']} turns · ended {ended}"
+
+
+def render_email_digest(records, day):
+    """Subject and HTML body of one recipient's digest"""
+    subject = f"{DIGEST_BOT_NAME} – {len(records)} conversation summaries • {day}"
+    sections = "".join(
+        f"""<h3 style="color: #4B0082; margin-bottom: 4px;">{html.escape(_conversation_heading(record))}</h3>
+                <div style="background-color: #f0f0f5; padding: 15px; border-left: 5px solid #4B0082; border-radius: 6px; margin: 0 0 20px;">
+                    {html.escape(record['summary'])}
+                </div>"""
+        for record in records
+    )
+    body = f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; color: #333;">
+                <h2 style="color: #4B0082;">Hi there! I'm {DIGEST_BOT_NAME} 👋</h2>
+                <p>Here are the summaries of the {len(records)} conversations that ended on {day}:</p>
+                {sections}
+                <p>With warm regards,</p>
+                <p style="font-size: 16px; font-weight: bold;">{DIGEST_BOT_NAME}<br>
+                <span style="font-size: 14px; font-weight: normal;">Your Voice Companion</span></p>
+            </body>
+        </html>
+        """
+    return subject, body
+
+
+def render_slack_digest(records, day):
+    """Slack messages of one recipient's digest, each within the block limit"""
+    messages = []
+    for start in range(0, len(records), SLACK_CONVERSATIONS_PER_POST):
+        chunk = records[start:start + SLACK_CONVERSATIONS_PER_POST]
+        blocks = [{
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": f"📬 {DIGEST_BOT_NAME} – conversation digest for {day} "
+                        f"({start + 1}–{start + len(chunk)} of {len(records)})",
+                "emoji": True
+            }
+        }]
+        blocks.extend({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*{_conversation_heading(record)}*\n> {record['summary'].replace(chr(10), chr(10) + '> ')}"
+            }
+        } for record in chunk)
+        messages.append({"blocks": blocks})
+    return messages
+
+
+def send_email(recipient, subject, body):
+    """Send an HTML email with the SMTP settings the app uses"""
+    sender_email = os.getenv("EMAIL_SENDER")
+    email_password = os.getenv("EMAIL_PASSWORD")
+    if not all([sender_email, email_password]):
+        raise RuntimeError("Email configuration missing. Please set EMAIL_SENDER and EMAIL_PASSWORD in .env file.")
+    msg = MIMEMultipart()
+    msg['From'] = sender_email
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+    with smtplib.SMTP(os.getenv("SMTP_SERVER", "smtp.gmail.com"), int(os.getenv("SMTP_PORT", "587"))) as server:
+        server.starttls()
+        server.login(sender_email, email_password)
+        server.send_message(msg)
+
+
+def post_to_slack(webhook_url, message):
+    response = get_http_session().post(webhook_url, json=message, timeout=30)
+    response.raise_for_status()
+
+
+def deliver_digests(groups, checkpoint, day, send=send_email, post=post_to_slack):
+    """Send each recipient its digest and record it; returns {recipient: error} for failed deliveries"""
+    failures = {}
+    for recipient, records in groups.items():
+        try:
+            if is_slack_webhook(recipient):
+                for message in render_slack_digest(records, day):
+                    post(recipient, message)
+            else:
+                send(recipient, *render_email_digest(records, day))
+        except Exception as e:
+            failures[recipient] = str(e)
+            continue
+        checkpoint.record_delivery(recipient, records)
+    return failures
+
+
+def llm_summarizer():
+    """``generate(prompt)`` backed by the model router and the shared IAM token"""
+    api_key = os.getenv("API_KEY")
+    if not api_key or not os.getenv("PROJECT_ID"):
+        raise SystemExit("Missing API_KEY or PROJECT_ID in environment variables. Please check your .env file.")
+
+    def generate(prompt):
+        # The token is cached across workers, so this only fetches it when it expires
+        return get_router().generate([], prompt, get_bearer_token(api_key), 'en', profile='summary')
+    return generate
+
+
+def run(store, checkpoint, routes, generate, since=None, until=None, idle_seconds=SUMMARY_IDLE_MINUTES * 60,
+        in_flight=SUMMARY_IN_FLIGHT, day=None, send=send_email, post=post_to_slack, deliver=True, log=sys.stderr):
+    """Summarize the completed sessions not yet in the checkpoint, then deliver the digests; returns counts
+
+    With ``deliver=False`` nothing is sent or recorded as delivered; the
+    undelivered digests are returned in ``counts['digests']``.
+    """
+    start = time.perf_counter()
+    counts = {'summarized': 0, 'reused': 0, 'skipped': 0, 'failed': 0, 'llm_calls': 0}
+
+    def skip(session_id, updated_at):
+        if checkpoint.done(session_id, updated_at):
+            counts['skipped'] += 1
+            return True
+        return False
+
+    sessions = completed_sessions(store, since, until, idle_seconds)
+    for record, error in summarize_sessions(store, sessions, generate, in_flight, skip):
+        if record is None:
+            continue
+        if error:
+            counts['failed'] += 1
+            print(f"{record['session_id']}: {error}", file=log)
+            continue
+        checkpoint.record_summary(record)
+        counts['summarized'] += 1
+        counts['reused'] += record['llm_calls'] == 0
+        counts['llm_calls'] += record['llm_calls']
+    counts['seconds'] = time.perf_counter() - start
+
+    window = [record for record in checkpoint.summaries.values()
+              if (since is None or record['updated_at'] >= since) and (until is None or record['updated_at'] < until)]
+    groups = digest_groups(window, routes, checkpoint.delivered)
+    counts['recipients'] = len(groups)
+    counts['digests'] = groups
+    counts['delivery_failures'] = deliver_digests(
+        groups, checkpoint, day or datetime.now().strftime('%B %d, %Y'), send, post) if deliver else {}
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch end-of-day summarization and delivery for stored conversations")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="conversation store (default: CONVERSATION_DB_PATH)")
+    parser.add_argument("--since", help="ISO date or time; sessions last updated from then (default: today)")
+    parser.add_argument("--until", help="ISO date or time; sessions last updated before then (default: a day later)")
+    parser.add_argument("--idle-minutes", type=float, default=SUMMARY_IDLE_MINUTES,
+                        help="minutes without a turn before a session counts as complete")
+    parser.add_argument("--in-flight", type=int, default=SUMMARY_IN_FLIGHT, help="LLM requests outstanding at once")
+    parser.add_argument("--routes", help="JSON file: language code or * -> emails and Slack webhook URLs "
+                                         "(default: SUMMARY_DIGEST_RECIPIENTS)")
+    parser.add_argument("--checkpoint", help="JSONL checkpoint to resume from (default: summaries-<since>.jsonl)")
+    parser.add_argument("--dry-run", action="store_true", help="summarize, but print the digests instead of sending")
+    args = parser.parse_args(argv)
+
+    since = datetime.fromisoformat(args.since) if args.since else datetime.now().replace(
+        hour=0, minute=0, second=0, microsecond=0)
+    until = datetime.fromisoformat(args.until) if args.until else since + timedelta(days=1)
+    checkpoint = Checkpoint(args.checkpoint or f"summaries-{since.strftime('%Y-%m-%d')}.jsonl")
+    store = ConversationStore(args.db)
+    routes = load_routes(args.routes)
+    if not routes:
+        print("No recipients: pass --routes or set SUMMARY_DIGEST_RECIPIENTS; summaries are checkpointed only",
+              file=sys.stderr)
+
+    day = since.strftime('%B %d, %Y')
+    try:
+        counts = run(
+            store, checkpoint, routes, llm_summarizer(), since.timestamp(), until.timestamp(),
+            args.idle_minutes * 60, args.in_flight, day, deliver=not args.dry_run,
+        )
+    finally:
+        checkpoint.close()
+        store.close()
+
+    if args.dry_run:
+        # Printed only: a later run still sends these digests
+        for recipient, records in counts['digests'].items():
+            if is_slack_webhook(recipient):
+                for message in render_slack_digest(records, day):
+                    print(f"--- Slack post to {recipient}: {len(message['blocks']) - 1} conversations")
+            else:
+                subject, body = render_email_digest(records, day)
+                print(f"--- email to {recipient}: {subject} ({len(body)} bytes)")
+
+    for recipient, error in counts['delivery_failures'].items():
+        print(f"Delivery to {recipient} failed: {error}", file=sys.stderr)
+    rate = counts['summarized'] / counts['seconds'] * 60 if counts['seconds'] else 0
+    print(f"{counts['summarized']} conversations in {counts['seconds']:.1f} s ({rate:.0f} conversations/min, "
+          f"{args.in_flight} in flight); {counts['reused']} reused stored summaries, {counts['skipped']} already "
+          f"checkpointed, {counts['failed']} failed; digests for {counts['recipients']} recipients", file=sys.stderr)
+    if counts['failed'] or counts['delivery_failures']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Bytes on the wire per second of speech for each TTS output path.
+
+Uses a synthetic speech-like signal (a pitch-modulated harmonic tone with
+syllable-rate amplitude modulation) so it runs offline, and compares:
+  * gTTS MP3 as previously sent by st.audio (32 kbit/s, 24 kHz mono)
+  * the raw pyttsx3 WAV (22.05 kHz, 16-bit), previously only played locally
+  * the pipeline's Opus output (needs ffmpeg)
+  * the pipeline's WAV fallback when ffmpeg is missing
+
+    FFMPEG_BINARY=/path/to/ffmpeg python benchmarks/bench_audio_pipeline.py
+"""
+import io
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import audio_pipeline  # noqa: E402
+
+SECONDS = 10.0
+
+
+def speech_like(sample_rate, seconds=SECONDS):
+    """Generate a speech-like test signal as int16 PCM"""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    signal = voice * envelope
+    return (signal / np.max(np.abs(signal)) * 0.9 * 32767).astype(np.int16)
+
+
+def wav_bytes(pcm, sample_rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def main():
+    rows = []
+    pyttsx3_wav = wav_bytes(speech_like(22050), 22050)
+    rows.append(("pyttsx3 WAV 22.05 kHz (before)", len(pyttsx3_wav)))
+
+    ffmpeg = audio_pipeline.FFMPEG_BINARY
+    if ffmpeg:
+        mp3 = audio_pipeline._run_ffmpeg([
+            '-f', 's16le', '-ar', '24000', '-ac', '1', '-i', 'pipe:0',
+            '-c:a', 'libmp3lame', '-b:a', '32k', '-f', 'mp3', 'pipe:1'
+        ], speech_like(24000).tobytes())
+        rows.append(("gTTS-style MP3 32 kbit/s (before)", len(mp3)))
+
+        start = time.perf_counter()
+        pcm, rate = audio_pipeline.read_wav(pyttsx3_wav)
+        pcm = audio_pipeline.cap_loudness(audio_pipeline.resample(pcm, rate, audio_pipeline.OUTPUT_SAMPLE_RATE))
+        opus, _ = audio_pipeline.encode_pcm(pcm)
+        elapsed = time.perf_counter() - start
+        rows.append((f"pipeline Opus {audio_pipeline.OPUS_BITRATE} ({elapsed * 1000:.0f} ms)", len(opus)))
+    else:
+        print("ffmpeg not found; set FFMPEG_BINARY to include the MP3 and Opus rows")
+
+    audio_pipeline.FFMPEG_BINARY = None
+    pcm, rate = audio_pipeline.read_wav(pyttsx3_wav)
+    fallback, _ = audio_pipeline.encode_pcm(audio_pipeline.resample(pcm, rate, audio_pipeline.OUTPUT_SAMPLE_RATE))
+    rows.append(("pipeline WAV fallback 16 kHz", len(fallback)))
+
+    for label, size in rows:
+        print(f"{label:40s} {size / SECONDS:9.0f} bytes/s")
+
+
+if __name__ == "__main__":
+    main()
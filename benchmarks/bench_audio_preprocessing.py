@@ -0,0 +1,130 @@
+"""Upload size and encode latency benchmark for recognition preprocessing.
+
+Writes WAV fixtures of synthetic voiced speech (harmonics under a
+syllable envelope) with background noise, leading silence and trailing
+silence, at common device rates. Each fixture is loaded through
+``sr.AudioFile`` and prepared the way auto-detect mode uses it, with one
+FLAC payload per language attempt:
+
+  * before: the captured AudioData, re-encoded for every attempt
+  * after: ``prepare_for_recognition``, encoded once and reused
+
+Reports payload bytes, local encode time and modelled upload time, and
+checks that the trimmed audio still covers all of the speech.
+
+    python benchmarks/bench_audio_preprocessing.py --attempts 3 --uplink-mbps 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+import speech_recognition as sr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_preprocessing import RECOGNITION_SAMPLE_RATE, prepare_for_recognition, trim_silence  # noqa: E402
+
+# (sample rate, leading silence s, speech s, trailing silence s, speech level)
+FIXTURES = [
+    (44100, 1.5, 3.0, 2.0, 0.5),
+    (48000, 0.8, 6.0, 1.6, 0.3),
+    (48000, 3.0, 2.0, 4.0, 0.05),
+    (16000, 1.0, 8.0, 1.5, 0.6),
+    (44100, 0.2, 12.0, 1.5, 0.4),
+]
+
+
+def synth_speech(seconds, rate, level, rng):
+    """Voiced speech stand-in: a gliding pitch with harmonics, gated into syllables"""
+    times = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * times)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = np.clip(np.sin(2 * np.pi * 3.5 * times + rng.uniform(0, np.pi)), 0, None) ** 0.5
+    return voiced * syllables * level / np.max(np.abs(voiced))
+
+
+def write_fixture(path, rate, lead, speech_seconds, trail, level, rng):
+    noise = lambda seconds: rng.normal(0, 0.004, int(seconds * rate))  # noqa: E731
+    signal = np.concatenate([
+        noise(lead),
+        synth_speech(speech_seconds, rate, level, rng) + noise(speech_seconds),
+        noise(trail),
+    ])
+    pcm = np.clip(signal * 32767, -32768, 32767).astype(np.int16)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return pcm
+
+
+def load(path):
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(path) as source:
+        return recognizer.record(source)
+
+
+def flac_payload(audio):
+    """What recognize_google sends for one attempt"""
+    return audio.get_flac_data(convert_rate=None if audio.sample_rate >= 8000 else 8000, convert_width=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=3, help="recognition attempts per turn (languages)")
+    parser.add_argument("--uplink-mbps", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    uplink = args.uplink_mbps * 1e6 / 8
+    totals = {'before_bytes': 0, 'after_bytes': 0, 'before_seconds': 0.0, 'after_seconds': 0.0}
+    print(f"{'fixture':>22} {'before KB':>10} {'after KB':>9} {'before ms':>10} {'after ms':>9} "
+          f"{'kept s':>7} {'speech ok':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for index, (rate, lead, speech_seconds, trail, level) in enumerate(FIXTURES):
+            path = os.path.join(directory, f"fixture{index}.wav")
+            write_fixture(path, rate, lead, speech_seconds, trail, level, rng)
+            audio = load(path)
+
+            start = time.perf_counter()
+            before_bytes = sum(len(flac_payload(audio)) for _ in range(args.attempts))
+            before_encode = time.perf_counter() - start
+
+            start = time.perf_counter()
+            prepared, stats = prepare_for_recognition(audio)
+            after_bytes = sum(len(flac_payload(prepared)) for _ in range(args.attempts))
+            after_encode = time.perf_counter() - start
+            assert prepared.encodings == 1 and prepared.sample_rate == RECOGNITION_SAMPLE_RATE
+
+            # The kept region must contain the whole speech span
+            pcm = np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16)
+            kept_start, kept_end = trim_silence(pcm, rate)
+            speech_ok = kept_start <= lead * rate and kept_end >= (lead + speech_seconds) * rate
+
+            before_total = before_encode + before_bytes / uplink
+            after_total = after_encode + after_bytes / uplink
+            totals['before_bytes'] += before_bytes
+            totals['after_bytes'] += after_bytes
+            totals['before_seconds'] += before_total
+            totals['after_seconds'] += after_total
+            name = f"{rate // 1000}k {lead + speech_seconds + trail:.1f}s lvl {level}"
+            print(f"{name:>22} {before_bytes / 1024:>10.0f} {after_bytes / 1024:>9.0f} "
+                  f"{before_total * 1000:>10.0f} {after_total * 1000:>9.0f} "
+                  f"{stats['prepared_seconds']:>7.1f} {str(speech_ok):>9}")
+            assert speech_ok, f"fixture {index}: speech was trimmed"
+
+    print(f"total upload: {totals['before_bytes'] / 1024:.0f} KB -> {totals['after_bytes'] / 1024:.0f} KB "
+          f"({totals['after_bytes'] / totals['before_bytes']:.0%}); encode + upload at {args.uplink_mbps} Mbit/s: "
+          f"{totals['before_seconds']:.2f} s -> {totals['after_seconds']:.2f} s "
+          f"({args.attempts} attempts per turn)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Throughput of batch language detection for 1..N worker processes.
+
+Generates a synthetic JSONL archive of monolingual and code-mixed
+transcripts, then runs it through ``batch_language_detection`` with an
+increasing number of workers and reports texts/sec. The per-text
+``detect_language`` loop is included as the baseline.
+
+    python benchmarks/bench_batch_detection.py --texts 200000 --max-workers 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from batch_language_detection import detect_records, read_records  # noqa: E402
+from bench_segment_detection import LABELED  # noqa: E402
+from language_detection import detect_language  # noqa: E402
+
+
+def write_corpus(path, count, seed=3):
+    """Write ``count`` synthetic transcripts built from the labeled sentences"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as corpus:
+        for i in range(count):
+            text = " ".join(rng.choice(LABELED)[0] for _ in range(rng.randint(1, 3)))
+            corpus.write(json.dumps({"id": i, "text": text}, ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=100000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="langbatch-"), "corpus.jsonl")
+    write_corpus(path, args.texts)
+
+    baseline_count = min(args.texts, 20000)
+    start = time.perf_counter()
+    for _, text in zip(range(baseline_count), (text for _, text in read_records(path))):
+        detect_language(text)
+    elapsed = time.perf_counter() - start
+    print(f"per-text detect_language: {baseline_count / elapsed:10.0f} texts/sec")
+
+    workers = 1
+    while workers <= args.max_workers:
+        start = time.perf_counter()
+        count = sum(1 for _ in detect_records(read_records(path), workers=workers))
+        elapsed = time.perf_counter() - start
+        print(f"batch, {workers:2d} worker(s):     {count / elapsed:10.0f} texts/sec")
+        workers *= 2
+
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Throughput and crash recovery of the batch summarization job.
+
+Fills a temporary conversation store with ``--sessions`` finished
+sessions (4 to 30 turns each, in English, Hindi and Tamil). A tenth of
+them already have a stored summary of every turn, and another tenth a
+stored summary of their first half. Summaries come from a stub LLM with a
+log-normal latency around ``--llm-ms``, and digests go to recording
+senders instead of SMTP and Slack.
+
+  * throughput: conversations/minute and LLM calls for each in-flight limit
+  * crash: a child process runs the job and is killed with SIGKILL part
+    way through. The job is then resumed on the same checkpoint. Sessions
+    checkpointed before the crash must not be summarized again. Every
+    session must end up with a summary, and every (recipient, session)
+    pair must be delivered exactly once, including after a third run.
+  * updates and dry runs: a session updated after delivery is summarized
+    and sent again, and a dry run sends nothing and leaves every digest
+    to the next run.
+
+    python benchmarks/bench_batch_summarize.py --sessions 80 --llm-ms 200
+"""
+import argparse
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_summarize import Checkpoint, run  # noqa: E402
+from conversation_store import ConversationStore  # noqa: E402
+
+ROUTES = {
+    '*': ["ops@example.com", "https://hooks.slack.com/services/T000/B000/ops"],
+    'hi': ["hindi-desk@example.com"],
+    'ta': ["tamil-desk@example.com", "https://hooks.slack.com/services/T000/B000/tamil"],
+}
+
+LINES = {
+    'en': ["Where is my order?", "It was due on Monday.", "Order number is 40721.", "Thanks, that helps."],
+    'hi': ["मेरा order कहाँ है?", "सोमवार को आना था।", "order number 40721 है।", "धन्यवाद।"],
+    'ta': ["என் ஆர்டர் எங்கே?", "திங்கள் அன்று வர வேண்டும்.", "ஆர்டர் எண் 40721.", "நன்றி."],
+}
+
+
+def build_store(path, sessions, seed):
+    """Store with finished sessions; returns the number that need an LLM call"""
+    rng = random.Random(seed)
+    store = ConversationStore(path)
+    started = time.time() - 4 * 3600
+    needs_llm = 0
+    for index in range(sessions):
+        session_id = f"{index:04d}{rng.getrandbits(96):024x}"
+        language = rng.choice(list(LINES))
+        turns = rng.randint(4, 30)
+        for seq in range(turns):
+            role = "user" if seq % 2 == 0 else "assistant"
+            store.append_turn(session_id, seq, role, rng.choice(LINES[language]), started + index * 60 + seq)
+        fields = {'detected_language': language}
+        if index % 10 == 0:
+            fields.update(last_summary=f"Stored summary of {session_id}", last_summary_turns=turns)
+        else:
+            needs_llm += 1
+            if index % 10 == 1:
+                fields.update(last_summary=f"Summary of the first turns of {session_id}", last_summary_turns=turns // 2)
+        store.update_session(session_id, **fields)
+    store.close()
+    return needs_llm
+
+
+class StubLLM:
+    """Sleeps a log-normal latency and counts calls"""
+
+    def __init__(self, median_ms, seed):
+        self.median_seconds = median_ms / 1000
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.calls += 1
+            latency = self.median_seconds * self._rng.lognormvariate(0, 0.4)
+        time.sleep(latency)
+        return f"Summary ({len(prompt)} prompt chars): the customer asked about order 40721."
+
+
+class Outbox:
+    """Recording email and Slack senders"""
+
+    def __init__(self):
+        self.deliveries = Counter()
+        self.messages = 0
+
+    def send(self, recipient, subject, body):
+        self.messages += 1
+        self.deliveries.update((recipient, session_id) for session_id in _session_ids(body))
+
+    def post(self, webhook_url, message):
+        self.messages += 1
+        self.deliveries.update((webhook_url, session_id)
+                               for block in message['blocks'][1:] for session_id in _session_ids(block['text']['text']))
+
+
+def _session_ids(text):
+    return [part.split(" ")[0] for part in text.split("Session ")[1:]]
+
+
+def run_job(db_path, checkpoint_path, llm, in_flight, outbox=None, deliver=True):
+    store = ConversationStore(db_path)
+    checkpoint = Checkpoint(checkpoint_path)
+    outbox = outbox or Outbox()
+    try:
+        return run(store, checkpoint, ROUTES, llm, idle_seconds=0, in_flight=in_flight,
+                   send=outbox.send, post=outbox.post, deliver=deliver, log=open(os.devnull, "w"))
+    finally:
+        checkpoint.close()
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=80)
+    parser.add_argument("--llm-ms", type=float, default=200.0, help="median stub LLM latency")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--crash-at", type=float, default=0.4, help="share of the sessions done when the child is killed")
+    parser.add_argument("--seed", type=int, default=9)
+    parser.add_argument("--child", nargs=2, metavar=("DB", "CHECKPOINT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_job(*args.child, StubLLM(args.llm_ms, args.seed), in_flight=8)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="batch-summary-")
+    try:
+        db_path = os.path.join(workdir, "conversations.db")
+        needs_llm = build_store(db_path, args.sessions, args.seed)
+        print(f"{args.sessions} sessions, {needs_llm} needing an LLM call; stub LLM median {args.llm_ms:.0f} ms")
+        print(f"{'in flight':>9} {'seconds':>8} {'conv/min':>9} {'llm calls':>10} {'digest messages':>16}")
+        for in_flight in args.in_flight:
+            checkpoint_path = os.path.join(workdir, f"throughput-{in_flight}.jsonl")
+            llm = StubLLM(args.llm_ms, args.seed)
+            outbox = Outbox()
+            counts = run_job(db_path, checkpoint_path, llm, in_flight, outbox)
+            rate = counts['summarized'] / counts['seconds'] * 60
+            print(f"{in_flight:>9} {counts['seconds']:>8.1f} {rate:>9.0f} {llm.calls:>10} {outbox.messages:>16}")
+            assert counts['summarized'] == args.sessions and llm.calls == needs_llm
+
+        # Kill a run part way through, then resume it twice on the same checkpoint
+        checkpoint_path = os.path.join(workdir, "crash.jsonl")
+        child = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", db_path, checkpoint_path,
+                                  "--llm-ms", str(args.llm_ms), "--seed", str(args.seed)])
+        target = int(args.sessions * args.crash_at)
+        while child.poll() is None:
+            if os.path.exists(checkpoint_path):
+                with open(checkpoint_path, encoding="utf-8") as log:
+                    if sum(1 for _ in log) >= target:
+                        break
+            time.sleep(0.01)
+        child.send_signal(signal.SIGKILL)
+        child.wait()
+        crashed = Checkpoint(checkpoint_path)
+        crashed.close()
+        before = set(crashed.summaries)
+
+        llm = StubLLM(args.llm_ms, args.seed)
+        outbox = Outbox()
+        counts = run_job(db_path, checkpoint_path, llm, 8, outbox)
+        again = Outbox()
+        rerun = run_job(db_path, checkpoint_path, StubLLM(args.llm_ms, args.seed), 8, again)
+        final = Checkpoint(checkpoint_path)
+        final.close()
+
+        print()
+        print(f"crash: killed after {len(before)} checkpointed sessions; resume skipped {counts['skipped']}, "
+              f"summarized {counts['summarized']} ({llm.calls} LLM calls) and sent {outbox.messages} digest messages")
+        print(f"third run: skipped {rerun['skipped']}, summarized {rerun['summarized']}, sent {again.messages} messages")
+        # Digests show the first 8 characters of a session id
+        expected = Counter({(recipient, session_id[:8]): 1 for session_id, record in final.summaries.items()
+                            for recipient in ROUTES.get(record['language'], ROUTES['*'])})
+        assert counts['skipped'] == len(before), "a checkpointed session was summarized again"
+        assert len(final.summaries) == args.sessions, "a session is missing from the checkpoint"
+        assert outbox.deliveries == expected, "a summary was delivered more or less than once"
+        assert rerun['summarized'] == 0 and again.messages == 0, "a finished run did work again"
+
+        # A turn added after delivery makes a new version of the session, which is sent again
+        session_id, record = next(iter(final.summaries.items()))
+        store = ConversationStore(db_path)
+        store.append_turn(session_id, record['turns'], "user", "One more thing.", time.time())
+        store.close()
+        updated = Outbox()
+        update_counts = run_job(db_path, checkpoint_path, StubLLM(args.llm_ms, args.seed), 8, updated)
+        print(f"update: summarized {update_counts['summarized']} session again, "
+              f"sent {updated.messages} digest messages")
+        assert update_counts['summarized'] == 1, "the updated session was not summarized again"
+        assert updated.deliveries == Counter({(recipient, session_id[:8]): 1 for recipient
+                                              in ROUTES.get(record['language'], ROUTES['*'])}), \
+            "the updated summary was not delivered once to each of its recipients"
+
+        # A dry run records summaries but no deliveries, so the next run sends every digest
+        dry_path = os.path.join(workdir, "dry-run.jsonl")
+        dry = Outbox()
+        dry_counts = run_job(db_path, dry_path, StubLLM(args.llm_ms, args.seed), 8, dry, deliver=False)
+        sent = Outbox()
+        run_job(db_path, dry_path, StubLLM(args.llm_ms, args.seed), 8, sent)
+        print(f"dry run: {len(dry_counts['digests'])} digests printed, {dry.messages} sent; "
+              f"the next run sent {sent.messages}")
+        dry_log = Checkpoint(dry_path)
+        dry_log.close()
+        expected = Counter({(recipient, session_id[:8]): 1 for session_id, record in dry_log.summaries.items()
+                            for recipient in ROUTES.get(record['language'], ROUTES['*'])})
+        assert dry.messages == 0 and dry_counts['digests'], "a dry run sent digests"
+        assert sent.deliveries == expected, "a dry run marked digests as delivered"
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Prompt size benchmark for conversation memory over a long call.
+
+Replays a synthetic 200-turn support conversation. Facts (an order number,
+an email address, an amount, a date) are planted early. Each turn's
+prompt is built two ways:
+
+  * full history, the previous behaviour
+  * memory: the rolling summary and key details, plus the turns the
+    summary does not cover yet
+
+Folds use a stub summarizer that keeps a bounded digest. LLM latency is
+modelled as a fixed overhead plus a per-prompt-token cost. The benchmark
+reports prompt tokens and modelled latency at points through the call,
+and checks that the planted facts are still in the prompt at the end and
+that a session resumed from the persisted fold sends the same turns.
+
+    python benchmarks/bench_conversation_memory.py --turns 200
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_history import ConversationLog  # noqa: E402
+from conversation_memory import ConversationMemory  # noqa: E402
+from speculative_prefetch import estimate_tokens  # noqa: E402
+from watsonx_client import build_prompt  # noqa: E402
+
+# Modelled LLM latency: fixed overhead plus prefill cost per prompt token
+LATENCY_BASE_SECONDS = 0.35
+LATENCY_PER_TOKEN_SECONDS = 0.0004
+
+PLANTED = {
+    2: ("user", "My order number is ORD-48213 and it has not arrived yet."),
+    5: ("user", "You can reach me at priya.k@example.com if you need anything."),
+    9: ("user", "I was charged ₹2,499 twice on 12/03/2024."),
+}
+
+USER_LINES = [
+    "Can you check the delivery status again?",
+    "I already tried restarting the app but it still shows pending.",
+    "Is there a way to speed this up, I need it before the weekend.",
+    "The tracking page says the parcel left the warehouse yesterday.",
+    "Okay, and what happens with the duplicate charge?",
+    "Could you explain the refund timeline once more?",
+]
+
+ASSISTANT_LINES = [
+    "I understand. Let me look into the delivery status for you right away.",
+    "Thanks for your patience. The courier shows the parcel is in transit to your city.",
+    "Refunds for duplicate charges are usually processed within five to seven business days.",
+    "I have raised a priority request with the courier so it can be delivered sooner.",
+    "You will get an update by email as soon as the status changes.",
+]
+
+
+def stub_summarize(turns, previous):
+    """Bounded digest: previous summary plus the first clause of each new turn, capped"""
+    digest = "; ".join(f"{role}: {text.split(',')[0][:60]}" for role, text in turns)
+    summary = f"{previous} | {digest}" if previous else digest
+    return summary[-1200:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200, help="user turns (each followed by a reply)")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    history = ConversationLog()
+    memory = ConversationMemory()
+    checkpoints = {10, 25, 50, 100, 150, args.turns}
+    totals = {'full': 0.0, 'memory': 0.0}
+    persisted = {'summary': None, 'turns': None}
+
+    def persist(summary, summarized_turns):
+        persisted.update(summary=summary, turns=summarized_turns)
+
+    print(f"{'turn':>5} {'full tok':>9} {'memory tok':>11} {'full s':>7} {'memory s':>9} {'folded':>7}")
+    for turn in range(1, args.turns + 1):
+        role, user_text = PLANTED.get(turn, ("user", rng.choice(USER_LINES)))
+        history.append("user", user_text)
+        memory.observe(user_text)
+
+        full_prompt = build_prompt(list(history), user_text, 'en')
+        memory_prompt = build_prompt(memory.prompt_turns(history, len(history)), user_text, 'en', memory.render())
+        full_tokens = estimate_tokens(full_prompt)
+        memory_tokens = estimate_tokens(memory_prompt)
+        full_latency = LATENCY_BASE_SECONDS + full_tokens * LATENCY_PER_TOKEN_SECONDS
+        memory_latency = LATENCY_BASE_SECONDS + memory_tokens * LATENCY_PER_TOKEN_SECONDS
+        totals['full'] += full_latency
+        totals['memory'] += memory_latency
+
+        reply = rng.choice(ASSISTANT_LINES)
+        history.append("assistant", reply)
+        memory.observe(reply)
+        memory.maybe_fold(history, len(history), stub_summarize, persist)
+        memory.wait()
+
+        if turn in checkpoints:
+            print(f"{turn:>5} {full_tokens:>9} {memory_tokens:>11} {full_latency:>7.2f} {memory_latency:>9.2f} "
+                  f"{memory.summarized_turns:>7}")
+
+    final_prompt = build_prompt(memory.prompt_turns(history, len(history)), "thanks", 'en', memory.render())
+    for needle in ("ORD-48213", "priya.k@example.com", "₹2,499", "12/03/2024"):
+        assert needle in final_prompt, f"{needle} missing from the final memory prompt"
+    print(f"total modelled LLM time: full {totals['full']:.0f} s, memory {totals['memory']:.0f} s; "
+          f"{memory.stats['folds']} folds; planted facts present at the end")
+
+    # Resume like VoiceAgent: load a page of turns, or every turn the persisted summary does not cover
+    turns = list(history)
+    covered = persisted['turns'] or 0
+    loaded = ConversationLog(turns[-max(20, len(turns) - covered):])
+    assert len(turns) - len(loaded) <= covered
+    resumed = ConversationMemory(summary=persisted['summary'], summarized_turns=covered)
+    assert resumed.summary == memory.summary
+    assert resumed.prompt_turns(loaded, len(turns)) == memory.prompt_turns(history, len(history))
+    print(f"resume: summary covers {covered} turns, {len(loaded)} loaded, same prompt turns")
+
+
+if __name__ == "__main__":
+    main()
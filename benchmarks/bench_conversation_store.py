@@ -0,0 +1,92 @@
+"""Benchmark append latency and write amplification of the conversation store.
+
+Appends N synthetic turns across several sessions and reports:
+  * enqueue latency seen by the caller (the voice loop's hot path)
+  * time until everything is durable (flush)
+  * write amplification: bytes written to disk / logical payload bytes,
+    taken from /proc/self/io where available, else from file sizes
+
+Runs once with the default batching and once committing every operation.
+
+    python benchmarks/bench_conversation_store.py --turns 5000
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_store import BATCH_MAX_DELAY, BATCH_MAX_OPS, ConversationStore  # noqa: E402
+
+
+def disk_write_bytes():
+    """Return bytes written by this process, or None if unavailable"""
+    try:
+        with open("/proc/self/io") as io_stats:
+            for line in io_stats:
+                if line.startswith("write_bytes:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def run(turns, sessions, batch_max_ops, batch_max_delay):
+    """Append turns and return timing and amplification figures"""
+    workdir = tempfile.mkdtemp(prefix="convstore-")
+    path = os.path.join(workdir, "bench.db")
+    store = ConversationStore(path, batch_max_ops=batch_max_ops, batch_max_delay=batch_max_delay)
+    text = "Namaste, my recharge of 299 rupees failed twice, please check the transaction."
+    payload_bytes = 0
+    latencies = []
+
+    written_before = disk_write_bytes()
+    start = time.perf_counter()
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        t0 = time.perf_counter()
+        store.append_turn(f"session-{i % sessions}", i // sessions, role, text)
+        latencies.append((time.perf_counter() - t0) * 1e6)
+        payload_bytes += len(text.encode("utf-8"))
+    enqueue_done = time.perf_counter()
+    store.flush()
+    durable = time.perf_counter()
+    written_after = disk_write_bytes()
+    store.close()
+
+    if written_before is not None and written_after is not None and written_after > written_before:
+        disk_bytes = written_after - written_before
+    else:
+        disk_bytes = sum(os.path.getsize(os.path.join(workdir, f)) for f in os.listdir(workdir))
+    shutil.rmtree(workdir)
+
+    latencies.sort()
+    return {
+        "p50_us": statistics.median(latencies),
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1],
+        "enqueue_s": enqueue_done - start,
+        "durable_s": durable - start,
+        "batches": store.stats["batches"],
+        "amplification": disk_bytes / payload_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+
+    for label, ops, delay in (("batched", BATCH_MAX_OPS, BATCH_MAX_DELAY), ("per-op commit", 1, 0)):
+        result = run(args.turns, args.sessions, ops, delay)
+        print(f"{label:14s} append p50 {result['p50_us']:6.1f} us  p99 {result['p99_us']:7.1f} us  "
+              f"durable after {result['durable_s']:6.2f} s  "
+              f"{result['batches']:5d} commits  write amplification {result['amplification']:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Multi-worker benchmark for shared token, rate-limit and cache coordination.
+
+Starts a stub upstream that enforces a global token bucket (answering 429
+above it) and counts token fetches, then runs N worker processes that each
+send M generation requests:
+
+  * uncoordinated: every worker fetches its own token and retries 429s
+    after a fixed backoff (the previous behaviour)
+  * coordinated: workers share the token and admit requests through the
+    shared GCRA limiter in ``coordination`` (SQLite backend by default)
+
+Reports throughput, 429s, token fetches, latency percentiles and how far
+apart the workers finished (fairness). Also checks that the SQLite file is
+owner-only and that its blob cache stays under the size cap, evicting the
+least recently used entries.
+
+    python benchmarks/bench_coordination.py --workers 8 --requests 40 --rate 50
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coordination import Coordinator, MemoryBackend, SQLiteBackend  # noqa: E402
+
+RETRY_BACKOFF = 0.2
+
+
+class StubUpstream(BaseHTTPRequestHandler):
+    """Token endpoint plus a generation endpoint behind a global token bucket"""
+
+    lock = threading.Lock()
+    rate = 50.0
+    burst = 10
+    tokens = 10.0
+    updated = 0.0
+    counts = {'token': 0, 'ok': 0, 'throttled': 0}
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        cls = type(self)
+        with cls.lock:
+            if self.path == '/token':
+                cls.counts['token'] += 1
+                status, body = 200, {'access_token': 'stub-token', 'expires_in': 3600}
+            else:
+                now = time.monotonic()
+                cls.tokens = min(cls.burst, cls.tokens + (now - cls.updated) * cls.rate)
+                cls.updated = now
+                if cls.tokens >= 1:
+                    cls.tokens -= 1
+                    cls.counts['ok'] += 1
+                    status, body = 200, {'results': [{'generated_text': 'ok'}]}
+                else:
+                    cls.counts['throttled'] += 1
+                    status, body = 429, {'error': 'rate limited'}
+        # Simulated generation latency
+        if self.path != '/token' and status == 200:
+            time.sleep(0.02)
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def post(url):
+    request = urllib.request.Request(url, data=b'{}', method='POST')
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def worker(base_url, mode, requests, backend_url, rate, burst, results):
+    if mode == 'coordinated':
+        backend = SQLiteBackend(backend_url) if backend_url else MemoryBackend()
+        coordinator = Coordinator(backend, {'watsonx': {'rate': rate, 'burst': burst}}, max_wait=60)
+        coordinator.shared_token('iam', lambda: (post(base_url + '/token')['access_token'], 3600))
+    else:
+        coordinator = None
+        post(base_url + '/token')
+
+    latencies = []
+    throttled = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        while True:
+            if coordinator is not None:
+                coordinator.acquire('watsonx')
+            try:
+                post(base_url + '/generate')
+                break
+            except urllib.error.HTTPError as e:
+                if e.code != 429:
+                    raise
+                throttled += 1
+                time.sleep(RETRY_BACKOFF)
+        latencies.append(time.perf_counter() - start)
+    results.put({'latencies': latencies, 'throttled': throttled, 'finished': time.time()})
+
+
+def check_sqlite_cache(directory):
+    """The SQLite file is owner-only and cached blobs are evicted LRU-first under the cap"""
+    path = os.path.join(directory, 'cache-check.db')
+    backend = SQLiteBackend(path, max_cache_bytes=10 * 1024)
+    coordinator = Coordinator(backend)
+    blob = b"x" * 1024
+    for index in range(8):
+        coordinator.cache_set("tts", str(index), blob, 3600)
+    # Touch the oldest entry so the next ones are evicted instead
+    assert coordinator.cache_get("tts", "0") == blob
+    for index in range(8, 16):
+        coordinator.cache_set("tts", str(index), blob, 3600)
+    kept = [index for index in range(16) if coordinator.cache_get("tts", str(index)) is not None]
+    size = backend._conn.execute("SELECT SUM(length(value)) FROM kv WHERE key LIKE 'cache:%'").fetchone()[0]
+    mode = os.stat(path).st_mode & 0o777
+    print(f"sqlite cache: {len(kept)} of 16 blobs kept ({size} bytes, cap 10240), file mode {mode:o}")
+    assert size <= 10 * 1024
+    assert 0 in kept and 1 not in kept and 15 in kept
+    assert os.name != 'posix' or mode == 0o600
+
+
+def run(mode, args, server_url, backend_url):
+    StubUpstream.counts = {'token': 0, 'ok': 0, 'throttled': 0}
+    StubUpstream.tokens = StubUpstream.burst
+    StubUpstream.updated = time.monotonic()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(
+            server_url, mode, args.requests, backend_url, args.rate * args.headroom, args.burst, results
+        ))
+        for _ in range(args.workers)
+    ]
+    start = time.time()
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start
+
+    latencies = sorted(latency for outcome in outcomes for latency in outcome['latencies'])
+    finished = [outcome['finished'] - start for outcome in outcomes]
+    total = len(latencies)
+    print(f"{mode:>14} {total / elapsed:>9.1f} {StubUpstream.counts['throttled']:>6} "
+          f"{StubUpstream.counts['token']:>7} {latencies[total // 2] * 1000:>8.0f} "
+          f"{latencies[int(total * 0.95)] * 1000:>8.0f} {max(finished) - min(finished):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40, help="requests per worker")
+    parser.add_argument("--rate", type=float, default=50.0, help="upstream requests/sec before 429")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--headroom", type=float, default=0.95, help="fraction of the upstream rate to admit")
+    parser.add_argument("--backend", choices=["sqlite", "memory"], default="sqlite",
+                        help="memory only coordinates within a process, so it shows the limiter cost alone")
+    args = parser.parse_args()
+
+    StubUpstream.rate = args.rate
+    StubUpstream.burst = args.burst
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubUpstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        check_sqlite_cache(directory)
+    print(f"{args.workers} workers x {args.requests} requests, upstream limit {args.rate:.0f}/s burst {args.burst}")
+    print(f"{'mode':>14} {'req/s':>9} {'429s':>6} {'tokens':>7} {'p50 ms':>8} {'p95 ms':>8} {'spread s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        run('uncoordinated', args, server_url, None)
+        backend_url = os.path.join(directory, 'coordination.db') if args.backend == 'sqlite' else None
+        run('coordinated', args, server_url, backend_url)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Measure Streamlit rerun time as the conversation grows.
+
+Seeds the session with N synthetic turns and times a rerun of
+VoiceAgent.py through AppTest. With windowed rendering the rerun cost should
+stay flat instead of growing with N.
+
+    python benchmarks/bench_history_render.py --turns 10 100 1000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from conversation_history import ConversationLog  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "VoiceAgent.py")
+
+
+def build_history(turns):
+    """Build a synthetic conversation with alternating roles"""
+    history = ConversationLog()
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        history.append(role, f"Turn {i}: my order number is {1000 + i} and it has not arrived yet.")
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    for turns in args.turns:
+        app = AppTest.from_file(APP_PATH, default_timeout=120)
+        app.run()
+        # Avoid the periodic summary path, which needs credentials
+        history = build_history(turns - turns % 5 + 1)
+        app.session_state["conversation_history"] = history
+        app.run()
+
+        timings = []
+        for _ in range(args.reruns):
+            start = time.perf_counter()
+            app.run()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{len(history):6d} turns: rerun median {statistics.median(timings):8.1f} ms, "
+              f"{len(app.markdown):4d} markdown elements")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Accuracy and latency benchmark for the trained language-ID model.
+
+A model is trained on the corpus with every fifth line per language held
+out. It is compared with the statistical scorer on two sets, limited to
+the enabled languages:
+
+  * held-out: the corpus lines the model did not see
+  * external: the labeled utterances of the segment-detection and n-best
+    benchmarks, including the romanized transcripts, none of them in the
+    corpus
+
+Four detectors are scored:
+
+  * scorer argmax: the best ``calculate_language_score`` on its own
+  * detect_language, statistical: the 0.7 cutoff and segment fallback
+  * model argmax: ``LanguageModel.predict`` on its own
+  * detect_language, model: the same cutoff and fallback on model probabilities
+
+It then reports the accuracy of each by utterance length (short turns
+like "Hi" or "haan" are where n-gram models go wrong) and the
+microseconds per text.
+
+    python benchmarks/bench_language_model.py --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import language_model  # noqa: E402
+from bench_recognition_nbest import UTTERANCES  # noqa: E402
+from bench_segment_detection import LABELED  # noqa: E402
+from language_detection import MODEL_MIN_LETTERS, calculate_language_score, detect_language  # noqa: E402
+from language_model import read_corpus, split_corpus, train  # noqa: E402
+from language_registry import REGISTRY  # noqa: E402
+
+# The model must beat the statistical detector by at least this much on both sets
+MIN_GAIN = 0.15
+
+# Utterance length buckets in words: (label, fewest, most)
+LENGTH_BUCKETS = [("1 word", 1, 1), ("2-3 words", 2, 3), ("4+ words", 4, None)]
+
+# Short turns detect_language must get right, with or without the model
+SHORT_TURNS = [("en", "Hi"), ("en", "bye"), ("en", "ok"), ("en", "thanks"), ("en", "Hello"),
+               ("hi", "haan"), ("hi", "nahi"), ("ta", "vanakkam"), ("ta", "illa")]
+
+
+def scorer_argmax(text):
+    scores = {lang: calculate_language_score(text, lang) for lang in ('en', 'hi', 'ta')}
+    return max(scores, key=scores.get)
+
+
+def detect_with(model):
+    """``detect_language`` using ``model`` (None for the statistical scorer)"""
+    def detect(text):
+        original = language_model.get_language_model
+        language_model.get_language_model = lambda: model
+        try:
+            return detect_language(text)[0]
+        finally:
+            language_model.get_language_model = original
+    return detect
+
+
+def external_set():
+    samples = [(lang, text) for text, lang in LABELED]
+    for lang, native, romanized in UTTERANCES:
+        samples.append((lang, native))
+        if romanized:
+            samples.append((lang, romanized))
+    return samples
+
+
+def accuracy(detect, samples):
+    return sum(detect(text) == lang for lang, text in samples) / len(samples)
+
+
+def in_bucket(text, fewest, most):
+    words = len(text.split())
+    return words >= fewest and (most is None or words <= most)
+
+
+def microseconds_per_text(detect, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            detect(text)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="timing passes over all texts")
+    args = parser.parse_args()
+
+    training, held_out = split_corpus(read_corpus())
+    start = time.perf_counter()
+    model = train(training)
+    print(f"trained on {len(training)} lines in {time.perf_counter() - start:.1f}s")
+
+    detectors = [
+        ("scorer argmax", scorer_argmax),
+        ("detect_language, statistical", detect_with(None)),
+        ("model argmax", lambda text: model.predict(text, REGISTRY.enabled)[0]),
+        ("detect_language, model", detect_with(model)),
+    ]
+    sets = [(name, [(lang, text) for lang, text in samples if lang in REGISTRY.enabled])
+            for name, samples in (("held-out", held_out), ("external", external_set()))]
+    texts = [text for _, samples in sets for _, text in samples]
+
+    print(f"{'detector':<30} " + " ".join(f"{f'{name} ({len(samples)})':>16}" for name, samples in sets)
+          + f" {'us/text':>9}")
+    results = {}
+    for label, detect in detectors:
+        scores = [accuracy(detect, samples) for _, samples in sets]
+        results[label] = scores
+        per_text = microseconds_per_text(detect, texts, args.repeat)
+        print(f"{label:<30} " + " ".join(f"{score:>16.1%}" for score in scores) + f" {per_text:>9.1f}")
+
+    # Both sets together, split by length
+    everything = [sample for _, samples in sets for sample in samples]
+    buckets = [(label, [(lang, text) for lang, text in everything if in_bucket(text, fewest, most)])
+               for label, fewest, most in LENGTH_BUCKETS]
+    print(f"\nby length (model below {MODEL_MIN_LETTERS} letters uses the statistical scorer)")
+    print(f"{'detector':<30} " + " ".join(f"{f'{label} ({len(samples)})':>16}" for label, samples in buckets))
+    for label, detect in detectors:
+        print(f"{label:<30} " + " ".join(f"{accuracy(detect, samples):>16.1%}" for _, samples in buckets))
+
+    for name, samples in sets:
+        for lang, text in samples:
+            predicted = detect_with(model)(text)
+            if predicted != lang:
+                print(f"detect_language miss ({name}): {lang} {text!r} -> {predicted}")
+
+    for lang, text in SHORT_TURNS:
+        for scorer, detect in (("model", detect_with(model)), ("statistical", detect_with(None))):
+            assert detect(text) == lang, f"{text!r} detected as {detect(text)} with the {scorer} scorer"
+
+    for index in range(len(sets)):
+        gain = results["detect_language, model"][index] - results["detect_language, statistical"][index]
+        assert gain >= MIN_GAIN, f"{sets[index][0]}: model gains only {gain:.1%}"
+
+
+if __name__ == "__main__":
+    main()
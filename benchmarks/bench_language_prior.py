@@ -0,0 +1,128 @@
+"""Replay benchmark for the per-session language prior.
+
+Replays a synthetic corpus of sessions (each mostly in one language, with
+occasional code switches) through ``recognize_with_prior`` using stub
+recognizers and a noisy stub detector, and compares recognition calls per
+turn and accuracy against the previous full sweep over every language.
+``recognize_with_prior`` is the top-transcript strategy the app used
+before ``recognize_nbest``; it is kept here as a baseline.
+
+    python benchmarks/bench_language_prior.py --sessions 200 --turns 30
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_prior import LanguagePrior, score_recognition  # noqa: E402
+
+LANGUAGES = ['en', 'hi', 'ta']
+
+
+def recognize_with_prior(recognize, detect, prior, on_result=None):
+    """Run recognition attempts in prior order, stopping early when the prior allows it
+
+    ``recognize(lang)`` returns the transcript or None on failure, and
+    ``detect(text)`` returns ``(detected_lang, confidence)``. ``on_result`` is
+    called with each scored result as soon as it is available, before the
+    remaining languages are tried. Returns the list of scored results and the
+    number of recognition calls made.
+    """
+    results = []
+    calls = 0
+    for lang_code in prior.ordered_languages():
+        calls += 1
+        text = recognize(lang_code)
+        if not text or not text.strip():
+            continue
+
+        detected_lang, confidence = detect(text)
+        results.append({
+            'text': text,
+            'recognition_lang': lang_code,
+            'detected_lang': detected_lang,
+            'confidence': confidence,
+            'total_score': score_recognition(text, lang_code, detected_lang, confidence)
+        })
+        if on_result is not None:
+            on_result(results[-1])
+
+        if calls == 1 and prior.can_short_circuit(lang_code, detected_lang, confidence):
+            break
+    return results, calls
+
+
+
+class FullSweepPrior(LanguagePrior):
+    """Previous behaviour: fixed order, never short-circuit"""
+
+    def ordered_languages(self):
+        return list(self.languages)
+
+    def can_short_circuit(self, recognition_lang, detected_lang, confidence):
+        return False
+
+
+def build_corpus(rng, sessions, turns, switch_rate):
+    """Return a list of sessions, each a list of true languages per turn"""
+    corpus = []
+    for _ in range(sessions):
+        home = rng.choice(LANGUAGES)
+        corpus.append([
+            rng.choice(LANGUAGES) if rng.random() < switch_rate else home
+            for _ in range(turns)
+        ])
+    return corpus
+
+
+def replay(corpus, prior_factory, rng):
+    """Replay the corpus and return (calls per turn, accuracy)"""
+    calls = 0
+    correct = 0
+    total = 0
+    for session in corpus:
+        prior = prior_factory()
+        for true_lang in session:
+            def recognize(lang):
+                if lang == true_lang:
+                    return f"{true_lang} native transcript of the caller's request"
+                # Wrong-language recognition usually yields a garbled transliteration
+                return f"{lang} garbled" if rng.random() < 0.6 else None
+
+            def detect(text):
+                spoken = text.split()[0]
+                if "garbled" in text:
+                    return spoken, rng.uniform(0.1, 0.5)
+                if rng.random() < 0.9:
+                    return spoken, rng.uniform(0.6, 0.95)
+                return rng.choice([l for l in LANGUAGES if l != spoken]), rng.uniform(0.3, 0.6)
+
+            results, turn_calls = recognize_with_prior(recognize, detect, prior)
+            calls += turn_calls
+            total += 1
+            if results:
+                best = max(results, key=lambda x: x['total_score'])
+                correct += best['detected_lang'] == true_lang
+                prior.update(best['detected_lang'], best['confidence'])
+    return calls / total, correct / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--switch-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(random.Random(args.seed), args.sessions, args.turns, args.switch_rate)
+    for label, factory in (("full sweep", lambda: FullSweepPrior(LANGUAGES)),
+                           ("session prior", lambda: LanguagePrior(LANGUAGES))):
+        calls_per_turn, accuracy = replay(corpus, factory, random.Random(args.seed))
+        print(f"{label:14s} recognition calls/turn {calls_per_turn:4.2f}  accuracy {accuracy:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
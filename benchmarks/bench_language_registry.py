@@ -0,0 +1,194 @@
+"""Scaling benchmark for language detection with 3 vs 10 enabled languages.
+
+Each measurement is taken with the registry's default three languages
+(en, hi, ta) and with all ten (adding te, kn, ml, bn, mr, gu, pa):
+
+  * script classification, ns/char: an ``if`` chain with one range test
+    per script (the previous ``_char_script``) vs the registry's
+    code point pages
+  * utterance scoring, us/text: one ``calculate_language_score`` pass per
+    language vs one model dot product with a row per language
+  * ``detect_language`` end to end, us/text, and its accuracy on native
+    utterances of every enabled language
+  * recognition fan-out on replayed sessions: calls per turn and language
+    accuracy of a full sweep vs n-best recognition in prior order with
+    the per-turn call cap
+
+    python benchmarks/bench_language_registry.py --sessions 100 --turns 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_recognition_nbest import UTTERANCES  # noqa: E402
+from language_detection import calculate_language_score, detect_language  # noqa: E402
+from language_model import LanguageModel, feature_size  # noqa: E402
+from language_prior import LanguagePrior  # noqa: E402
+from language_registry import SCRIPT_BLOCKS, LanguageRegistry  # noqa: E402
+from recognition_results import parse_alternatives, recognize_nbest, score_hypotheses  # noqa: E402
+
+# (language, native transcript, romanized transcript) for the languages added to the registry
+ADDED_UTTERANCES = [
+    ('te', "నా ఆర్డర్ ఇంకా రాలేదు", None),
+    ('te', "దయచేసి నా ఖాతా బ్యాలెన్స్ చెప్పండి", None),
+    ('kn', "ನನ್ನ ಆರ್ಡರ್ ಇನ್ನೂ ಬಂದಿಲ್ಲ", None),
+    ('kn', "ದಯವಿಟ್ಟು ನನ್ನ ಖಾತೆಯ ಬ್ಯಾಲೆನ್ಸ್ ಹೇಳಿ", None),
+    ('ml', "എന്റെ ഓർഡർ ഇതുവരെ വന്നിട്ടില്ല", None),
+    ('ml', "ദയവായി എന്റെ അക്കൗണ്ട് ബാലൻസ് പറയൂ", None),
+    ('bn', "আমার অর্ডার এখনও আসেনি", None),
+    ('bn', "দয়া করে আমার অ্যাকাউন্টের ব্যালেন্স বলুন", None),
+    ('mr', "माझी ऑर्डर अजून आलेली नाही", None),
+    ('mr', "कृपया माझ्या खात्यातील शिल्लक सांगा", None),
+    ('gu', "મારો ઓર્ડર હજુ સુધી આવ્યો નથી", None),
+    ('gu', "કૃપા કરીને મારા ખાતાનું બેલેન્સ જણાવો", None),
+    ('pa', "ਮੇਰਾ ਆਰਡਰ ਅਜੇ ਤੱਕ ਨਹੀਂ ਆਇਆ", None),
+    ('pa', "ਕਿਰਪਾ ਕਰਕੇ ਮੇਰੇ ਖਾਤੇ ਦਾ ਬਕਾਇਆ ਦੱਸੋ", None),
+]
+
+ALL_UTTERANCES = UTTERANCES + ADDED_UTTERANCES
+
+
+def if_chain_classifier(registry):
+    """The previous per-character classifier, extended with one range test per enabled script"""
+    tests = []
+    for code in registry.enabled:
+        script = registry.entries[code]['script']
+        label = 'latin' if script == 'latin' else code
+        if all(existing != label for *_, existing in tests):
+            tests.extend((low, high, label) for low, high in SCRIPT_BLOCKS[script])
+
+    def classify(code_point):
+        for low, high, label in tests:
+            if low <= code_point <= high:
+                return label
+        return None
+    return classify
+
+
+def nanoseconds_per_char(classify, points, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for point in points:
+            classify(point)
+    return (time.perf_counter() - start) / (repeat * len(points)) * 1e9
+
+
+def microseconds_per_text(function, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            function(text)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+
+
+def script_offset(registry, source, target):
+    """Distance between the first blocks of two languages' scripts"""
+    return (SCRIPT_BLOCKS[registry.entries[target]['script']][0][0]
+            - SCRIPT_BLOCKS[registry.entries[source]['script']][0][0])
+
+
+def stub_response(registry, spoken, transcript, romanized, recognition_lang, rng):
+    """``show_all``-style response of a recognizer in ``recognition_lang`` for one utterance"""
+    if recognition_lang == spoken:
+        confidence = 0.9 if rng.random() > 0.2 else 0.55
+        return {'alternative': [{'transcript': transcript, 'confidence': confidence}], 'final': True}
+    if rng.random() < 0.3:
+        return []
+    if recognition_lang == 'en':
+        if not romanized:
+            return []
+        return {'alternative': [{'transcript': romanized, 'confidence': 0.4}], 'final': True}
+    if spoken == 'en':
+        return {'alternative': [{'transcript': transcript, 'confidence': 0.5}], 'final': True}
+    # Another Indic model: the sounds come back in its own script, with low confidence
+    offset = script_offset(registry, spoken, recognition_lang)
+    garbled = "".join(chr(ord(c) + offset) if ord(c) > 0x7F else c for c in transcript)
+    return {'alternative': [{'transcript': garbled, 'confidence': 0.3}], 'final': True}
+
+
+def replay(registry, sessions, turns, seed, strategy):
+    """Calls per turn and language accuracy of one strategy over scripted sessions"""
+    rng = random.Random(seed)
+    utterances = [u for u in ALL_UTTERANCES if u[0] in registry.enabled]
+
+    def detect(text):
+        lang, details = detect_language(text, registry)
+        return lang, (details or {}).get('confidence', 0.5)
+
+    calls = correct = 0
+    for _ in range(sessions):
+        home = rng.choice(registry.enabled)
+        prior = LanguagePrior(registry.enabled)
+        for _ in range(turns):
+            spoken = home if rng.random() < 0.85 else rng.choice(registry.enabled)
+            _, transcript, romanized = rng.choice([u for u in utterances if u[0] == spoken])
+            responses = {lang: stub_response(registry, spoken, transcript, romanized, lang, rng)
+                         for lang in registry.enabled}
+            if strategy == "full sweep":
+                results = [hypothesis for lang in registry.enabled
+                           for hypothesis in score_hypotheses(parse_alternatives(responses[lang]), lang, detect, prior)]
+                made = len(registry.enabled)
+            else:
+                results, made = recognize_nbest(responses.get, detect, prior)
+            calls += made
+            if results:
+                best = max(results, key=lambda r: r['total_score'])
+                correct += best['detected_lang'] == spoken
+                prior.update(best['detected_lang'], best['confidence'])
+    total = sessions * turns
+    return calls / total, correct / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50, help="timing passes")
+    parser.add_argument("--seed", type=int, default=4)
+    args = parser.parse_args()
+
+    registries = [("3 languages", LanguageRegistry(enabled="en,hi,ta")),
+                  ("10 languages", LanguageRegistry(enabled="all"))]
+    texts = [text for _, text, _ in ALL_UTTERANCES]
+    points = [ord(c) for text in texts for c in text]
+
+    print(f"{'':<14} {'if chain ns/char':>17} {'pages ns/char':>14} {'scorer passes us':>17} "
+          f"{'model dot us':>13} {'detect us':>10} {'accuracy':>9}")
+    rng = np.random.default_rng(args.seed)
+    for label, registry in registries:
+        chain = nanoseconds_per_char(if_chain_classifier(registry), points, args.repeat)
+        pages = nanoseconds_per_char(registry.char_label, points, args.repeat)
+        # One statistical pass per enabled language (the three with statistics stand in for the rest)
+        stats_langs = ['en', 'hi', 'ta']
+        passes = microseconds_per_text(
+            lambda text: [calculate_language_score(text, stats_langs[i % 3]) for i in range(len(registry.enabled))],
+            texts, args.repeat // 5 or 1)
+        model = LanguageModel(rng.standard_normal((len(registry.enabled), feature_size())),
+                              np.zeros(len(registry.enabled)), registry.enabled)
+        dot = microseconds_per_text(model.probabilities, texts, args.repeat)
+        detect = microseconds_per_text(lambda text: detect_language(text, registry), texts, args.repeat // 5 or 1)
+        samples = [(lang, text) for lang, text, _ in ALL_UTTERANCES if lang in registry.enabled]
+        accuracy = sum(detect_language(text, registry)[0] == lang for lang, text in samples) / len(samples)
+        print(f"{label:<14} {chain:>17.0f} {pages:>14.0f} {passes:>17.1f} {dot:>13.1f} {detect:>10.1f} "
+              f"{accuracy:>9.1%}")
+        for lang, text in samples:
+            detected = detect_language(text, registry)[0]
+            if detected != lang:
+                print(f"  miss: {lang} {text!r} -> {detected}")
+
+    print()
+    print(f"{'':<14} {'strategy':<10} {'calls/turn':>11} {'accuracy':>9}")
+    for label, registry in registries:
+        for strategy in ("full sweep", "n-best"):
+            calls, accuracy = replay(registry, args.sessions, args.turns, args.seed, strategy)
+            print(f"{label:<14} {strategy:<10} {calls:>11.2f} {accuracy:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
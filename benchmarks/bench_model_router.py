@@ -0,0 +1,217 @@
+"""Latency and token spend benchmark for model routing, against a local stub.
+
+Starts a local HTTP server that speaks the watsonx text generation API.
+Each model id has its own simulated latency: a fixed overhead plus a cost
+per prompt token and per generated token. The small model fails a share
+of requests so the fallback path is exercised. ``WATSONX_URL`` points the
+client at the stub.
+
+Replays a mixed workload through two strategies:
+  * everything to the large model (the previous behaviour)
+  * ``ModelRouter``
+
+The workload covers chit-chat, simple questions and reasoning questions
+in English, Hindi and Tamil, with varying history depth, plus
+conversation summaries. The benchmark reports latency percentiles,
+modelled token spend per tier, routing reasons and fallbacks. It also
+checks that a malformed ``MODEL_ROUTES`` is ignored and that a long
+conversation costs the small tier confidence even when memory folding
+keeps the prompt history short.
+
+    python benchmarks/bench_model_router.py --requests 200 --small-failure-rate 0.05
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep coordination in-process and out of the way of the measurement
+os.environ.setdefault("COORDINATION_URL", "memory://")
+os.environ.setdefault("WATSONX_RATE_LIMIT", "10000")
+os.environ.setdefault("WATSONX_RATE_BURST", "10000")
+
+import model_router  # noqa: E402
+import watsonx_client  # noqa: E402
+from coordination import MemoryBackend, get_coordinator  # noqa: E402
+
+# Simulated latency per model: (overhead s, s per prompt token, s per generated token)
+MODEL_LATENCY = {
+    model_router.MODEL_TIERS['small']['model_id']: (0.01, 0.000007, 0.00027),
+    model_router.MODEL_TIERS['large']['model_id']: (0.04, 0.00003, 0.0013),
+}
+
+# Relative cost per token of each model, large = 1
+MODEL_COST = {
+    model_router.MODEL_TIERS['small']['model_id']: 0.1,
+    model_router.MODEL_TIERS['large']['model_id']: 1.0,
+}
+
+CHAT = {
+    'chitchat': ["hello", "thank you so much", "okay", "yes please", "नमस्ते", "धन्यवाद", "நன்றி", "சரி"],
+    'simple': [
+        "where is my order right now",
+        "what is my current account balance",
+        "can you resend the invoice to my email",
+        "मेरा ऑर्डर कहाँ है",
+        "என் ஆர்டர் எங்கே உள்ளது",
+    ],
+    'complex': [
+        "why was I charged twice and how do I get the extra amount back?",
+        "can you explain the difference between the premium and the basic plan?",
+        "what are the steps to troubleshoot the app when it keeps crashing on login",
+        "मुझे दो बार चार्ज क्यों किया गया? explain the refund policy please",
+    ],
+}
+
+
+def language_of(text):
+    if any('ऀ' <= c <= 'ॿ' for c in text):
+        return 'hi'
+    if any('஀' <= c <= '௿' for c in text):
+        return 'ta'
+    return 'en'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    failure_rate = 0.0
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        model_id = payload['model_id']
+        overhead, per_input, per_output = MODEL_LATENCY[model_id]
+        input_tokens = len(payload['input']) // 4
+        with self.rng_lock:
+            small = model_id == model_router.MODEL_TIERS['small']['model_id']
+            failed = small and self.rng.random() < self.failure_rate
+            generated_tokens = self.rng.randint(20, 80)
+        time.sleep(overhead + input_tokens * per_input + (0 if failed else generated_tokens * per_output))
+        if failed:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({'results': [{
+            'generated_text': "Sure, I can help with that. " * (generated_tokens // 8),
+            'input_token_count': input_tokens,
+            'generated_token_count': generated_tokens,
+            'stop_reason': 'eos_token',
+        }]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def build_workload(rng, count):
+    """Return a list of (kind, history, user_input, profile)"""
+    workload = []
+    for index in range(count):
+        history = [("user", "earlier question"), ("assistant", "earlier answer")] * rng.randint(0, 15)
+        if rng.random() < 0.15:
+            turns = "\n".join(f"user: question {i}\nassistant: answer {i}" for i in range(rng.randint(4, 30)))
+            workload.append(('summary', [], f"Please provide a concise summary of the following conversation "
+                                            f"({index}):\n\n{turns}\n\nSummary:", 'summary'))
+            continue
+        kind = rng.choices(['chitchat', 'simple', 'complex'], [0.35, 0.4, 0.25])[0]
+        # The index keeps prompts unique so the response cache does not hide the latency
+        history = history + [("user", f"turn {index}")]
+        workload.append((kind, history, rng.choice(CHAT[kind]), None))
+    return workload
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def replay(workload, generate):
+    latencies = {}
+    errors = 0
+    for kind, history, user_input, profile in workload:
+        start = time.perf_counter()
+        reply = generate(history, user_input, "stub-token", language_of(user_input), profile)
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+        errors += reply.startswith("Error")
+    return latencies, errors
+
+
+def spend(before, after):
+    """Relative token cost between two model stats snapshots"""
+    total = 0.0
+    for model_id, stats in after.items():
+        previous = before.get(model_id, {})
+        tokens = (stats['input_tokens'] - previous.get('input_tokens', 0)
+                  + stats['generated_tokens'] - previous.get('generated_tokens', 0))
+        total += tokens * MODEL_COST[model_id]
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--small-failure-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    StubHandler.failure_rate = args.small_failure_rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    watsonx_client.WATSONX_URL = f"http://127.0.0.1:{server.server_address[1]}/ml/v1/text/generation"
+
+    workload = build_workload(random.Random(args.seed), args.requests)
+    large_id = model_router.MODEL_TIERS['large']['model_id']
+    router = model_router.ModelRouter()
+    strategies = (
+        ("large only", lambda h, u, t, lang, p: watsonx_client.get_watsonx_response(h, u, t, lang, p,
+                                                                                     model_id=large_id)),
+        ("routed", lambda h, u, t, lang, p: router.generate(h, u, t, lang, p)),
+    )
+    results = {}
+    for label, generate in strategies:
+        get_coordinator().backend = MemoryBackend()
+        before = watsonx_client.get_model_stats()
+        start = time.perf_counter()
+        latencies, errors = replay(workload, generate)
+        elapsed = time.perf_counter() - start
+        results[label] = spend(before, watsonx_client.get_model_stats())
+        every = [value for values in latencies.values() for value in values]
+        print(f"{label:>10}: p50 {percentile(every, 0.5) * 1000:5.0f} ms  p95 {percentile(every, 0.95) * 1000:5.0f} ms  "
+              f"wall {elapsed:5.1f} s  token cost {results[label]:8.0f}  errors {errors}")
+        for kind in ('chitchat', 'simple', 'complex', 'summary'):
+            values = latencies.get(kind, [])
+            if values:
+                print(f"{'':>12}{kind:>9}: n {len(values):>3}  p50 {percentile(values, 0.5) * 1000:5.0f} ms  "
+                      f"p95 {percentile(values, 0.95) * 1000:5.0f} ms")
+
+    snapshot = router.snapshot()
+    for tier, stats in snapshot['tiers'].items():
+        print(f"tier {tier:>5}: {stats['calls']} calls, {stats['avg_seconds'] * 1000:.0f} ms avg, "
+              f"{stats['errors']} errors, {stats['fallbacks']} fell back to large")
+    print("routed by:", ", ".join(f"{reason} {count}" for reason, count in sorted(snapshot['classes'].items())))
+    print(f"token cost routed / large only: {results['routed'] / results['large only']:.0%}")
+    server.shutdown()
+
+    assert model_router.parse_route_overrides('{"simple": "large"') == {}
+    assert model_router.parse_route_overrides('{"simple": "huge"}') == {}
+    assert model_router.parse_route_overrides('{"simple": "large"}') == {'simple': ('large', 1.0)}
+    folded = [("user", "hello"), ("assistant", "hi")] * 4
+    short = model_router.route_request(folded, "what is my balance", 'hi')
+    deep = model_router.route_request(folded, "what is my balance", 'hi',
+                                      total_turns=model_router.DEEP_HISTORY_TURNS + 1)
+    assert deep['confidence'] == short['confidence'] - model_router.DEEP_HISTORY_PENALTY
+    print("checks: MODEL_ROUTES parsing and total-turn history penalty ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark for the pre-synthesized prompt audio bundle.
+
+Builds a bundle of the whole prompt catalog, then compares opening it and
+looking up prompts against rendering the same prompts on the spot. The
+default ``tone`` renderer encodes a synthetic clip of the length the
+phrase would take to speak through the normal PCM pipeline, so the
+benchmark runs offline. ``--engine gtts`` uses the real TTS (network
+required) to show the live cost.
+
+    python benchmarks/bench_prompt_audio.py --lookups 20000
+    python benchmarks/bench_prompt_audio.py --engine gtts
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_pipeline import OUTPUT_SAMPLE_RATE, encode_pcm  # noqa: E402
+from prompt_audio import MAGIC, PROMPT_CATALOG, PromptBundle, build_bundle, render_with_pipeline  # noqa: E402
+
+# Speaking rate used to size the synthetic clips
+CHARS_PER_SECOND = 14
+
+
+def render_tone(text, language):
+    """Offline stand-in for TTS: an encoded clip as long as the phrase would take to say"""
+    seconds = max(1.0, len(text) / CHARS_PER_SECOND)
+    times = np.arange(int(seconds * OUTPUT_SAMPLE_RATE)) / OUTPUT_SAMPLE_RATE
+    pcm = (np.sin(2 * np.pi * 220 * times) * 8000).astype(np.int16)
+    return encode_pcm(pcm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", choices=["tone", "gtts", "pyttsx3"], default="tone")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    render = render_tone if args.engine == "tone" else render_with_pipeline(args.engine)
+    names = [(key, language) for key, texts in PROMPT_CATALOG.items() for language in texts]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "prompt_audio.bundle")
+        start = time.perf_counter()
+        count, size = build_bundle(path, render)
+        build_seconds = time.perf_counter() - start
+        print(f"build: {count} prompts, {size / 1024:.0f} KiB audio, {build_seconds:.2f} s "
+              f"({build_seconds / count * 1000:.0f} ms per prompt rendered live)")
+
+        start = time.perf_counter()
+        bundle = PromptBundle(path)
+        print(f"open:  {(time.perf_counter() - start) * 1000:.2f} ms (index only, audio stays mapped)")
+
+        rng = random.Random(args.seed)
+        timings = []
+        for _ in range(args.lookups):
+            key, language = rng.choice(names)
+            start = time.perf_counter()
+            audio = bundle.lookup(key, language)
+            timings.append(time.perf_counter() - start)
+            assert audio is not None and audio['data']
+        timings.sort()
+        print(f"lookup: p50 {timings[len(timings) // 2] * 1e6:.1f} us, "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.1f} us, hits {bundle.stats['hits']}")
+
+        # Missing language falls back to English; changed catalog text counts as stale
+        assert bundle.lookup('timeout', 'xx')['text'] == PROMPT_CATALOG['timeout']['en']
+        changed = {key: dict(texts) for key, texts in PROMPT_CATALOG.items()}
+        changed['timeout']['hi'] = "बदला हुआ पाठ"
+        stale_bundle = PromptBundle(path, catalog=changed)
+        assert stale_bundle.lookup('timeout', 'hi')['text'] == PROMPT_CATALOG['timeout']['en']
+        assert stale_bundle.stats['stale'] == 1
+        stale_bundle.close()
+        bundle.close()
+
+        # Truncated, empty and garbage files are reported as ValueError, not an mmap or JSON error
+        with open(path, 'rb') as bundle_file:
+            whole = bundle_file.read()
+        for damaged in (whole[:len(whole) // 2], whole[:len(MAGIC) + 2], b"", b"not a bundle at all"):
+            damaged_path = os.path.join(directory, "damaged.bundle")
+            with open(damaged_path, 'wb') as bundle_file:
+                bundle_file.write(damaged)
+            try:
+                PromptBundle(damaged_path)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{len(damaged)}-byte damaged bundle was accepted")
+        print("checks: fallback, stale-entry and damaged-bundle detection ok")
+
+
+if __name__ == "__main__":
+    main()
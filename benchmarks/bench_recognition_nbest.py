@@ -0,0 +1,191 @@
+"""Replay benchmark for n-best recognition in auto-detect mode.
+
+Replays sessions of labeled utterances in English, Hindi and Tamil. Each
+session has a home language and occasional code switches. Every turn has
+a fixed ``show_all``-style response for each language:
+
+  * the spoken language: the native transcript and a couple of near
+    variants, usually with high confidence, sometimes with low confidence
+  * English for Hindi or Tamil speech: a romanized transcript, low confidence
+  * Hindi or Tamil for English speech: the English words, medium confidence
+  * Hindi for Tamil speech and vice versa: script-shifted garble, low confidence
+  * wrong languages sometimes return nothing at all
+
+The real language detector scores the text. Each strategy sees the same
+responses:
+
+  * full sweep: top transcript only, every language (the original behaviour)
+  * session prior: top transcript only, prior order with short-circuit
+  * n-best: every alternative rescored, further calls only when ambiguous
+
+Reports recognition calls per turn, language accuracy and exact-transcript
+accuracy.
+
+    python benchmarks/bench_recognition_nbest.py --sessions 200 --turns 20
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_language_prior import recognize_with_prior  # noqa: E402
+from language_detection import detect_language  # noqa: E402
+from language_prior import LanguagePrior  # noqa: E402
+from recognition_results import recognize_nbest  # noqa: E402
+
+LANGUAGES = ['en', 'hi', 'ta']
+
+# (language, native transcript, romanized transcript for non-English speech)
+UTTERANCES = [
+    ('en', "my order has not arrived yet", None),
+    ('en', "can you check the delivery status please", None),
+    ('en', "I was charged twice for the same order", None),
+    ('en', "please send the invoice to my email", None),
+    ('en', "when will my refund be processed", None),
+    ('en', "I want to change my delivery address", None),
+    ('hi', "मेरा ऑर्डर अभी तक नहीं आया", "mera order abhi tak nahi aaya"),
+    ('hi', "कृपया डिलीवरी की स्थिति बताइए", "kripya delivery ki sthiti bataiye"),
+    ('hi', "मुझसे दो बार पैसे काटे गए हैं", "mujhse do baar paise kaate gaye hain"),
+    ('hi', "मेरा रिफंड कब तक आएगा", "mera refund kab tak aayega"),
+    ('hi', "मुझे अपना पता बदलना है", "mujhe apna pata badalna hai"),
+    ('ta', "என்னுடைய ஆர்டர் இன்னும் வரவில்லை", "ennudaya order innum varavillai"),
+    ('ta', "டெலிவரி நிலையை சொல்லுங்கள்", "delivery nilaiyai sollungal"),
+    ('ta', "இரண்டு முறை பணம் எடுக்கப்பட்டது", "irandu murai panam edukkappattathu"),
+    ('ta', "என் பணம் எப்போது திரும்ப வரும்", "en panam eppothu thirumba varum"),
+    ('ta', "என் முகவரியை மாற்ற வேண்டும்", "en mugavariyai maatra vendum"),
+]
+
+# Offset between the Devanagari and Tamil Unicode blocks
+SCRIPT_SHIFT = 0x0B80 - 0x0900
+
+
+def shift_script(text, offset):
+    """Move Indic letters into another script block, as a stand-in for a wrong-model transcript"""
+    return "".join(chr(ord(c) + offset) if 0x0900 <= ord(c) + offset < 0x0C00 and ord(c) > 0x7F else c
+                   for c in text)
+
+
+def variants(text, rng):
+    """Near alternatives a recognizer lists after its top transcript"""
+    words = text.split()
+    alternatives = [" ".join(words[:-1]) or text]
+    if len(words) > 2:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+        alternatives.append(" ".join(words))
+    return alternatives
+
+
+def response(transcripts, top_confidence):
+    alternative = [{'transcript': transcripts[0], 'confidence': top_confidence}]
+    alternative.extend({'transcript': t} for t in transcripts[1:])
+    return {'alternative': alternative, 'final': True}
+
+
+def build_turn(rng, true_lang, low_confidence_rate, empty_rate):
+    """Return (utterance, {recognition language: show_all response})"""
+    lang, native, romanized = rng.choice([u for u in UTTERANCES if u[0] == true_lang])
+    responses = {}
+    for attempt in LANGUAGES:
+        if attempt == lang:
+            low = rng.random() < low_confidence_rate
+            confidence = rng.uniform(0.45, 0.68) if low else rng.uniform(0.75, 0.96)
+            responses[attempt] = response([native] + variants(native, rng), confidence)
+        elif rng.random() < empty_rate:
+            responses[attempt] = []
+        elif attempt == 'en':
+            responses[attempt] = response([romanized] + variants(romanized, rng), rng.uniform(0.35, 0.7))
+        elif lang == 'en':
+            responses[attempt] = response([native] + variants(native, rng), rng.uniform(0.5, 0.8))
+        else:
+            garbled = shift_script(native, SCRIPT_SHIFT if attempt == 'ta' else -SCRIPT_SHIFT)
+            responses[attempt] = response([garbled] + variants(garbled, rng), rng.uniform(0.2, 0.5))
+    return native, responses
+
+
+def build_corpus(rng, sessions, turns, switch_rate, low_confidence_rate, empty_rate):
+    corpus = []
+    for _ in range(sessions):
+        home = rng.choice(LANGUAGES)
+        session = []
+        for _ in range(turns):
+            true_lang = rng.choice(LANGUAGES) if rng.random() < switch_rate else home
+            native, responses = build_turn(rng, true_lang, low_confidence_rate, empty_rate)
+            session.append((true_lang, native, responses))
+        corpus.append(session)
+    return corpus
+
+
+class FullSweepPrior(LanguagePrior):
+    """Original behaviour: fixed order, never short-circuit"""
+
+    def ordered_languages(self):
+        return list(self.languages)
+
+    def can_short_circuit(self, recognition_lang, detected_lang, confidence):
+        return False
+
+
+def detect(text):
+    detected_lang, details = detect_language(text)
+    return detected_lang, (details or {}).get('confidence', 0.5)
+
+
+def top_transcript(show_all):
+    """What ``recognize_google`` returns without ``show_all``"""
+    if not show_all:
+        return None
+    return show_all['alternative'][0]['transcript']
+
+
+def replay(corpus, prior_factory, nbest):
+    """Return (calls per turn, language accuracy, transcript accuracy)"""
+    calls = correct_lang = correct_text = total = 0
+    for session in corpus:
+        prior = prior_factory()
+        for true_lang, native, responses in session:
+            if nbest:
+                results, turn_calls = recognize_nbest(responses.get, detect, prior)
+            else:
+                results, turn_calls = recognize_with_prior(
+                    lambda lang: top_transcript(responses[lang]), detect, prior
+                )
+            calls += turn_calls
+            total += 1
+            if results:
+                best = max(results, key=lambda x: x['total_score'])
+                correct_lang += best['detected_lang'] == true_lang
+                correct_text += best['text'] == native
+                prior.update(best['detected_lang'], best['confidence'])
+    return calls / total, correct_lang / total, correct_text / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--switch-rate", type=float, default=0.1)
+    parser.add_argument("--low-confidence-rate", type=float, default=0.2,
+                        help="share of correct-language results with low recognizer confidence")
+    parser.add_argument("--empty-rate", type=float, default=0.3,
+                        help="share of wrong-language calls that return nothing")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(random.Random(args.seed), args.sessions, args.turns, args.switch_rate,
+                          args.low_confidence_rate, args.empty_rate)
+    strategies = (
+        ("full sweep", lambda: FullSweepPrior(LANGUAGES), False),
+        ("session prior", lambda: LanguagePrior(LANGUAGES), False),
+        ("n-best", lambda: LanguagePrior(LANGUAGES), True),
+    )
+    for label, factory, nbest in strategies:
+        calls_per_turn, lang_accuracy, text_accuracy = replay(corpus, factory, nbest)
+        print(f"{label:14s} recognition calls/turn {calls_per_turn:4.2f}  "
+              f"language accuracy {lang_accuracy:6.1%}  transcript accuracy {text_accuracy:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
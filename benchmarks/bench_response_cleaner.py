@@ -0,0 +1,219 @@
+"""Benchmark for the single-pass response cleaner.
+
+Checks ``clean_ai_response`` against a table of expected outputs, checks
+that ``StreamingCleaner`` produces the same text as the batch cleaner for
+fixed chunk boundaries that hold back a tail, for random chunkings of
+every case, and for ``--property-cases`` random texts built from tag
+fragments and runs of ``*`` (so adjacent and nested bold markers are
+covered), then times the previous eight-pass
+``str.replace`` loop against the single regex pass on multi-KB responses:
+typical prose, and dense synthetic text where most words are a tag or
+bold span (the worst case for the regex).
+
+    python benchmarks/bench_response_cleaner.py --sizes 2000 8000 32000 --repeat 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_cleaner import StreamingCleaner, clean_ai_response  # noqa: E402
+
+CASES = [
+    ("", ""),
+    ("Hello there.", "Hello there."),
+    ("assistant<|end_header_id|>\n\nHello!", "Hello!"),
+    ("<|start_header_id|>assistant<|end_header_id|>\n\nHi.<|eot_id|>", "Hi."),
+    ("Sure.<|eot_id|><|start_header_id|>user<|end_header_id|>", "Sure."),
+    ("This is **important** text.", "This is important text."),
+    ("**Step 1:** open it. **Step 2:** close it.", "Step 1: open it. Step 2: close it."),
+    ("2**8 is 256", "2**8 is 256"),
+    ("a ** b", "a ** b"),
+    ("Ask the assistant anything.", "Ask the assistant anything."),
+    ("**bold <|eot_id|>inside**", "bold inside"),
+    ("नमस्ते! **आप** कैसे हैं?<|eot_id|>", "नमस्ते! आप कैसे हैं?"),
+    ("Use x < y and a|b here.", "Use x < y and a|b here."),
+    ("  padded  \n", "padded"),
+]
+
+# Chunk boundaries where whitespace is held back just before a held tail
+CHUNKED_CASES = [
+    ["a ", "**d"],
+    ["x = 1 ", "<"],
+    ["Total: 2 ", "*"],
+    ["Heading ", "#"],
+    ["Hi ", "<|eot"],
+    ["Say ", "assist"],
+    ["a ", " ", "**b"],
+    ["a \n", "**b**"],
+    ["Done. ", "<|eot_id|>"],
+    ["  ", "**x"],
+    ["**start_header_id22", "****<|e", "ot_id|>assistant<|end_header", "_id|>2**"],
+    ["user**", "**end_header_id|>**|"],
+    ["**a****", "b**"],
+]
+
+# Fragments the property check builds texts from
+FRAGMENTS = ["*", "**", "***", "****", "<|", "|>", "<", "|", "user", "assistant", "end_header_id",
+             "start_header_id", "eot_id", "<|eot_id|>", "assistant<|end_header_id|>", "word", "2",
+             " ", "\n", "-"]
+
+
+def old_clean_ai_response(response_text):
+    """Previous implementation: eight sequential str.replace passes"""
+    if not response_text:
+        return response_text
+    unwanted_patterns = [
+        "assistant<|end_header_id|>",
+        "<|start_header_id|>assistant<|end_header_id|>",
+        "<|eot_id|>",
+        "<|start_header_id|>",
+        "<|end_header_id|>",
+        "**",
+        "assistant<|end_header_id|>\n\n",
+        "assistant<|end_header_id|>\n",
+    ]
+    cleaned_response = response_text
+    for pattern in unwanted_patterns:
+        cleaned_response = cleaned_response.replace(pattern, "")
+    return cleaned_response.strip()
+
+
+def stream_chunks(chunks):
+    """Clean ``chunks`` through StreamingCleaner in the given order"""
+    cleaner = StreamingCleaner()
+    return "".join([cleaner.feed(chunk) for chunk in chunks] + [cleaner.finish()])
+
+
+def stream_clean(text, rng):
+    """Clean ``text`` through StreamingCleaner using random chunk boundaries"""
+    cleaner = StreamingCleaner()
+    output = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 12)
+        output.append(cleaner.feed(text[position:position + size]))
+        position += size
+    output.append(cleaner.finish())
+    return "".join(output)
+
+
+def make_response(size, rng):
+    """Synthetic model output of about ``size`` characters with tags and bold spans"""
+    words = ["the", "account", "balance", "is", "updated", "**note**", "please", "call",
+             "नमस्ते", "வணக்கம்", "2**8", "assistant", "<|eot_id|>", "support", "today."]
+    parts = ["assistant<|end_header_id|>\n\n"]
+    length = len(parts[0])
+    while length < size:
+        word = rng.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    parts.append("<|eot_id|>")
+    return " ".join(parts)
+
+
+def make_prose(size, rng):
+    """Typical reply: echoed header, sentences with a few bold terms, trailing end-of-turn tag"""
+    sentences = ["Your **account balance** is updated every night.",
+                 "Please call support if the amount looks wrong.",
+                 "आपका खाता कल तक अपडेट हो जाएगा।",
+                 "உங்கள் கணக்கு நாளை புதுப்பிக்கப்படும்.",
+                 "The fee is 2**3 times the base rate, which is unusual."]
+    parts = ["assistant<|end_header_id|>\n\n"]
+    length = len(parts[0])
+    while length < size:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts) + "<|eot_id|>"
+
+
+def check(rng, rounds):
+    failures = 0
+    for text, expected in CASES:
+        actual = clean_ai_response(text)
+        if actual != expected:
+            failures += 1
+            print(f"FAIL batch {text!r}: {actual!r} != {expected!r}")
+    for chunks in CHUNKED_CASES:
+        expected = clean_ai_response("".join(chunks)) or ""
+        actual = stream_chunks(chunks)
+        if actual != expected:
+            failures += 1
+            print(f"FAIL chunked {chunks!r}: {actual!r} != {expected!r}")
+    samples = ([text for text, _ in CASES] + [make_response(400, rng) for _ in range(20)]
+               + [make_prose(400, rng) for _ in range(5)])
+    for text in samples:
+        expected = clean_ai_response(text) or ""
+        for _ in range(rounds):
+            actual = stream_clean(text, rng)
+            if actual != expected:
+                failures += 1
+                print(f"FAIL stream {text[:60]!r}: {actual[:60]!r} != {expected[:60]!r}")
+                break
+    print(f"checks: {len(CASES)} batch cases, {len(CHUNKED_CASES)} fixed chunkings, {len(samples)} texts x {rounds} random chunkings, "
+          f"{failures} failures")
+    return failures
+
+
+def property_check(rng, cases):
+    """Streamed output equals clean_ai_response for random fragment texts split at random points"""
+    failures = 0
+    for _ in range(cases):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 12)))
+        cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 5))))
+        chunks = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+        expected = clean_ai_response(text) or ""
+        actual = stream_chunks(chunks)
+        if actual != expected:
+            failures += 1
+            if failures <= 5:
+                print(f"FAIL property {chunks!r}: {actual!r} != {expected!r}")
+    print(f"property: {cases} random fragment texts, {failures} failures")
+    return failures
+
+
+def time_call(function, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 8000, 32000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50, help="random chunkings per text")
+    parser.add_argument("--property-cases", type=int, default=30000, help="random texts in the property check")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = check(rng, args.rounds)
+    failures += property_check(rng, args.property_cases)
+
+    print(f"{'text':>6} {'chars':>7} {'old us':>9} {'new us':>9} {'stream us':>10}")
+    for kind, size in [(kind, size) for kind in ("prose", "dense") for size in args.sizes]:
+        text = make_prose(size, rng) if kind == "prose" else make_response(size, rng)
+        old = time_call(old_clean_ai_response, text, args.repeat)
+        new = time_call(clean_ai_response, text, args.repeat)
+        chunks = [text[i:i + 16] for i in range(0, len(text), 16)]
+
+        def stream(_):
+            cleaner = StreamingCleaner()
+            for chunk in chunks:
+                cleaner.feed(chunk)
+            cleaner.finish()
+
+        streamed = time_call(stream, text, max(1, args.repeat // 10))
+        print(f"{kind:>6} {len(text):>7} {old:>9.1f} {new:>9.1f} {streamed:>10.1f}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare the segment-level detector with the utterance-level scorer.
+
+Reports utterance-level accuracy on a small labeled set of monolingual
+and code-mixed (Hinglish / Tanglish) sentences, and timing for inputs of
+growing length to check that segment detection scales linearly.
+
+    python benchmarks/bench_segment_detection.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_detection import calculate_language_score, detect_segments  # noqa: E402
+
+# (text, dominant language)
+LABELED = [
+    ("I want to check the status of my order", 'en'),
+    ("Can you please reset my password today?", 'en'),
+    ("मेरा ऑर्डर अभी तक नहीं आया है", 'hi'),
+    ("मुझे अपने बिल के बारे में जानकारी चाहिए", 'hi'),
+    ("என் ஆர்டர் இன்னும் வரவில்லை", 'ta'),
+    ("எனக்கு என் கணக்கு பற்றி தகவல் வேண்டும்", 'ta'),
+    ("मेरा order अभी तक नहीं आया, please check करो", 'hi'),
+    ("मुझे refund चाहिए क्योंकि product damaged था", 'hi'),
+    ("kya aap meri madad kar sakte ho, mera recharge nahi hua", 'hi'),
+    ("bhai mera paisa kab wapas aayega", 'hi'),
+    ("என் order இன்னும் வரவில்லை, please check பண்ணுங்க", 'ta'),
+    ("எனக்கு refund வேண்டும், product damaged ஆக இருக்கு", 'ta'),
+    ("enna aachu, romba late aagudhu delivery", 'ta'),
+    ("naan bill kattiten aana innum connection illa", 'ta'),
+    ("The delivery was late but the support team was helpful", 'en'),
+]
+
+
+def utterance_label(text):
+    """Label produced by the previous utterance-level detector"""
+    scores = {lang: calculate_language_score(text, lang) for lang in ('en', 'hi', 'ta')}
+    best_lang, confidence = max(scores.items(), key=lambda x: x[1])
+    return best_lang if confidence >= 0.7 else 'en'
+
+
+def time_per_call(func, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    old_correct = sum(utterance_label(text) == lang for text, lang in LABELED)
+    new_correct = sum(detect_segments(text)['dominant'] == lang for text, lang in LABELED)
+    print(f"utterance scorer accuracy: {old_correct}/{len(LABELED)}")
+    print(f"segment detector accuracy: {new_correct}/{len(LABELED)}")
+    print()
+
+    base = " ".join(text for text, _ in LABELED)
+    print(f"{'chars':>8s} {'segments us':>12s} {'us/char':>8s} {'scorer x3 us':>13s} {'us/char':>8s}")
+    for factor in (1, 4, 16, 64):
+        text = " ".join([base] * factor)
+        repeat = max(1, 200 // factor)
+        seg = time_per_call(detect_segments, text, repeat) * 1e6
+        old = time_per_call(utterance_label, text, repeat) * 1e6
+        print(f"{len(text):8d} {seg:12.0f} {seg / len(text):8.3f} {old:13.0f} {old / len(text):8.3f}")
+
+
+if __name__ == "__main__":
+    main()
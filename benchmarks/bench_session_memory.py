@@ -0,0 +1,168 @@
+"""RSS replay benchmark for session memory budgets.
+
+Scripts hours of continuous voice sessions, several at once in one
+process, and samples the process RSS along the way. Each simulated turn
+(one every ``--turn-seconds``) does what the voice loop does:
+
+  * appends a user and an assistant turn to the session's ConversationLog
+    and to a real conversation store in a temporary directory
+  * caches the rendered markdown of both turns
+  * stores the detection details of the user turn
+  * plays an MP3-sized clip through Streamlit's media file manager
+  * observes the turns in the conversation memory and folds old ones with
+    a stub summarizer
+
+Two modes run in separate processes:
+  * unmanaged: the previous behaviour; each clip is a new element, and
+    details and renders are kept in full
+  * managed: one reused audio slot with released clips, compact details
+    and ``SessionMemoryManager.enforce`` each turn
+
+The benchmark reports RSS per simulated hour and checks that managed RSS
+stays flat after the first hour.
+
+    python benchmarks/bench_session_memory.py --hours 4 --sessions 3
+"""
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Largest RSS growth allowed in managed mode between the first hour and the end
+FLAT_TOLERANCE_BYTES = 8 * 1024 * 1024
+
+# Turns kept loaded for the history window
+KEEP_TURNS = 20
+
+WORDS = ("order delivery refund account payment invoice status address courier parcel charge week "
+         "please check update tracking customer support warehouse today tomorrow message email").split()
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def sentence(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))) + f" {rng.randrange(10 ** 6)}."
+
+
+def stub_summarize(turns, previous):
+    digest = "; ".join(text[:40] for _, text in turns)
+    return (f"{previous} | {digest}" if previous else digest)[-1500:]
+
+
+def run_replay(managed, hours, sessions, turn_seconds, seed, results):
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    from conversation_history import ConversationLog
+    from conversation_memory import ConversationMemory
+    from conversation_store import ConversationStore
+    from language_detection import detect_language
+    from session_memory import SessionMemoryManager, compact_detection_details
+
+    # Outside ``streamlit run`` every media call warns about the missing script context
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+    rng = random.Random(seed)
+    media = MediaFileManager(MemoryMediaFileStorage("/media"))
+    manager = SessionMemoryManager()
+    directory = tempfile.mkdtemp()
+    store = ConversationStore(os.path.join(directory, "conversations.db"))
+    states = [{
+        'id': f"session-{index}",
+        'history': ConversationLog(),
+        'rendered': {},
+        'memory': ConversationMemory(),
+        'unloaded': 0,
+        'detection': None,
+    } for index in range(sessions)]
+
+    turns = int(hours * 3600 / turn_seconds)
+    samples = []
+    for turn in range(turns + 1):
+        if turn % max(1, int(1800 / turn_seconds)) == 0:
+            gc.collect()
+            samples.append((turn * turn_seconds / 3600, rss_bytes(), manager.process_usage()[0]))
+        if turn == turns:
+            break
+        for state in states:
+            history = state['history']
+            for role, text in (("user", sentence(rng, 8, 25)), ("assistant", sentence(rng, 20, 60))):
+                message_id = history.append(role, text)
+                store.append_turn(state['id'], message_id, role, text)
+                state['rendered'][message_id] = f"**{role.title()}:** {text}"
+                state['memory'].observe(text)
+                if role == "user":
+                    _, details = detect_language(text)
+                    state['detection'] = compact_detection_details(details) if managed else details
+            total = len(history) + state['unloaded']
+            state['memory'].maybe_fold(history, total, stub_summarize)
+            state['memory'].wait()
+
+            clip = os.urandom(rng.randint(40, 120) * 1024)
+            coordinates = f"{state['id']}.audio" if managed else f"{state['id']}.audio.{turn}"
+            media.add(clip, "audio/mpeg", coordinates)
+
+            if managed:
+                manager.release_played_audio(media)
+                _, evicted = manager.enforce(
+                    state['id'],
+                    {'history': history, 'rendered': state['rendered'], 'memory': state['memory'],
+                     'detection': state['detection']},
+                    history, state['rendered'], state['unloaded'], state['memory'].summarized_turns, KEEP_TURNS
+                )
+                state['unloaded'] += evicted
+    store.close()
+    shutil.rmtree(directory, ignore_errors=True)
+    results.put((samples, dict(manager.stats), len(media._file_metadata)))
+
+
+def replay_in_child(managed, args):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(
+        target=run_replay, args=(managed, args.hours, args.sessions, args.turn_seconds, args.seed, results)
+    )
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=4.0)
+    parser.add_argument("--sessions", type=int, default=3, help="concurrent sessions in the process")
+    parser.add_argument("--turn-seconds", type=float, default=15.0, help="simulated time per turn")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    unmanaged, _, unmanaged_files = replay_in_child(False, args)
+    managed, stats, managed_files = replay_in_child(True, args)
+
+    print(f"{'hour':>5} {'unmanaged RSS MB':>17} {'managed RSS MB':>15} {'managed state KB':>17}")
+    for (hour, before, _), (_, after, state) in zip(unmanaged, managed):
+        if hour == int(hour):
+            print(f"{hour:>5.0f} {before / 2 ** 20:>17.1f} {after / 2 ** 20:>15.1f} {state / 1024:>17.0f}")
+    print(f"media files held at the end: unmanaged {unmanaged_files}, managed {managed_files}")
+    print(f"managed: {stats['evicted_turns']} turns and {stats['evicted_renders']} renders evicted, "
+          f"{stats['over_budget']} measurements still over budget")
+
+    first_hour = next(rss for hour, rss, _ in managed if hour >= 1)
+    growth = managed[-1][1] - first_hour
+    print(f"managed RSS growth after the first hour: {growth / 2 ** 20:+.1f} MB; "
+          f"unmanaged: {(unmanaged[-1][1] - next(rss for hour, rss, _ in unmanaged if hour >= 1)) / 2 ** 20:+.1f} MB")
+    assert growth < FLAT_TOLERANCE_BYTES, "managed RSS kept growing"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""First-turn vs steady-state latency with and without the session warm-up.
+
+Three local HTTP/1.1 keep-alive servers stand in for IAM, watsonx.ai
+and gTTS. Every new connection costs ``--connect-ms``, a stand-in for
+DNS, TCP and TLS. Each session runs in a fresh interpreter, so imports
+and tables start cold, as they do in a new worker:
+
+  * cold: the token is fetched at session start; everything else happens
+    on the first turn
+  * warm: ``SessionWarmup`` starts the token fetch, pooled connections, a
+    dummy synthesis and ``build_detection_tables`` together at session
+    start
+
+After ``--think-ms`` of listening, the session runs ``--turns`` turns.
+Each turn is timed from the end of capture to the reply:
+
+  * recognition-side work: fingerprinting and ``detect_language``
+  * a generation request over the pooled session
+  * a gTTS object and one TTS request on a new connection, as gTTS
+    makes them
+
+The benchmark reports the start-up wait for the token, the first turn
+and the median steady-state turn. It also checks that the token does not
+queue behind a saturated warm-up pool and that a token fetch that outlives
+the wait is reported as timed out.
+
+    python benchmarks/bench_session_warmup.py --sessions 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TRANSCRIPTS = [
+    "where is my order it has not arrived yet",
+    "मेरा order अभी तक नहीं आया",
+    "என் ஆர்டர் இன்னும் வரவில்லை",
+    "please tell me my account balance",
+]
+
+
+def stub_handler(connect_ms, token_ms, generate_ms, tts_ms):
+    delays = {'/token': token_ms, '/generate': generate_ms, '/tts': tts_ms}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            # Once per connection: the handshake a pooled connection skips
+            time.sleep(connect_ms / 1000)
+            super().setup()
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, body):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            self._reply(b"")
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delays.get(self.path, 0) / 1000)
+            self._reply(json.dumps({'access_token': 'stub', 'expires_in': 3600}).encode())
+
+    return Handler
+
+
+def run_session(mode, urls, think_seconds, turns):
+    """One session in this interpreter; returns its timings"""
+    import numpy as np
+    import requests
+
+    from http_pool import get_http_session, open_connections
+    from session_warmup import SessionWarmup, build_detection_tables
+    from startup_profiler import lazy_import
+
+    session = get_http_session()
+
+    def fetch_token():
+        return session.post(f"{urls['iam']}/token", data="apikey=stub").json()['access_token']
+
+    def synthesize(text):
+        lazy_import("gtts").gTTS(text=text, lang='en')
+        requests.post(f"{urls['tts']}/tts", data=text.encode('utf-8')).close()
+
+    started = time.perf_counter()
+    if mode == "warm":
+        warmup = SessionWarmup({
+            'token': fetch_token,
+            'connections': lambda: open_connections([urls['iam'], urls['watsonx']]),
+            'synthesis': lambda: synthesize("Hello."),
+            'tables': build_detection_tables,
+        })
+        token = warmup.result('token')
+    else:
+        token = fetch_token()
+    auth_seconds = time.perf_counter() - started
+    assert token == 'stub'
+
+    time.sleep(think_seconds)
+    clip = (np.random.default_rng(0).standard_normal(3 * 16000) * 3000).astype(np.int16).tobytes()
+    turn_seconds = []
+    for index in range(turns):
+        captured_at = time.perf_counter()
+        lazy_import("speech_recognition")
+        audio_preprocessing = lazy_import("audio_preprocessing")
+        transcript_cache = lazy_import("transcript_cache")
+        from language_detection import detect_language
+        transcript_cache.fingerprint_audio(clip, audio_preprocessing.RECOGNITION_SAMPLE_RATE)
+        detect_language(TRANSCRIPTS[index % len(TRANSCRIPTS)])
+        session.post(f"{urls['watsonx']}/generate", json={'input': TRANSCRIPTS[index % len(TRANSCRIPTS)]}).json()
+        synthesize("Your order is on its way.")
+        turn_seconds.append(time.perf_counter() - captured_at)
+
+    report = {'auth': auth_seconds, 'first': turn_seconds[0], 'steady': statistics.median(turn_seconds[1:])}
+    if mode == "warm":
+        report['warmup'] = warmup.elapsed()
+        report['failed'] = [name for name, task in warmup.status().items() if task['state'] == 'failed']
+    return report
+
+
+def check_token_isolation():
+    """The token is fetched while every warm-up worker is busy, and a slow fetch counts as a timeout"""
+    from session_warmup import SessionWarmup
+
+    # Another session's warm-ups hold every shared worker
+    release = threading.Event()
+    SessionWarmup({f"slow{index}": release.wait for index in range(8)})
+    warmup = SessionWarmup({'token': lambda: 'stub'})
+    started = time.perf_counter()
+    token = warmup.result('token', timeout=5)
+    waited = time.perf_counter() - started
+    release.set()
+    assert token == 'stub' and waited < 1.0, f"token waited {waited:.2f}s behind other warm-ups"
+
+    slow = SessionWarmup({'token': lambda: time.sleep(0.5) or 'late'})
+    assert slow.result('token', timeout=0.05) is None
+    status = slow.status()['token']
+    assert status['timed_out'] and status['state'] == 'running'
+    print(f"token with a saturated warm-up pool: {waited * 1000:.1f} ms; slow fetch reported as timed out")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5, help="fresh interpreters per mode")
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--think-ms", type=float, default=2000.0, help="listening time before the first turn")
+    parser.add_argument("--connect-ms", type=float, default=150.0, help="cost of opening a connection")
+    parser.add_argument("--token-ms", type=float, default=400.0)
+    parser.add_argument("--generate-ms", type=float, default=600.0)
+    parser.add_argument("--tts-ms", type=float, default=250.0)
+    parser.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+    parser.add_argument("--urls", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_session(args.child, json.loads(args.urls), args.think_ms / 1000, args.turns)))
+        return
+
+    check_token_isolation()
+
+    urls = {}
+    servers = []
+    for service in ("iam", "watsonx", "tts"):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), stub_handler(
+            args.connect_ms, args.token_ms, args.generate_ms, args.tts_ms))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        urls[service] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = {}
+    for mode in ("cold", "warm"):
+        runs = []
+        for _ in range(args.sessions):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, "--urls", json.dumps(urls),
+                 "--turns", str(args.turns), "--think-ms", str(args.think_ms)],
+                cwd=ROOT, capture_output=True, text=True, check=True)
+            runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+        results[mode] = {key: statistics.median(run[key] for run in runs) for key in ('auth', 'first', 'steady')}
+        if mode == "warm":
+            results[mode]['warmup'] = statistics.median(run['warmup'] for run in runs)
+            failed = sorted({name for run in runs for name in run['failed']})
+            if failed:
+                print(f"warm-up tasks failed: {', '.join(failed)}")
+    for server in servers:
+        server.shutdown()
+
+    print(f"{'mode':<6} {'auth wait ms':>13} {'first turn ms':>14} {'steady ms':>10} {'first/steady':>13}")
+    for mode, result in results.items():
+        print(f"{mode:<6} {result['auth'] * 1000:>13.0f} {result['first'] * 1000:>14.0f} "
+              f"{result['steady'] * 1000:>10.0f} {result['first'] / result['steady']:>13.2f}")
+    print(f"warm-up finished {results['warm']['warmup'] * 1000:.0f} ms after session start "
+          f"(median of {args.sessions} sessions)")
+
+    assert results['warm']['first'] < results['cold']['first'], "the warm-up did not shorten the first turn"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Measure cold start and rerun time of the Streamlit app.
+
+Runs VoiceAgent.py through Streamlit's headless AppTest harness: the first
+run pays for module imports and table construction, later runs are what a
+user pays on every widget interaction.
+
+    python benchmarks/bench_startup.py --reruns 20
+"""
+import argparse
+import os
+import statistics
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "VoiceAgent.py")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_import_ms = (time.perf_counter() - start) * 1000
+
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+
+    start = time.perf_counter()
+    app.run()
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    rerun_ms = []
+    for _ in range(args.reruns):
+        start = time.perf_counter()
+        app.run()
+        rerun_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"streamlit import: {streamlit_import_ms:8.1f} ms")
+    print(f"cold run:         {cold_ms:8.1f} ms")
+    print(f"rerun median:     {statistics.median(rerun_ms):8.1f} ms")
+    print(f"rerun max:        {max(rerun_ms):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
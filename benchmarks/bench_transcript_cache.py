@@ -0,0 +1,185 @@
+"""Replay benchmark for the transcript cache.
+
+Synthesizes speech-like recordings (harmonic voicing with two formants
+per letter and short pauses between words) at 44.1 kHz and runs them
+through ``prepare_for_recognition``, as captured audio is. A stream of
+turns mixes:
+
+  * retried uploads: byte-identical copies of earlier recordings
+  * repeated IVR phrases: a small phrase set recorded again each time,
+    with a different gain, noise, lead-in silence and speaking rate
+  * fresh phrases: new word sequences the cache has not seen
+
+Turns are spread over ``--sessions`` callers. A retry comes from the
+session that made the recording; IVR phrases are said in every session.
+Recognition is a stub that costs ``--recognition-ms`` per turn. The
+benchmark reports hit rates by kind, wrong transcripts returned, near
+matches served across sessions (there must be none), time
+per lookup and turn time with and without the cache. It then sweeps the
+near-match threshold over pairs of re-recordings of the same phrase and
+pairs of distinct phrases.
+
+    python benchmarks/bench_transcript_cache.py --turns 400
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_preprocessing import RECOGNITION_SAMPLE_RATE, prepare_for_recognition  # noqa: E402
+from transcript_cache import TranscriptCache, fingerprint_audio, fingerprint_distance  # noqa: E402
+
+CAPTURE_RATE = 44100
+
+WORDS = ("order delivery refund account payment invoice status address courier parcel charge week "
+         "please check update tracking customer support warehouse today tomorrow message email "
+         "balance recharge plan cancel ticket booking").split()
+
+IVR_PHRASES = [
+    "check my order status", "talk to an agent", "repeat the menu", "yes please",
+    "no thank you", "account balance", "cancel my booking", "track my parcel",
+]
+
+
+def synthesize(phrase, rng, rate_scale=1.0, gain_db=0.0, noise_db=-45.0, lead_seconds=0.3):
+    """Speech-like int16 audio at CAPTURE_RATE for a phrase"""
+    pieces = [np.zeros(int(lead_seconds * CAPTURE_RATE))]
+    for word in phrase.split():
+        for char in word:
+            seconds = (0.06 + (ord(char) % 5) * 0.008) * rate_scale
+            times = np.arange(int(seconds * CAPTURE_RATE)) / CAPTURE_RATE
+            pitch = 110 + (ord(char) * 7) % 60
+            formants = (300 + (ord(char) * 37) % 700, 900 + (ord(char) * 53) % 1800)
+            sound = np.zeros_like(times)
+            for harmonic in range(1, 30):
+                frequency = pitch * harmonic
+                weight = sum(np.exp(-((frequency - f) / 120.0) ** 2) for f in formants) / harmonic ** 0.5
+                sound += weight * np.sin(2 * np.pi * frequency * times)
+            pieces.append(sound * np.hanning(len(times)))
+        pieces.append(np.zeros(int(0.08 * rate_scale * CAPTURE_RATE)))
+    pieces.append(np.zeros(int(0.3 * CAPTURE_RATE)))
+    signal = np.concatenate(pieces)
+    signal = signal / (np.abs(signal).max() or 1.0) * 0.5 * 10 ** (gain_db / 20)
+    signal += np.array(rng.standard_normal(len(signal))) * 10 ** (noise_db / 20)
+    return np.clip(signal * 32767, -32768, 32767).astype(np.int16)
+
+
+def record(phrase, rng, vary):
+    """Captured and preprocessed recording of a phrase; ``vary`` re-records it with new conditions"""
+    if vary:
+        pcm = synthesize(phrase, rng, rate_scale=rng.uniform(0.96, 1.04), gain_db=rng.uniform(-8, 2),
+                         noise_db=rng.uniform(-50, -35), lead_seconds=rng.uniform(0.1, 0.6))
+    else:
+        pcm = synthesize(phrase, rng)
+    prepared, _ = prepare_for_recognition(sr.AudioData(pcm.tobytes(), CAPTURE_RATE, 2))
+    return prepared.frame_data
+
+
+def fresh_phrase(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(int(rng.integers(3, 8))))
+
+
+def replay(turns, sessions, recognition_seconds, seed, max_distance):
+    rng = np.random.default_rng(seed)
+    cache = TranscriptCache(max_distance=max_distance)
+    ivr_recordings = {phrase: record(phrase, rng, vary=False) for phrase in IVR_PHRASES}
+    histories = [[] for _ in range(sessions)]
+    outcomes = {kind: [0, 0] for kind in ("retry", "ivr", "fresh")}
+    wrong = crossed = 0
+    lookup_seconds = []
+    cached_turn_seconds = 0.0
+
+    for _ in range(turns):
+        session = int(rng.integers(sessions))
+        history = histories[session]
+        roll = rng.random()
+        if roll < 0.3 and history:
+            kind = "retry"
+            phrase, audio = history[int(rng.integers(len(history)))]
+        elif roll < 0.65:
+            kind = "ivr"
+            phrase = IVR_PHRASES[int(rng.integers(len(IVR_PHRASES)))]
+            audio = ivr_recordings[phrase] if rng.random() < 0.2 else record(phrase, rng, vary=True)
+        else:
+            kind = "fresh"
+            phrase = fresh_phrase(rng)
+            audio = record(phrase, rng, vary=True)
+        history.append((phrase, audio))
+
+        start = time.perf_counter()
+        fingerprint = fingerprint_audio(audio, RECOGNITION_SAMPLE_RATE)
+        entry = cache.lookup(fingerprint, 'auto', session)
+        lookup_seconds.append(time.perf_counter() - start)
+        cached_turn_seconds += lookup_seconds[-1]
+        outcomes[kind][1] += 1
+        if entry is not None:
+            outcomes[kind][0] += 1
+            wrong += entry['text'] != phrase
+            crossed += entry['match'] == 'near' and entry['session'] != session
+        else:
+            # The recognizer would run here
+            cached_turn_seconds += recognition_seconds
+            cache.store(fingerprint, 'auto', session, phrase, 'en')
+    return cache, outcomes, wrong, crossed, lookup_seconds, cached_turn_seconds
+
+
+def threshold_sweep(seed, pairs):
+    """Distances between re-recordings of one phrase and between distinct phrases"""
+    rng = np.random.default_rng(seed + 1)
+    same, different = [], []
+    for _ in range(pairs):
+        phrase = fresh_phrase(rng)
+        first = fingerprint_audio(record(phrase, rng, vary=True), RECOGNITION_SAMPLE_RATE)
+        second = fingerprint_audio(record(phrase, rng, vary=True), RECOGNITION_SAMPLE_RATE)
+        other = fingerprint_audio(record(fresh_phrase(rng), rng, vary=True), RECOGNITION_SAMPLE_RATE)
+        if first['bits'] is None or second['bits'] is None or other['bits'] is None:
+            continue
+        same.append(float(fingerprint_distance(first['bits'], second['bits'][None, :])[0]))
+        different.append(float(fingerprint_distance(first['bits'], other['bits'][None, :])[0]))
+    return np.array(same), np.array(different)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=400)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--recognition-ms", type=float, default=900.0, help="stub cost of one n-best pass")
+    parser.add_argument("--max-distance", type=float, default=None, help="near-match threshold to replay with")
+    parser.add_argument("--pairs", type=int, default=150, help="phrase pairs in the threshold sweep")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    max_distance = args.max_distance if args.max_distance is not None else TranscriptCache().max_distance
+    cache, outcomes, wrong, crossed, lookups, cached_seconds = replay(
+        args.turns, args.sessions, args.recognition_ms / 1000, args.seed, max_distance)
+    print(f"{'kind':<8} {'turns':>6} {'hits':>6} {'hit rate':>9}")
+    for kind, (hits, total) in outcomes.items():
+        print(f"{kind:<8} {total:>6} {hits:>6} {hits / max(1, total):>9.1%}")
+    print(f"overall hit rate {cache.hit_rate():.1%} ({cache.stats['exact_hits']} exact, "
+          f"{cache.stats['near_hits']} near); wrong transcripts returned: {wrong}; "
+          f"near matches across sessions: {crossed}")
+    print(f"fingerprint + lookup: median {statistics.median(lookups) * 1000:.2f} ms, "
+          f"max {max(lookups) * 1000:.2f} ms over {len(cache)} entries")
+    uncached_seconds = args.turns * args.recognition_ms / 1000
+    print(f"recognition time: {uncached_seconds:.0f}s without the cache, {cached_seconds:.0f}s with it")
+
+    same, different = threshold_sweep(args.seed, args.pairs)
+    print()
+    print(f"re-recorded pairs: median distance {np.median(same):.3f}; distinct pairs: min {different.min():.3f}")
+    print(f"{'threshold':>9} {'same phrase matched':>20} {'distinct matched':>17}")
+    for threshold in (0.10, 0.15, 0.20, 0.25, 0.30):
+        print(f"{threshold:>9.2f} {np.mean(same <= threshold):>20.1%} {np.mean(different <= threshold):>17.1%}")
+
+    assert wrong == 0, "the cache returned another recording's transcript"
+    assert crossed == 0, "a near match was served to another session"
+    assert outcomes["retry"][0] == outcomes["retry"][1], "an identical replay missed"
+
+
+if __name__ == "__main__":
+    main()
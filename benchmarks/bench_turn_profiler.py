@@ -0,0 +1,177 @@
+"""Overhead and output benchmark for the turn profiler.
+
+Runs a scripted voice turn made of the real CPU-bound stages:
+  * detection: n-best recognition of stub responses with the real detector
+  * prompt: building a prompt from the conversation memory and history
+  * clean: ``clean_ai_response`` on a long reply
+  * tts/encode: loudness cap and encode of synthesized PCM
+
+The network calls are left out. The turn is timed three ways:
+  * bare: no stage hooks
+  * hooks, profiling off: the shipped code path when a turn is not selected
+  * profiling on: every turn sampled and snapshotted
+
+The benchmark reports the median turn time and overhead of each, and
+the cost of one stage hook when profiling is off. It then
+checks the written collapsed stacks and allocation reports, and that
+retention keeps only ``--keep`` turns on disk.
+
+    python benchmarks/bench_turn_profiler.py --turns 40 --keep 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_pipeline import OUTPUT_SAMPLE_RATE, cap_loudness, encode_pcm  # noqa: E402
+from conversation_memory import ConversationMemory  # noqa: E402
+from language_detection import detect_language  # noqa: E402
+from language_prior import LanguagePrior  # noqa: E402
+from recognition_results import recognize_nbest  # noqa: E402
+from response_cleaner import clean_ai_response  # noqa: E402
+from turn_profiler import TurnProfiler, stage  # noqa: E402
+from watsonx_client import build_prompt  # noqa: E402
+
+RESPONSES = {
+    'en': {'alternative': [{'transcript': "my order has not arrived yet can you check", 'confidence': 0.9},
+                           {'transcript': "my order has not arrived yet can you"}], 'final': True},
+    'hi': {'alternative': [{'transcript': "मेरा ऑर्डर अभी तक नहीं आया", 'confidence': 0.4}], 'final': True},
+    'ta': [],
+}
+
+REPLY = ("<|start_header_id|>assistant<|end_header_id|>\n\n**Thanks** for waiting. I checked the order and "
+         "the parcel is with the courier. " * 40) + "<|eot_id|>"
+
+
+def detect(text):
+    lang, details = detect_language(text)
+    return lang, (details or {}).get('confidence', 0.5)
+
+
+def scripted_turn(history, memory, pcm, hooks):
+    """One turn; ``hooks`` wraps each stage with ``turn_profiler.stage``"""
+    wrap = stage if hooks else (lambda name: _BARE)
+    with wrap("detection"):
+        results, _ = recognize_nbest(RESPONSES.get, detect, LanguagePrior(['en', 'hi', 'ta']))
+        text = max(results, key=lambda r: r['total_score'])['text']
+    with wrap("prompt"):
+        prompt = build_prompt(list(history), text, 'en', memory.render())
+    with wrap("clean"):
+        reply = clean_ai_response(REPLY)
+    with wrap("tts"):
+        with wrap("encode"):
+            audio, _ = encode_pcm(cap_loudness(pcm))
+    return len(prompt) + len(reply) + len(audio)
+
+
+class _Bare:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_BARE = _Bare()
+
+
+def time_turns(turns, modes):
+    """Median seconds per turn for each mode, running the modes interleaved to share machine noise"""
+    durations = {label: [] for label, _ in modes}
+    for round_number in range(turns):
+        # Rotate the order so no mode always follows the profiled one
+        shift = round_number % len(modes)
+        for label, run_turn in modes[shift:] + modes[:shift]:
+            start = time.perf_counter()
+            run_turn()
+            durations[label].append(time.perf_counter() - start)
+    return {label: statistics.median(values) for label, values in durations.items()}
+
+
+def hook_cost(iterations=200000):
+    """Seconds per ``with stage(...)`` when the turn is not profiled, minus an empty ``with``"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with stage("detection"):
+            pass
+    hooked = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with _BARE:
+            pass
+    bare = time.perf_counter() - start
+    return max(0.0, hooked - bare) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--keep", type=int, default=5, help="profiled turns kept on disk")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    history = [("user" if i % 2 == 0 else "assistant", f"turn {i} about the order status and the refund")
+               for i in range(40)]
+    memory = ConversationMemory()
+    for _, text in history:
+        memory.observe(text)
+    seconds = 3.0
+    times = np.arange(int(seconds * OUTPUT_SAMPLE_RATE)) / OUTPUT_SAMPLE_RATE
+    pcm = (np.sin(2 * np.pi * 180 * times) * 12000 + np.array([rng.gauss(0, 300) for _ in times])).astype(np.int16)
+
+    with tempfile.TemporaryDirectory() as directory:
+        idle = TurnProfiler(directory=directory, every_n_turns=0, max_turns=args.keep)
+        active = TurnProfiler(directory=directory, every_n_turns=1, max_turns=args.keep)
+
+        def run(profiler, hooks):
+            def turn():
+                if profiler is None:
+                    return scripted_turn(history, memory, pcm, hooks)
+                with profiler.turn("benchmark"):
+                    return scripted_turn(history, memory, pcm, hooks)
+            return turn
+
+        run(None, False)()  # warm up imports and caches
+        medians = time_turns(args.turns, [
+            ("bare", run(None, False)),
+            ("hooks, profiling off", run(idle, True)),
+            ("profiling on", run(active, True)),
+        ])
+        baseline = medians["bare"]
+
+        print(f"{'mode':<22} {'ms/turn':>8} {'overhead':>9}")
+        for label, value in medians.items():
+            print(f"{label:<22} {value * 1000:>8.2f} {(value / baseline - 1):>+9.1%}")
+        per_hook = hook_cost()
+        print(f"stage hook with profiling off: {per_hook * 1e9:.0f} ns; 7 hooks per turn = "
+              f"{7 * per_hook / baseline:.4%} of a bare turn")
+
+        files = sorted(os.listdir(directory))
+        collapsed = [name for name in files if name.endswith(".collapsed")]
+        reports = [name for name in files if name.endswith(".alloc.txt")]
+        assert len(collapsed) == len(reports) == args.keep, files
+        assert idle.stats['profiled'] == 0 and active.stats['deleted'] == args.turns - args.keep
+
+        with open(os.path.join(directory, collapsed[-1]), encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("stage:") and int(count) > 0
+        stages = {line.split(";", 1)[0] for line in lines}
+        with open(os.path.join(directory, reports[-1]), encoding="utf-8") as handle:
+            report = handle.read()
+        print(f"kept {len(collapsed)} of {args.turns} profiled turns; latest has {len(lines)} distinct stacks "
+              f"over stages {', '.join(sorted(stages))}")
+        print(report.split("\n\n[")[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Overload benchmark for the turn scheduler.
+
+Offers Poisson arrivals of mixed work (interactive turns, summaries,
+periodic summaries, email/Slack jobs) to a stub LLM stage with fixed
+concurrency, at several multiples of its capacity. Some interactive turns
+are superseded by a newer turn from the same session shortly after they
+arrive. Compares the previous behaviour, where everything waits in one
+unbounded FIFO queue, with ``TurnScheduler`` priorities, deadlines and
+shedding. Reports interactive p50/p99 latency and what was shed.
+
+    python benchmarks/bench_turn_scheduler.py --loads 0.5 1.0 1.5 2.0 --seconds 5
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turn_scheduler import (  # noqa: E402
+    INTERACTIVE, NOTIFY, PERIODIC, SUMMARY, TurnScheduler, WorkShed
+)
+
+MIX = [(INTERACTIVE, 0.7), (SUMMARY, 0.15), (PERIODIC, 0.1), (NOTIFY, 0.05)]
+SERVICE_SECONDS = {INTERACTIVE: 0.1, SUMMARY: 0.2, PERIODIC: 0.2, NOTIFY: 0.05}
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def simulate(scheduler, load, seconds, concurrency, rng, prioritized, supersede):
+    mean_service = sum(SERVICE_SECONDS[p] * share for p, share in MIX)
+    rate = load * concurrency / mean_service
+    results = {'latency': [], 'completed': {p: 0 for p, _ in MIX}, 'shed': {p: 0 for p, _ in MIX}}
+    lock = threading.Lock()
+    threads = []
+
+    def job(priority, session_id, generation):
+        start = time.monotonic()
+        try:
+            scheduler.run(
+                'llm', lambda: time.sleep(SERVICE_SECONDS[priority] * rng.uniform(0.8, 1.2)),
+                priority if prioritized else INTERACTIVE,
+                session_id=session_id, generation=generation
+            )
+        except WorkShed:
+            with lock:
+                results['shed'][priority] += 1
+            return
+        with lock:
+            results['completed'][priority] += 1
+            if priority == INTERACTIVE:
+                results['latency'].append(time.monotonic() - start)
+
+    end = time.monotonic() + seconds
+    session = 0
+    while time.monotonic() < end:
+        time.sleep(rng.expovariate(rate))
+        priority = rng.choices([p for p, _ in MIX], [share for _, share in MIX])[0]
+        session += 1
+        session_id = f"s{session}"
+        generation = scheduler.new_generation(session_id) if priority == INTERACTIVE else None
+        thread = threading.Thread(target=job, args=(priority, session_id, generation))
+        thread.start()
+        threads.append(thread)
+        if priority == INTERACTIVE and rng.random() < supersede:
+            # The caller speaks again before this turn is answered
+            threading.Timer(0.5, scheduler.new_generation, args=(session_id,)).start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loads", type=float, nargs="+", default=[0.5, 1.0, 1.5, 2.0],
+                        help="offered load as a multiple of capacity")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--supersede", type=float, default=0.1, help="share of turns superseded after 0.5 s")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    deadlines = {INTERACTIVE: 1.0, SUMMARY: 3.0, PERIODIC: 5.0, NOTIFY: 10.0}
+    print(f"{'load':>5} {'mode':>10} {'p50 ms':>8} {'p99 ms':>8} {'turns ok':>9} {'turns shed':>11} "
+          f"{'other ok':>9} {'other shed':>11}")
+    for load in args.loads:
+        for mode in ('fifo', 'scheduler'):
+            if mode == 'fifo':
+                scheduler = TurnScheduler({'llm': args.concurrency}, max_queue=10 ** 9,
+                                          deadlines={p: None for p in deadlines})
+            else:
+                scheduler = TurnScheduler({'llm': args.concurrency}, max_queue=32, deadlines=deadlines)
+            results = simulate(scheduler, load, args.seconds, args.concurrency, random.Random(args.seed),
+                               prioritized=mode == 'scheduler',
+                               supersede=args.supersede if mode == 'scheduler' else 0.0)
+            other_ok = sum(count for p, count in results['completed'].items() if p != INTERACTIVE)
+            other_shed = sum(count for p, count in results['shed'].items() if p != INTERACTIVE)
+            print(f"{load:>5.1f} {mode:>10} {percentile(results['latency'], 0.5) * 1000:>8.0f} "
+                  f"{percentile(results['latency'], 0.99) * 1000:>8.0f} {results['completed'][INTERACTIVE]:>9} "
+                  f"{results['shed'][INTERACTIVE]:>11} {other_ok:>9} {other_shed:>11}")
+
+
+if __name__ == "__main__":
+    main()
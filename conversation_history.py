@@ -0,0 +1,126 @@
+"""Compact append-only conversation history.
+
+Turns are stored as parallel arrays (message id, role enum, byte offset)
+over a single UTF-8 buffer instead of a list of ``(role, text)`` tuples.
+Iterating still yields ``(role, text)`` pairs so prompt building and
+summaries keep working unchanged, while the UI can fetch just a window of
+recent turns and cache their rendered markdown by message id.
+"""
+from array import array
+
+ROLE_USER = 0
+ROLE_ASSISTANT = 1
+ROLE_NAMES = ('user', 'assistant')
+ROLE_CODES = {name: code for code, name in enumerate(ROLE_NAMES)}
+
+
+class ConversationLog:
+    """Append-only store of conversation turns"""
+
+    def __init__(self, turns=None):
+        self._ids = array('Q')
+        self._roles = array('B')
+        self._offsets = array('Q', [0])
+        self._buffer = bytearray()
+        self._next_id = 0
+        for role, text in turns or []:
+            self.append(role, text)
+
+    def append(self, role, text, message_id=None):
+        """Append a turn and return its message id"""
+        encoded = text.encode('utf-8')
+        if message_id is None:
+            message_id = self._next_id
+        self._next_id = max(self._next_id, message_id + 1)
+        self._ids.append(message_id)
+        self._roles.append(ROLE_CODES[role])
+        self._buffer.extend(encoded)
+        self._offsets.append(len(self._buffer))
+        return message_id
+
+    def prepend(self, turns):
+        """Insert older (message_id, role, text) turns before the current ones
+
+        Used when lazily loading history from the conversation store. This
+        rebuilds the arrays, so it is meant for explicit "load older" actions,
+        not the per-turn hot path.
+        """
+        current = [(self._ids[i], *self._turn(i)) for i in range(len(self._ids))]
+        next_id = self._next_id
+        self.clear()
+        for message_id, role, text in list(turns) + current:
+            self.append(role, text, message_id)
+        self._next_id = max(self._next_id, next_id)
+
+    def drop_oldest(self, count):
+        """Drop the ``count`` oldest turns and return how many were dropped
+
+        Used to evict turns that are already in the conversation store; they
+        can be loaded back with ``prepend``.
+        """
+        count = min(max(count, 0), len(self._ids))
+        if count == 0:
+            return 0
+        cut = self._offsets[count]
+        self._ids = self._ids[count:]
+        self._roles = self._roles[count:]
+        self._offsets = array('Q', (offset - cut for offset in self._offsets[count:]))
+        del self._buffer[:cut]
+        return count
+
+    def first_id(self):
+        """Return the message id of the oldest loaded turn, or None"""
+        return self._ids[0] if self._ids else None
+
+    def clear(self):
+        """Drop all turns; message ids keep increasing so cached renders stay valid"""
+        self._ids = array('Q')
+        self._roles = array('B')
+        self._offsets = array('Q', [0])
+        self._buffer = bytearray()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __bool__(self):
+        return len(self._ids) > 0
+
+    def __iter__(self):
+        for index in range(len(self._ids)):
+            yield self._turn(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._turn(i) for i in range(*index.indices(len(self._ids)))]
+        if index < 0:
+            index += len(self._ids)
+        if not 0 <= index < len(self._ids):
+            raise IndexError("conversation turn index out of range")
+        return self._turn(index)
+
+    def _turn(self, index):
+        """Return (role, text) for a positional index"""
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return ROLE_NAMES[self._roles[index]], self._buffer[start:end].decode('utf-8')
+
+    def text_at(self, index):
+        """Return the text of the turn at a positional index"""
+        return self._turn(index)[1]
+
+    def window(self, count):
+        """Return (message_id, role, index) for the last ``count`` turns, oldest first
+
+        Text is not decoded here; callers fetch it with ``text_at`` only when
+        their rendered form is not already cached.
+        """
+        start = max(0, len(self._ids) - count)
+        return [(self._ids[i], ROLE_NAMES[self._roles[i]], i) for i in range(start, len(self._ids))]
+
+    def nbytes(self):
+        """Approximate memory held by the log, in bytes"""
+        return (
+            len(self._buffer)
+            + self._ids.itemsize * len(self._ids)
+            + self._roles.itemsize * len(self._roles)
+            + self._offsets.itemsize * len(self._offsets)
+        )
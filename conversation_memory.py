@@ -0,0 +1,163 @@
+"""Conversation memory: a rolling summary plus key entities.
+
+Sending the whole history with every turn makes the prompt grow for the
+length of the call. ``ConversationMemory`` instead keeps:
+
+  * a summary of the older turns, updated incrementally in the background
+    by folding the oldest unsummarized turns into the previous summary
+  * key entities pulled from every turn with cheap regexes: emails,
+    phone numbers, reference ids, amounts and dates
+
+Each prompt is then the memory as a system message, plus every turn that
+has not been folded in yet. Folding starts once more than
+``recent_turns + fold_batch`` turns are unsummarized, and the newest
+``recent_turns`` are always kept verbatim. The prompt size therefore
+stays bounded however long the call runs. A turn is never dropped
+before the summary that covers it is in place.
+"""
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Turns always sent verbatim
+MEMORY_RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "8"))
+
+# Unsummarized turns beyond the recent ones before a fold is started
+MEMORY_FOLD_BATCH = int(os.getenv("MEMORY_FOLD_BATCH", "8"))
+
+# Values kept per entity kind (most recent last)
+MAX_ENTITIES_PER_KIND = 8
+
+ENTITY_PATTERNS = {
+    'email': re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+'),
+    'phone': re.compile(r'(?<!\w)\+?\d[\d -]{8,}\d(?!\w)'),
+    'reference': re.compile(
+        r'\b(?:order|account|ticket|reference|ref|booking|invoice|policy|case)\s*(?:number|no\.?|id|#)?'
+        r'(?:\s+is)?\s*[:#]?\s*((?=[A-Z0-9-]*\d)[A-Z0-9][A-Z0-9-]{3,})\b',
+        re.IGNORECASE
+    ),
+    'amount': re.compile(r'(?:₹|rs\.?|inr|\$|usd)\s?\d[\d,]*(?:\.\d+)?', re.IGNORECASE),
+    'date': re.compile(
+        r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'
+        r'|\b\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b',
+        re.IGNORECASE
+    ),
+}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-fold")
+
+
+def extract_entities(text):
+    """Return {kind: [values]} for the entities found in ``text``"""
+    found = {}
+    for kind, pattern in ENTITY_PATTERNS.items():
+        values = []
+        for match in pattern.finditer(text):
+            value = (match.group(1) if match.groups() else match.group(0)).strip()
+            if value and value not in values:
+                values.append(value)
+        if values:
+            found[kind] = values
+    return found
+
+
+class ConversationMemory:
+    """Incremental summary and entities for one session"""
+
+    def __init__(self, recent_turns=MEMORY_RECENT_TURNS, fold_batch=MEMORY_FOLD_BATCH,
+                 summary="", summarized_turns=0):
+        self.recent_turns = recent_turns
+        self.fold_batch = fold_batch
+        self.summary = summary or ""
+        # Absolute number of turns (from the start of the session) covered by the summary
+        self.summarized_turns = summarized_turns
+        self.entities = {}
+        self.stats = {'folds': 0, 'fold_errors': 0, 'fold_seconds': 0.0, 'turns_folded': 0}
+        self._lock = threading.Lock()
+        self._pending = None
+
+    def observe(self, text):
+        """Record the entities mentioned in a new turn"""
+        for kind, values in extract_entities(text).items():
+            kept = self.entities.setdefault(kind, [])
+            for value in values:
+                if value in kept:
+                    kept.remove(value)
+                kept.append(value)
+            del kept[:-MAX_ENTITIES_PER_KIND]
+
+    def render(self):
+        """Memory as system-prompt text, or an empty string if there is none yet"""
+        with self._lock:
+            summary = self.summary
+        lines = []
+        if summary:
+            lines.append(f"Summary of the earlier conversation: {summary}")
+        if self.entities:
+            facts = "; ".join(f"{kind}: {', '.join(values)}" for kind, values in self.entities.items())
+            lines.append(f"Key details mentioned so far: {facts}")
+        return "\n".join(lines)
+
+    def _unsummarized_start(self, history, total):
+        """Index into ``history`` of the first turn not covered by the summary"""
+        offset = total - len(history)
+        with self._lock:
+            return max(0, self.summarized_turns - offset)
+
+    def prompt_turns(self, history, total):
+        """Turns to send verbatim: everything the summary does not cover yet"""
+        start = self._unsummarized_start(history, total)
+        return [history[i] for i in range(start, len(history))]
+
+    @property
+    def folding(self):
+        return self._pending is not None and not self._pending.done()
+
+    def maybe_fold(self, history, total, summarize, on_fold=None):
+        """Start a background fold of the oldest turns if enough have piled up
+
+        ``summarize(turns, previous_summary)`` returns the updated summary
+        text, or a string starting with "Error" on failure (the turns then
+        stay verbatim and are retried on a later turn). After a successful
+        fold, ``on_fold(summary, summarized_turns)`` is called from the
+        background thread, e.g. to persist the summary. Returns True if a
+        fold was started.
+        """
+        if self.folding:
+            return False
+        start = self._unsummarized_start(history, total)
+        unsummarized = len(history) - start
+        if unsummarized <= self.recent_turns + self.fold_batch:
+            return False
+
+        end = len(history) - self.recent_turns
+        turns = [history[i] for i in range(start, end)]
+        folded_until = (total - len(history)) + end
+        with self._lock:
+            previous = self.summary
+
+        def fold():
+            started = time.perf_counter()
+            summary = summarize(turns, previous)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stats['fold_seconds'] += elapsed
+                if not summary or summary.startswith("Error"):
+                    self.stats['fold_errors'] += 1
+                    return
+                self.summary = summary
+                self.summarized_turns = folded_until
+                self.stats['folds'] += 1
+                self.stats['turns_folded'] += len(turns)
+            if on_fold is not None:
+                on_fold(summary, folded_until)
+
+        self._pending = _executor.submit(fold)
+        return True
+
+    def wait(self, timeout=None):
+        """Block until the fold in progress (if any) has finished"""
+        if self._pending is not None:
+            self._pending.result(timeout)
@@ -0,0 +1,260 @@
+"""Durable conversation store backed by SQLite.
+
+Turns and per-session state (detected language, last summary) are written
+by a single background thread that drains a queue and commits in batches,
+so appending a turn from the voice loop never waits on disk. When a batch
+fails, its operations are written again one at a time, so only the ones
+that fail on their own are dropped (and logged). The database runs in WAL
+mode so readers (session resume, lazy loading of older turns) do not
+block the writer.
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB_PATH = os.getenv("CONVERSATION_DB_PATH", "conversations.db")
+
+# Writer batching: commit after this many operations or this many seconds
+BATCH_MAX_OPS = 64
+BATCH_MAX_DELAY = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    detected_language TEXT,
+    last_summary TEXT,
+    last_summary_turns INTEGER
+);
+CREATE TABLE IF NOT EXISTS turns (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_turns_session_time ON turns (session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);
+"""
+
+SESSION_FIELDS = ('detected_language', 'last_summary', 'last_summary_turns')
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+def _connect(path):
+    """Open a connection configured for WAL and concurrent readers"""
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+class ConversationStore:
+    """SQLite conversation store with an asynchronous batched writer"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_max_ops=BATCH_MAX_OPS, batch_max_delay=BATCH_MAX_DELAY):
+        self.path = path
+        self.batch_max_ops = batch_max_ops
+        self.batch_max_delay = batch_max_delay
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self.stats = {'ops': 0, 'batches': 0, 'errors': 0, 'dropped': 0}
+
+        conn = _connect(path)
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="conversation-store-writer", daemon=True)
+        self._writer.start()
+
+    # Writes (asynchronous)
+
+    def append_turn(self, session_id, seq, role, text, created_at=None):
+        """Queue a turn for persistence and return immediately"""
+        self._queue.put(('turn', (session_id, seq, role, text, created_at or time.time())))
+
+    def update_session(self, session_id, **fields):
+        """Queue an upsert of per-session state (detected_language, last_summary, ...)"""
+        unknown = set(fields) - set(SESSION_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown session fields: {', '.join(sorted(unknown))}")
+        self._queue.put(('session', (session_id, fields, time.time())))
+
+    def flush(self):
+        """Block until every queued write has been committed"""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread"""
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    def _write_loop(self):
+        """Drain the queue, committing operations in batches"""
+        conn = _connect(self.path)
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.batch_max_delay
+            stop = False
+            while len(batch) < self.batch_max_ops:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    next_item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if next_item is _STOP:
+                    stop = True
+                    break
+                batch.append(next_item)
+
+            try:
+                self._write_batch(conn, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if stop:
+                self._queue.task_done()
+                break
+        conn.close()
+
+    def _write_batch(self, conn, batch):
+        """Commit a batch; if it fails, write its operations one at a time so one bad row loses only itself"""
+        try:
+            with conn:
+                for operation in batch:
+                    self._write_operation(conn, operation)
+            self.stats['ops'] += len(batch)
+            self.stats['batches'] += 1
+            return
+        except sqlite3.Error:
+            self.stats['errors'] += 1
+            logger.exception("Conversation store batch of %d operations failed; writing them one at a time",
+                             len(batch))
+
+        for operation in batch:
+            try:
+                with conn:
+                    self._write_operation(conn, operation)
+                self.stats['ops'] += 1
+            except sqlite3.Error:
+                self.stats['dropped'] += 1
+                logger.exception("Dropped conversation store %s write for session %s", operation[0], operation[1][0])
+
+    def _write_operation(self, conn, operation):
+        kind, args = operation
+        if kind == 'turn':
+            self._write_turn(conn, *args)
+        else:
+            self._write_session(conn, *args)
+
+    @staticmethod
+    def _write_turn(conn, session_id, seq, role, text, created_at):
+        conn.execute(
+            "INSERT INTO sessions (session_id, created_at, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (session_id, created_at, created_at),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO turns (session_id, seq, role, text, created_at) VALUES (?, ?, ?, ?, ?)",
+            (session_id, seq, role, text, created_at),
+        )
+
+    @staticmethod
+    def _write_session(conn, session_id, fields, updated_at):
+        conn.execute(
+            "INSERT INTO sessions (session_id, created_at, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (session_id, updated_at, updated_at),
+        )
+        if fields:
+            assignments = ", ".join(f"{name} = ?" for name in fields)
+            conn.execute(
+                f"UPDATE sessions SET {assignments} WHERE session_id = ?",
+                (*fields.values(), session_id),
+            )
+
+    # Reads (synchronous, one connection per thread)
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = _connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def load_session(self, session_id):
+        """Return stored session state and turn count, or None if unknown"""
+        conn = self._reader()
+        row = conn.execute(
+            "SELECT created_at, updated_at, detected_language, last_summary, last_summary_turns "
+            "FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        turn_count, last_seq = conn.execute(
+            "SELECT COUNT(*), MAX(seq) FROM turns WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return {
+            'session_id': session_id,
+            'created_at': row[0],
+            'updated_at': row[1],
+            'detected_language': row[2],
+            'last_summary': row[3],
+            'last_summary_turns': row[4],
+            'turn_count': turn_count,
+            'last_seq': last_seq,
+        }
+
+    def load_turns(self, session_id, before_seq=None, limit=50):
+        """Return up to ``limit`` (seq, role, text) turns older than ``before_seq``, oldest first"""
+        conn = self._reader()
+        if before_seq is None:
+            rows = conn.execute(
+                "SELECT seq, role, text FROM turns WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                (session_id, limit),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT seq, role, text FROM turns WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (session_id, before_seq, limit),
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    def list_sessions(self, updated_after=None, updated_before=None):
+        """Yield (session_id, updated_at) for sessions in a time range, oldest first"""
+        conn = self._reader()
+        query = "SELECT session_id, updated_at FROM sessions WHERE updated_at >= ? AND updated_at < ? ORDER BY updated_at"
+        yield from conn.execute(query, (updated_after or 0, updated_before or float('inf')))
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_conversation_store(path=DEFAULT_DB_PATH):
+    """Return the process-wide conversation store, creating it on first use"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ConversationStore(path)
+        return _default_store
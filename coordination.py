@@ -0,0 +1,426 @@
+"""Shared coordination between app workers.
+
+When several Streamlit or server replicas run side by side, each one used
+to fetch its own IAM token, keep its own caches and call watsonx and
+Google ASR at its own pace, so together they ran into 429s. ``Coordinator``
+puts that state behind one pluggable backend:
+
+  * the IAM token, fetched by one worker and shared until shortly before
+    it expires
+  * TTS audio and LLM response caches
+  * per-upstream rate limits as a GCRA token bucket. Callers reserve the
+    next free slot and sleep until it, so requests are admitted in the
+    order they arrived instead of failing. Only a wait longer than
+    ``ADMISSION_MAX_WAIT`` is refused.
+
+Backends are chosen with ``COORDINATION_URL``:
+
+    memory://                  in-process only (single worker, tests)
+    sqlite:///coordination.db  processes on one host (default)
+    redis://host:6379/0        processes on several hosts; needs the
+                               ``redis`` package and works with any
+                               Redis-protocol server
+
+Rate-limit slots use wall-clock time, so hosts sharing a Redis backend
+should be NTP-synchronized.
+
+The SQLite file holds the IAM bearer token, so it is created readable by
+its owner only. Cached blobs are capped at ``CACHE_MAX_BYTES`` there and
+evicted least recently used first; the memory backend caps entries the
+same way, and a Redis server is bounded by its own ``maxmemory`` policy.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+COORDINATION_URL = os.getenv("COORDINATION_URL", "sqlite:///coordination.db")
+
+# Longest a caller will wait for a rate-limit slot before the request is refused
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "30"))
+
+# Upstream limits shared by all workers: sustained requests per second and burst size
+RATE_LIMITS = {
+    'watsonx': {
+        'rate': float(os.getenv("WATSONX_RATE_LIMIT", "8")),
+        'burst': int(os.getenv("WATSONX_RATE_BURST", "8"))
+    },
+    'google_asr': {
+        'rate': float(os.getenv("GOOGLE_ASR_RATE_LIMIT", "5")),
+        'burst': int(os.getenv("GOOGLE_ASR_RATE_BURST", "10"))
+    },
+    'iam': {
+        'rate': 1.0,
+        'burst': 2
+    },
+}
+
+# Cache lifetimes in seconds
+TTS_CACHE_TTL = 24 * 3600
+RESPONSE_CACHE_TTL = 600
+
+# Total size of cached blobs in the SQLite backend before the least recently used are evicted
+CACHE_MAX_BYTES = int(os.getenv("COORDINATION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Refresh the shared IAM token this long before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+# How long other workers wait for the worker that is fetching the token
+TOKEN_LOCK_TTL = 30
+
+logger = logging.getLogger(__name__)
+
+
+def _gcra_reserve(tat, now, interval, tolerance, max_wait):
+    """GCRA step: return (wait, new_tat), or (None, tat) if the wait exceeds ``max_wait``"""
+    tat = max(tat, now)
+    wait = max(0.0, tat - tolerance - now)
+    if wait > max_wait:
+        return None, tat
+    return wait, tat + interval
+
+
+class MemoryBackend:
+    """In-process backend; also the stand-in used by tests and benchmarks"""
+
+    name = "memory"
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.time())
+            if entry is None:
+                return None
+            # Move to the end so eviction drops the least recently used entry
+            del self._data[key]
+            self._data[key] = entry
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+            while len(self._data) > self.max_entries:
+                del self._data[next(iter(self._data))]
+
+    def add(self, key, value, ttl=None):
+        """Set ``key`` only if it is absent; True if it was set"""
+        with self._lock:
+            if self._live(key, time.time()) is not None:
+                return False
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def reserve(self, key, interval, tolerance, max_wait):
+        with self._lock:
+            now = time.time()
+            entry = self._live(key, now)
+            wait, tat = _gcra_reserve(float(entry[0]) if entry else now, now, interval, tolerance, max_wait)
+            self._data[key] = (tat, tat + tolerance + 1)
+            return wait
+
+
+class SQLiteBackend:
+    """Backend shared by processes on one host through a SQLite file"""
+
+    name = "sqlite"
+
+    # Delete expired rows after this many writes
+    PURGE_EVERY = 256
+
+    def __init__(self, path, max_cache_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_cache_bytes = max_cache_bytes
+        # The file holds the bearer token: create it owner-only (SQLite gives -wal/-shm the same mode)
+        if path != ":memory:":
+            os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+            os.chmod(path, 0o600)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB, expires_at REAL, accessed_at REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(kv)")}
+        if 'accessed_at' not in columns:
+            self._conn.execute("ALTER TABLE kv ADD COLUMN accessed_at REAL")
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _after_write(self):
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def _evict_cache(self):
+        """Delete the least recently used cache rows until they fit in ``max_cache_bytes``"""
+        rows = self._conn.execute(
+            "SELECT key, length(value) FROM kv WHERE key >= 'cache:' AND key < 'cache;' "
+            "ORDER BY accessed_at DESC"
+        ).fetchall()
+        total = 0
+        evicted = []
+        for key, size in rows:
+            total += size or 0
+            if total > self.max_cache_bytes:
+                evicted.append((key,))
+        if evicted:
+            self._conn.executemany("DELETE FROM kv WHERE key = ?", evicted)
+
+    def get(self, key):
+        with self._lock:
+            now = time.time()
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone()
+            if row and key.startswith("cache:"):
+                self._conn.execute("UPDATE kv SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0] if row else None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            now = time.time()
+            if not key.startswith("cache:"):
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO kv (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now + ttl if ttl else None, now)
+                )
+                self._after_write()
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO kv (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now + ttl if ttl else None, now)
+                )
+                self._evict_cache()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._after_write()
+
+    def add(self, key, value, ttl=None):
+        """Set ``key`` only if it is absent; True if it was set"""
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM kv WHERE key = ? AND expires_at <= ?", (key, now))
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, now + ttl if ttl else None)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cursor.rowcount == 1
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def reserve(self, key, interval, tolerance, max_wait):
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock, so the read-modify-write is atomic across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+                wait, tat = _gcra_reserve(float(row[0]) if row else now, now, interval, tolerance, max_wait)
+                if wait is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, repr(tat), tat + tolerance + 1)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return wait
+
+
+# Atomic GCRA reservation: KEYS[1] holds the theoretical arrival time
+_RESERVE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local tolerance = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local tat = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+if tat < now then tat = now end
+local wait = tat - tolerance - now
+if wait < 0 then wait = 0 end
+if wait > max_wait then return '-1' end
+tat = tat + interval
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat + tolerance + 1 - now) * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Backend shared across hosts through any Redis-protocol server"""
+
+    name = "redis"
+
+    def __init__(self, client, prefix="voicebot:"):
+        self.client = client
+        self.prefix = prefix
+        self._reserve = client.register_script(_RESERVE_SCRIPT)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        """Set ``key`` only if it is absent; True if it was set"""
+        return bool(self.client.set(self.prefix + key, value, nx=True, px=int(ttl * 1000) if ttl else None))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def reserve(self, key, interval, tolerance, max_wait):
+        wait = float(self._reserve(keys=[self.prefix + key], args=[time.time(), interval, tolerance, max_wait]))
+        return None if wait < 0 else wait
+
+
+def create_backend(url=COORDINATION_URL):
+    """Create the backend for a ``COORDINATION_URL``"""
+    if url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        try:
+            import redis
+        except ImportError:
+            logger.warning("redis is not installed; falling back to in-process coordination")
+            return MemoryBackend()
+        return RedisBackend(redis.Redis.from_url(url))
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported COORDINATION_URL: {url}")
+
+
+def cache_key(*parts):
+    """Stable short key for cache entries built from arbitrary values"""
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32]
+
+
+class Coordinator:
+    """Shared token, caches and rate limits on top of a backend"""
+
+    def __init__(self, backend, rate_limits=RATE_LIMITS, max_wait=ADMISSION_MAX_WAIT):
+        self.backend = backend
+        self.rate_limits = rate_limits
+        self.max_wait = max_wait
+        self.stats = {
+            'token_fetches': 0, 'token_hits': 0,
+            'cache_hits': 0, 'cache_misses': 0,
+            'admitted': 0, 'refused': 0, 'waited_seconds': 0.0, 'max_wait_seconds': 0.0
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def acquire(self, resource):
+        """Wait for a rate-limit slot on ``resource``; False if the wait would exceed ``max_wait``"""
+        limit = self.rate_limits.get(resource)
+        if limit is None:
+            return True
+        interval = 1.0 / limit['rate']
+        tolerance = interval * (limit['burst'] - 1)
+        wait = self.backend.reserve(f"rate:{resource}", interval, tolerance, self.max_wait)
+        if wait is None:
+            self._count('refused')
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        with self._stats_lock:
+            self.stats['admitted'] += 1
+            self.stats['waited_seconds'] += wait
+            self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], wait)
+        return True
+
+    def shared_token(self, name, fetch):
+        """Return the shared token ``name``, calling ``fetch()`` in one worker when it is missing
+
+        ``fetch`` returns ``(token, expires_in_seconds)`` and raises on
+        failure; the exception reaches the caller and nothing is cached.
+        Other workers wait for the fetching worker instead of fetching a
+        token of their own. A worker that gives up waiting after
+        ``TOKEN_LOCK_TTL`` fetches without the lock and leaves it alone.
+        """
+        key = f"token:{name}"
+        token = self.backend.get(key)
+        if token is not None:
+            self._count('token_hits')
+            return token.decode('utf-8') if isinstance(token, bytes) else token
+
+        deadline = time.monotonic() + TOKEN_LOCK_TTL
+        locked = self.backend.add(f"{key}:lock", b"1", TOKEN_LOCK_TTL)
+        while not locked:
+            time.sleep(0.05)
+            token = self.backend.get(key)
+            if token is not None:
+                self._count('token_hits')
+                return token.decode('utf-8') if isinstance(token, bytes) else token
+            if time.monotonic() > deadline:
+                break
+            locked = self.backend.add(f"{key}:lock", b"1", TOKEN_LOCK_TTL)
+
+        try:
+            self._count('token_fetches')
+            token, expires_in = fetch()
+            if token:
+                self.backend.set(key, token.encode('utf-8'), max(60, (expires_in or 3600) - TOKEN_REFRESH_MARGIN))
+            return token
+        finally:
+            # Only the worker that took the lock may release it
+            if locked:
+                self.backend.delete(f"{key}:lock")
+
+    def cache_get(self, namespace, key):
+        """Cached bytes for ``key`` in ``namespace``, or None"""
+        value = self.backend.get(f"cache:{namespace}:{key}")
+        self._count('cache_hits' if value is not None else 'cache_misses')
+        return value
+
+    def cache_set(self, namespace, key, value, ttl):
+        self.backend.set(f"cache:{namespace}:{key}", value, ttl)
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_coordinator():
+    """Process-wide coordinator for ``COORDINATION_URL``"""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = Coordinator(create_backend())
+        return _coordinator
@@ -0,0 +1,47 @@
+"""Pooled HTTP connections for the IBM Cloud endpoints.
+
+Each ``requests.post`` opened a new connection, so every token fetch and
+generation call paid for DNS, TCP and TLS again. All calls to IAM and
+watsonx.ai go through one process-wide ``requests.Session`` instead. Its
+connections are kept alive and reused, up to ``HTTP_POOL_SIZE`` per host,
+and ``session_warmup`` opens them before the first turn.
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Keep-alive connections kept per host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "8"))
+
+IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Process-wide session with a keep-alive connection pool per host"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def open_connections(urls, timeout=5.0):
+    """Open a pooled connection to the host of each URL; returns the hosts that answered"""
+    session = get_http_session()
+    opened = []
+    for url in urls:
+        try:
+            # Any status will do: the connection goes back to the pool once the response is read
+            session.head(url, timeout=timeout, allow_redirects=False).close()
+            opened.append(requests.utils.urlparse(url).netloc)
+        except requests.RequestException:
+            continue
+    return opened
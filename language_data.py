@@ -0,0 +1,364 @@
+"""Static language tables for the multilingual voice bot.
+
+These tables live in their own module so that Streamlit reruns, which
+re-execute VoiceAgent.py top to bottom, reuse the already-imported module
+instead of rebuilding the literals on every interaction.
+"""
+from collections import defaultdict
+
+# Common words and patterns for each language
+LANGUAGE_PATTERNS = {
+    'hi': {
+        'words': [
+            # Common verbs
+            'हैं', 'है', 'था', 'थी', 'थे', 'होगा', 'होगी', 'होंगे', 'करना', 'करेंगे', 'करूंगा', 'करेंगी',
+            'आना', 'जाना', 'खाना', 'पीना', 'सोना', 'उठना', 'बैठना', 'देखना', 'सुनना', 'बोलना',
+            'पढ़ना', 'लिखना', 'चलना', 'दौड़ना', 'हंसना', 'रोना', 'गाना', 'नाचना', 'खेलना', 'काम करना',
+            # Common pronouns
+            'मैं', 'हम', 'तुम', 'आप', 'वह', 'यह', 'वे', 'ये', 'मुझे', 'हमें', 'तुम्हें', 'आपको',
+            'मेरा', 'मेरी', 'मेरे', 'हमारा', 'हमारी', 'हमारे', 'तुम्हारा', 'तुम्हारी', 'तुम्हारे',
+            'आपका', 'आपकी', 'आपके', 'उसका', 'उसकी', 'उसके', 'इसका', 'इसकी', 'इसके',
+            # Common postpositions
+            'का', 'के', 'की', 'को', 'में', 'से', 'पर', 'तक', 'द्वारा', 'साथ', 'बिना', 'लिए',
+            'ऊपर', 'नीचे', 'आगे', 'पीछे', 'बीच', 'पास', 'दूर', 'अंदर', 'बाहर', 'सामने',
+            # Common conjunctions
+            'और', 'या', 'लेकिन', 'क्योंकि', 'अगर', 'तो', 'मगर', 'परंतु', 'इसलिए', 'कि',
+            'जब', 'जैसे', 'जितना', 'जहां', 'तब', 'वैसे', 'उतना', 'वहां', 'फिर', 'अभी',
+            # Common question words
+            'क्या', 'कौन', 'कहाँ', 'कब', 'कैसे', 'क्यों', 'कितना', 'कौन सा', 'किसका', 'किससे',
+            # Common adjectives
+            'अच्छा', 'बुरा', 'बड़ा', 'छोटा', 'नया', 'पुराना', 'ठंडा', 'गरम', 'सुंदर', 'बदसूरत',
+            'लंबा', 'छोटा', 'मोटा', 'पतला', 'तेज़', 'धीमा', 'ऊंचा', 'नीचा', 'रंगीन', 'सफ़ेद',
+            'काला', 'लाल', 'हरा', 'नीला', 'पीला', 'गुलाबी', 'भूरा', 'धूसर',
+            # Common adverbs
+            'बहुत', 'थोड़ा', 'ज्यादा', 'कम', 'अभी', 'फिर', 'भी', 'नहीं', 'हां', 'जी',
+            'कल', 'आज', 'कभी', 'हमेशा', 'जल्दी', 'देर', 'धीरे', 'तेज़ी', 'यहाँ', 'वहाँ',
+            # Numbers
+            'एक', 'दो', 'तीन', 'चार', 'पांच', 'छह', 'सात', 'आठ', 'नौ', 'दस',
+            'ग्यारह', 'बारह', 'तेरह', 'चौदह', 'पंद्रह', 'सोलह', 'सत्रह', 'अठारह', 'उन्नीस', 'बीस',
+            # Time expressions
+            'सुबह', 'दोपहर', 'शाम', 'रात', 'दिन', 'हफ्ता', 'महीना', 'साल', 'समय', 'घंटा',
+            # Common nouns
+            'घर', 'परिवार', 'माता', 'पिता', 'भाई', 'बहन', 'बच्चा', 'आदमी', 'औरत', 'लड़का', 'लड़की',
+            'पानी', 'खाना', 'रोटी', 'चावल', 'दूध', 'चाय', 'कॉफी', 'फल', 'सब्जी'
+        ],
+        'patterns': [
+            # Verb patterns - Present tense
+            r'[ता|ती|ते]\s+[हैं|है|हूं]',
+            r'[रहा|रही|रहे]\s+[हैं|है|हूं]',
+            r'[चुका|चुकी|चुके]\s+[हैं|है|हूं]',
+            # Verb patterns - Past tense
+            r'[आ|ई|ए]\s+[था|थी|थे]',
+            r'[करके|आकर|जाकर|देखकर]',
+            # Verb patterns - Future tense
+            r'[गा|गी|गे]',
+            r'[ऊंगा|ऊंगी|ेंगे|ेंगी]',
+            # Postposition patterns
+            r'[का|के|की|को|में|से|पर|तक]',
+            r'[द्वारा|साथ|बिना|लिए]',
+            r'[ऊपर|नीचे|आगे|पीछे|बीच|पास|दूर|अंदर|बाहर]',
+            # Question patterns
+            r'क्[या|यों|या]',
+            r'[कहाँ|कब|कैसे|क्यों|कितना|कौन]',
+            # Word ending patterns
+            r'[ने|से|को|में|पर|ता|ती|ते]$',
+            r'[गा|गी|गे|ना|नी|ने]$',
+            r'[वाला|वाली|वाले]$',
+            r'[इया|ियां|इयों]$',
+            # Honorific patterns
+            r'[जी|साहब|महोदय|श्रीमान|श्रीमती]',
+            # Conjunctive particles
+            r'[भी|तो|ही|तक|सिर्फ|केवल]',
+            # Common Hindi word patterns
+            r'[हिंदी|भारत|देश|समय|दिन|रात|सुबह|शाम]',
+            # Compound verb patterns
+            r'[दे|ले|आ|जा]\s+[दिया|लिया|आया|गया]',
+            # Negative patterns
+            r'न[हीं|ही]',
+            r'मत',
+            # Conditional patterns
+            r'[अगर|यदि].*तो',
+            # Relative-correlative patterns
+            r'[जो|जिस|जहां].*[वो|उस|वहां]'
+        ]
+    },
+    'ta': {
+        'words': [
+            # Common pronouns
+            'நான்', 'நாங்கள்', 'நாம்', 'நீ', 'நீங்கள்', 'அவன்', 'அவள்', 'அவர்', 'அவர்கள்', 
+            'இது', 'அது', 'இவை', 'அவை', 'எது', 'யார்', 'எவர்',
+            'என்', 'எங்கள்', 'எனது', 'எங்களது', 'உன்', 'உங்கள்', 'உனது', 'உங்களது',
+            'அவன்', 'அவனது', 'அவள்', 'அவளது', 'அவர்', 'அவரது', 'அவர்கள்', 'அவர்களது',
+            # Common verbs
+            'உள்ளது', 'இல்லை', 'வருகிறேன்', 'போகிறேன்', 'செய்கிறேன்', 'பார்க்கிறேன்', 'கேட்கிறேன்',
+            'வந்தேன்', 'போனேன்', 'செய்தேன்', 'பார்த்தேன்', 'கேட்டேன்', 'சாப்பிட்டேன்', 'குடித்தேன்',
+            'வருவேன்', 'போவேன்', 'செய்வேன்', 'பார்ப்பேன்', 'கேட்பேன்', 'சாப்பிடுவேன்', 'குடிப்பேன்',
+            'படிக்கிறேன்', 'எழுதுகிறேன்', 'நடக்கிறேன்', 'ஓடுகிறேன்', 'சிரிக்கிறேன்', 'அழுகிறேன்',
+            'பாடுகிறேன்', 'ஆடுகிறேன்', 'விளையாடுகிறேன்', 'வேலை செய்கிறேன்',
+            # Common postpositions
+            'இல்', 'இடம்', 'வரை', 'மூலம்', 'ஆக', 'ஆல்', 'உடன்', 'இல்லாமல்', 'போல்',
+            'மேல்', 'கீழ்', 'முன்', 'பின்', 'நடுவில்', 'அருகில்', 'தொலைவில்', 'உள்ளே', 'வெளியே',
+            # Common conjunctions
+            'மற்றும்', 'அல்லது', 'ஆனால்', 'என்றால்', 'ஏனெனில்', 'ஆகையால்', 'எனவே',
+            'எப்போது', 'போல்', 'எவ்வளவு', 'எங்கே', 'எப்படி', 'இன்னும்', 'கூட',
+            # Common question words
+            'என்ன', 'எப்படி', 'எங்கே', 'எப்போது', 'ஏன்', 'எத்தனை', 'எந்த', 'யார்',
+            'எது', 'எவர்', 'எவை', 'எதை', 'யாரை', 'எங்கிருந்து', 'எங்கு',
+            # Common adjectives
+            'நல்ல', 'கெட்ட', 'பெரிய', 'சிறிய', 'புதிய', 'பழைய', 'குளிர்ந்த', 'சூடான',
+            'நீண்ட', 'குறுகிய', 'தடிமான', 'மெல்லிய', 'வேகமான', 'மெதுவான', 'உயர்ந்த', 'தாழ்ந்த',
+            'அழகான', 'அசிங்கமான', 'வெள்ளை', 'கருப்பு', 'சிவப்பு', 'பச்சை', 'நீலம்', 'மஞ்சள்',
+            'இளஞ்சிவப்பு', 'பழுப்பு', 'சாம்பல்',
+            # Common adverbs
+            'மிகவும்', 'கொஞ்சம்', 'அதிகம்', 'குறைவாக', 'இப்போது', 'மீண்டும்', 'உம்', 'இல்லை',
+            'நேற்று', 'இன்று', 'நாளை', 'எப்போதும்', 'எப்போதாவது', 'சீக்கிரம்', 'தாமதம்', 'மெதுவாக',
+            # Numbers
+            'ஒன்று', 'இரண்டு', 'மூன்று', 'நான்கு', 'ஐந்து', 'ஆறு', 'ஏழு', 'எட்டு', 'ஒன்பது', 'பத்து',
+            'பதினொன்று', 'பனிரெண்டு', 'பதிமூன்று', 'பதினான்கு', 'பதினைந்து', 'பதினாறு', 'பதினேழு',
+            'பதினெட்டு', 'பத்தொன்பது', 'இருபது',
+            # Time expressions
+            'காலை', 'மதியம்', 'மாலை', 'இரவு', 'நாள்', 'வாரம்', 'மாதம்', 'வருடம்', 'நேரம்', 'மணி',
+            # Common nouns
+            'வீடு', 'குடும்பம்', 'அம்மா', 'அப்பா', 'அண்ணன்', 'தம்பி', 'அக்காள்', 'தங்கை',
+            'குழந்தை', 'ஆண்', 'பெண்', 'பையன்', 'பெண்',
+            'தண்ணீர்', 'சாப்பாடு', 'சோறு', 'ரொட்டி', 'பால்', 'டீ', 'காபி', 'பழம்', 'காய்கறி'
+        ],
+        'patterns': [
+            # Verb patterns - Present tense
+            r'[கிற|ற][ேன்|ாய்|ான்|ாள்|ார்|ோம்|ீர்கள்|ார்கள்]',
+            r'[ன்|ள்|ர்|ம்|ங்கள்]$',
+            # Verb patterns - Past tense
+            r'[ந்த|ட்ட|த்த|ற்ற][ேன்|ாய்|ான்|ாள்|ார்|ோம்|ீர்கள்|ார்கள்]',
+            r'[த்|ட்|ன்|ர்][த|ட]',
+            # Verb patterns - Future tense
+            r'[வ|ப்ப|ட்][ேன்|ாய்|ான்|ாள்|ார்|ோம்|ீர்கள்|ார்கள்]',
+            # Question patterns
+            r'[என்ன|எப்படி|எங்கே|எப்போது|ஏன்|எத்தனை|யார்]',
+            r'[எது|எந்த|எவர்|எவை]',
+            # Word ending patterns
+            r'[ன்|ள்|ர்|து|ும்|ேன்|ோம்|ால்|உக்கு|இல்|அது]$',
+            r'[கிற|ந்த|வ|க்கு|வில்|டு|ஆல்|உடன்]',
+            # Postposition patterns
+            r'[இல்|வில்|ஆல்|உடன்|மூலம்|வரை|பிறகு]',
+            r'[மேல்|கீழ்|முன்|பின்|அருகில்|நடுவில்]',
+            # Case marker patterns
+            r'[ஐ|அ|உக்கு|ஆல்|இல்|ிடம்|ோடு]$',
+            # Honorific patterns
+            r'[அவர்கள்|தாங்கள்|இவர்கள்]',
+            # Plural patterns
+            r'[கள்|ங்கள்]$',
+            # Compound verb patterns
+            r'[கொண்டு|விட்டு|போட்டு]\s+[வர|போ|கொள்|தர|கொடு]',
+            # Common Tamil word patterns
+            r'[தமிழ்|இந்தியா|நாடு|காலம்|நாள்|இரவு|காலை|மாலை]',
+            # Number patterns with Tamil numerals
+            r'[௧|௨|௩|௪|௫|௬|௭|௮|௯|௦]',
+            # Conjunctive particles
+            r'[உம்|ேனும்|ாவது|கூட|மட்டும்|தான்]',
+            # Relative patterns
+            r'[எந்த|எவ].*[அந்த|அவ]',
+            # Negative patterns
+            r'[இல்லை|மாட்|ாமல்|வேண்டாம்]',
+            # Special Telugu patterns
+            r'[ஆ|ஈ|ஊ|ஏ|ஐ|ஓ|ஔ]',
+            r'[க்|ங்|ச்|ஞ்|ட்|ண்|த்|ந்|ப்|ம்|ய்|ர்|ல்|வ்|ழ்|ள்|ற்|ன்]'
+        ]
+    },
+    'en': {
+        'words': [
+            # Common verbs
+            'is', 'are', 'was', 'were', 'will', 'have', 'has', 'had', 'do', 'does', 'did',
+            'can', 'could', 'would', 'should', 'may', 'might', 'must', 'shall', 'ought',
+            'go', 'come', 'see', 'get', 'make', 'take', 'give', 'know', 'think', 'feel',
+            'want', 'need', 'like', 'love', 'hate', 'work', 'play', 'run', 'walk', 'talk',
+            'eat', 'drink', 'sleep', 'wake', 'read', 'write', 'listen', 'watch', 'look',
+            # Common pronouns
+            'I', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+            'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours', 'hers', 'ours', 'theirs',
+            'this', 'that', 'these', 'those', 'who', 'whom', 'whose', 'which', 'what',
+            'myself', 'yourself', 'himself', 'herself', 'itself', 'ourselves', 'themselves',
+            # Common prepositions and articles
+            'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'from', 'of',
+            'up', 'down', 'over', 'under', 'above', 'below', 'between', 'among', 'through',
+            'during', 'before', 'after', 'since', 'until', 'about', 'around', 'near', 'far',
+            'inside', 'outside', 'behind', 'beside', 'against', 'toward', 'towards',
+            # Common conjunctions
+            'and', 'or', 'but', 'because', 'if', 'then', 'although', 'while', 'since',
+            'unless', 'until', 'when', 'where', 'why', 'how', 'whether', 'either', 'neither',
+            'both', 'not only', 'as well as', 'however', 'therefore', 'moreover', 'furthermore',
+            # Common question words
+            'what', 'who', 'where', 'when', 'how', 'why', 'which', 'whose', 'whom',
+            # Common adjectives
+            'good', 'bad', 'big', 'small', 'new', 'old', 'hot', 'cold', 'long', 'short',
+            'tall', 'high', 'low', 'fast', 'slow', 'easy', 'hard', 'light', 'dark', 'heavy',
+            'beautiful', 'ugly', 'nice', 'kind', 'mean', 'smart', 'stupid', 'funny', 'serious',
+            'happy', 'sad', 'angry', 'excited', 'tired', 'hungry', 'thirsty', 'sick', 'healthy',
+            'rich', 'poor', 'young', 'old', 'strong', 'weak', 'clean', 'dirty', 'full', 'empty',
+            # Common adverbs
+            'very', 'much', 'many', 'few', 'now', 'then', 'also', 'not', 'yes', 'no',
+            'here', 'there', 'everywhere', 'somewhere', 'nowhere', 'always', 'never', 'sometimes',
+            'often', 'usually', 'rarely', 'today', 'yesterday', 'tomorrow', 'soon', 'late',
+            'early', 'quickly', 'slowly', 'carefully', 'loudly', 'quietly', 'well', 'badly',
+            # Numbers
+            'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+            'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen',
+            'eighteen', 'nineteen', 'twenty', 'thirty', 'forty', 'fifty', 'hundred', 'thousand',
+            # Time expressions
+            'morning', 'afternoon', 'evening', 'night', 'day', 'week', 'month', 'year', 'time', 'hour',
+            'minute', 'second', 'moment', 'while', 'period', 'season', 'spring', 'summer', 'fall', 'winter',
+            # Common nouns
+            'person', 'people', 'man', 'woman', 'child', 'family', 'friend', 'house', 'home', 'school',
+            'work', 'job', 'money', 'food', 'water', 'car', 'book', 'phone', 'computer', 'internet'
+        ],
+        'patterns': [
+            # Common word patterns with word boundaries
+            r'\b(the|and|that|have|with|this|but|from|they|would|there|been|many|some|time)\b',
+            r'\b(which|their|said|each|she|way|make|use|her|could|water|than|first|who)\b',
+            r'\b(its|now|find|long|down|day|did|get|come|made|may|part)\b',
+            
+            # Verb patterns
+            r'\b\w+ing\b',  # Present participle
+            r'\b\w+ed\b',   # Past tense/past participle
+            r'\b\w+s\b',    # Third person singular
+            r'\b\w+ly\b',   # Adverbs
+            
+            # Modal verbs
+            r'\b(can|could|will|would|shall|should|may|might|must|ought)\b',
+            
+            # Auxiliary verbs
+            r'\b(is|are|was|were|am|be|being|been)\b',
+            r'\b(have|has|had|having)\b',
+            r'\b(do|does|did|doing|done)\b',
+            
+            # Common prefixes
+            r'\bun\w+',     # un-
+            r'\bre\w+',     # re-
+            r'\bpre\w+',    # pre-
+            r'\bdis\w+',    # dis-
+            r'\bmis\w+',    # mis-
+            r'\bover\w+',   # over-
+            r'\bunder\w+',  # under-
+            r'\bout\w+',    # out-
+            r'\bup\w+',     # up-
+            
+            # Common suffixes
+            r'\w+tion\b',   # -tion
+            r'\w+sion\b',   # -sion
+            r'\w+ness\b',   # -ness
+            r'\w+ment\b',   # -ment
+            r'\w+able\b',   # -able
+            r'\w+ible\b',   # -ible
+            r'\w+ful\b',    # -ful
+            r'\w+less\b',   # -less
+            r'\w+ship\b',   # -ship
+            r'\w+hood\b',   # -hood
+            
+            # Comparative and superlative
+            r'\w+er\b',     # -er (comparative)
+            r'\w+est\b',    # -est (superlative)
+            
+            # Question patterns
+            r'\b(what|who|where|when|why|how|which|whose)\b.*\?',
+            r'\b(is|are|do|does|did|can|could|will|would)\b.*\?',
+            
+            # Contractions
+            r"\b\w+'(t|s|re|ve|ll|d|m)\b",  # Common contractions
+            
+            # Possessive patterns
+            r"\b\w+'s\b",   # Possessive 's
+            r"\b\w+s'\b",   # Plural possessive
+            
+            # Sentence starters
+            r'\b(The|A|An|This|That|These|Those|My|Your|His|Her|Our|Their)\b',
+            
+            # Common English phrases
+            r'\b(as well as|in order to|such as|more than|less than|at least|at most)\b',
+            r'\b(not only|but also|either or|neither nor|both and)\b',
+            
+            # Time expressions
+            r'\b(in the morning|in the afternoon|in the evening|at night)\b',
+            r'\b(last year|next year|this year|every day|every week)\b',
+            
+            # Frequency adverbs
+            r'\b(always|usually|often|sometimes|rarely|never|seldom)\b',
+            
+            # Intensifiers
+            r'\b(very|quite|rather|pretty|fairly|extremely|incredibly|absolutely)\b'
+        ]
+    }
+}
+
+# Language n-gram models
+LANGUAGE_NGRAMS = {
+    'en': {
+        'unigrams': defaultdict(float),
+        'bigrams': defaultdict(float),
+        'trigrams': defaultdict(float)
+    },
+    'hi': {
+        'unigrams': defaultdict(float),
+        'bigrams': defaultdict(float),
+        'trigrams': defaultdict(float)
+    },
+    'ta': {
+        'unigrams': defaultdict(float),
+        'bigrams': defaultdict(float),
+        'trigrams': defaultdict(float)
+    }
+}
+
+# Pre-computed language statistics
+LANGUAGE_STATS = {
+    'en': {
+        'avg_word_length': 4.7,
+        'common_chars': set('etaoinshrdlu'),
+        'vowel_ratio': 0.4,
+        'consonant_clusters': ['th', 'st', 'ch', 'sh', 'ph', 'wh'],
+        'common_endings': ['ing', 'ed', 'ion', 'ity', 'ment', 'ness'],
+        'script_ratio': 0.95
+    },
+    'hi': {
+        'avg_word_length': 5.2,
+        'common_chars': set('कखगघङचछजझञटठडढणतथदधनपफबभमयरलवशषसह'),
+        'vowel_ratio': 0.35,
+        'consonant_clusters': ['क्र', 'त्र', 'श्र', 'ज्ञ', 'द्व'],
+        'common_endings': ['ता', 'ती', 'ते', 'गा', 'गी', 'गे'],
+        'script_ratio': 0.98
+    },
+    'ta': {
+        'avg_word_length': 4.8,
+        'common_chars': set('கஙசஞடணதநபமயரலவழளறன'),
+        'vowel_ratio': 0.38,
+        'consonant_clusters': ['க்ஷ', 'ஸ்ரீ', 'ஜ்ஞ'],
+        'common_endings': ['கிற', 'ந்த', 'வ', 'ப்ப', 'ட்'],
+        'script_ratio': 0.97
+    }
+}
+
+# Romanized (Latin-script) words that mark Hinglish / Tanglish tokens.
+# Words that are also common English words ('to', 'me', 'in', ...) are left out.
+ROMANIZED_LEXICON = {
+    'hi': {
+        'hai', 'hain', 'tha', 'thi', 'kya', 'kyun', 'kyon', 'kaise', 'kahan', 'kab', 'kaun',
+        'nahi', 'nahin', 'haan', 'mera', 'meri', 'mere', 'tera', 'teri', 'aap', 'aapka', 'aapki',
+        'hum', 'tum', 'mujhe', 'hoon', 'ho', 'kar', 'sakte', 'sakta', 'sakti', 'humko', 'kuch', 'bahut', 'abhi', 'phir', 'lekin', 'aur',
+        'bhi', 'sirf', 'yeh', 'woh', 'wahan', 'yahan', 'karo', 'karna', 'karein', 'kijiye',
+        'chahiye', 'raha', 'rahi', 'rahe', 'gaya', 'gayi', 'diya', 'liya', 'hoga', 'hogi',
+        'accha', 'acha', 'theek', 'thik', 'bhai', 'yaar', 'ji', 'namaste', 'dhanyavaad', 'shukriya',
+        'paisa', 'paise', 'kitna', 'kitne', 'jaldi', 'kal', 'aaj', 'matlab', 'samajh', 'batao',
+    },
+    'ta': {
+        'enna', 'eppadi', 'enga', 'engey', 'eppo', 'evvalavu', 'illa', 'illai',
+        'irukku', 'irukken', 'iruku', 'venum', 'vendam', 'naan', 'nee', 'neenga', 'avan', 'aval',
+        'avanga', 'namma', 'enakku', 'unakku', 'ungalukku', 'romba', 'konjam', 'seri', 'sari',
+        'aama', 'aamam', 'ille', 'inniki', 'innaikku', 'naalaikku', 'nethu', 'ippo', 'appo',
+        'vanakkam', 'nandri', 'panni', 'pannunga', 'sollunga', 'sonnen', 'vandhu', 'ponga',
+        'vaanga', 'saapadu', 'sapadu', 'thanni', 'kaasu', 'veedu', 'paiyan', 'ponnu', 'machan',
+    },
+}
+
+# Romanized word endings used when a Latin token is not in the lexicon
+ROMANIZED_SUFFIXES = {
+    'hi': ('ega', 'egi', 'enge', 'unga', 'ungi', 'iye', 'wala', 'wali', 'wale'),
+    'ta': ('kiren', 'kkiren', 'kanum', 'kkanum', 'ngala', 'ngalaa', 'laam', 'chu', 'kku', 'dhu'),
+}
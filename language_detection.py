@@ -0,0 +1,328 @@
+"""Text-based language detection.
+
+Utterances are scored by the trained model in ``language_model`` when its
+model file is present, and by the statistical scorer
+(``calculate_language_score``) otherwise, over the languages enabled in
+the registry. Utterances shorter than ``MODEL_MIN_LETTERS`` ("Hi", "ok")
+have too few n-grams for the model and always use the statistical scorer,
+whose low confidence on them hands the label to the segment detector and
+its romanized lexicon. A segment-level detector for
+code-mixed speech (Hinglish, Tanglish) labels spans by script and
+romanized lexicon in one linear pass.
+Nothing here touches Streamlit, so these functions can also be used from
+scripts and benchmarks.
+"""
+import unicodedata
+from collections import defaultdict
+
+from language_data import LANGUAGE_STATS, ROMANIZED_LEXICON, ROMANIZED_SUFFIXES
+from language_registry import REGISTRY
+from startup_profiler import lazy_import
+
+# Minimum utterance score (model probability or statistical score) to be trusted
+DETECTION_CONFIDENCE_THRESHOLD = 0.7
+
+# Utterances with fewer letters than this are scored statistically instead of by the model
+MODEL_MIN_LETTERS = 3
+
+def calculate_ngrams(text, n):
+    """Calculate n-grams from text"""
+    words = text.split()
+    ngrams = defaultdict(int)
+    for word in words:
+        for i in range(len(word) - n + 1):
+            ngram = word[i:i+n]
+            ngrams[ngram] += 1
+    return ngrams
+
+def calculate_language_features(text, registry=REGISTRY):
+    """Calculate various language features from text"""
+    words = text.split()
+    chars = ''.join(words)
+    
+    # Basic statistics
+    avg_word_length = sum(len(word) for word in words) / len(words) if words else 0
+    
+    # Character distribution
+    char_freq = defaultdict(int)
+    for char in chars:
+        char_freq[char] += 1
+    
+    # Vowel and consonant analysis
+    vowels = set('aeiouAEIOU')
+    vowel_count = sum(1 for char in chars if char in vowels)
+    vowel_ratio = vowel_count / len(chars) if chars else 0
+    
+    # Script analysis, with the registry's script ranges (Latin is letters only, no [\]^_`)
+    script_counts = defaultdict(int)
+    for char in chars:
+        script_counts[registry.script_of(ord(char))] += 1
+    script_chars = {lang: script_counts[registry.entries[lang]['script']] for lang in LANGUAGE_STATS}
+    
+    # Common patterns
+    common_endings = defaultdict(int)
+    for word in words:
+        if len(word) >= 3:
+            common_endings[word[-3:]] += 1
+    
+    # Consonant clusters
+    consonant_clusters = defaultdict(int)
+    for word in words:
+        for i in range(len(word) - 1):
+            if word[i].isalpha() and word[i+1].isalpha():
+                consonant_clusters[word[i:i+2]] += 1
+    
+    return {
+        'avg_word_length': avg_word_length,
+        'char_freq': dict(char_freq),
+        'vowel_ratio': vowel_ratio,
+        'script_chars': script_chars,
+        'common_endings': dict(common_endings),
+        'consonant_clusters': dict(consonant_clusters)
+    }
+
+def calculate_language_score(text, lang):
+    """Calculate language score using multiple features"""
+    features = calculate_language_features(text)
+    stats = LANGUAGE_STATS[lang]
+    score = 0.0
+    weights = {
+        'script': 0.4,
+        'word_length': 0.1,
+        'vowel_ratio': 0.1,
+        'endings': 0.2,
+        'clusters': 0.1,
+        'char_freq': 0.1
+    }
+    
+    # Script score
+    script_ratio = features['script_chars'][lang] / len(text) if text else 0
+    script_score = 1.0 if abs(script_ratio - stats['script_ratio']) < 0.1 else 0.0
+    score += script_score * weights['script']
+    
+    # Word length score
+    word_length_diff = abs(features['avg_word_length'] - stats['avg_word_length'])
+    word_length_score = 1.0 if word_length_diff < 0.5 else 0.0
+    score += word_length_score * weights['word_length']
+    
+    # Vowel ratio score
+    vowel_ratio_diff = abs(features['vowel_ratio'] - stats['vowel_ratio'])
+    vowel_ratio_score = 1.0 if vowel_ratio_diff < 0.1 else 0.0
+    score += vowel_ratio_score * weights['vowel_ratio']
+    
+    # Common endings score
+    endings_score = 0.0
+    for ending in stats['common_endings']:
+        if ending in features['common_endings']:
+            endings_score += 1
+    endings_score = min(1.0, endings_score / len(stats['common_endings']))
+    score += endings_score * weights['endings']
+    
+    # Consonant clusters score
+    clusters_score = 0.0
+    for cluster in stats['consonant_clusters']:
+        if cluster in features['consonant_clusters']:
+            clusters_score += 1
+    clusters_score = min(1.0, clusters_score / len(stats['consonant_clusters']))
+    score += clusters_score * weights['clusters']
+    
+    # Character frequency score
+    char_freq_score = 0.0
+    common_chars = stats['common_chars']
+    text_chars = set(features['char_freq'].keys())
+    if common_chars and text_chars:
+        char_freq_score = len(common_chars.intersection(text_chars)) / len(common_chars)
+    score += char_freq_score * weights['char_freq']
+    
+    return score
+
+def too_short_for_model(text):
+    """True if ``text`` has fewer than ``MODEL_MIN_LETTERS`` letters (Indic vowel signs and marks count)"""
+    letters = 0
+    for char in text:
+        if unicodedata.category(char)[0] in 'LM':
+            letters += 1
+            if letters >= MODEL_MIN_LETTERS:
+                return False
+    return True
+
+def utterance_scores(text, model=None, registry=REGISTRY):
+    """Score of each enabled language: model probabilities, or statistical scores without a model"""
+    if model is not None:
+        languages = [lang for lang in registry.enabled if lang in model.languages]
+        if not languages:
+            return {}
+        probabilities = model.probabilities(text, languages)
+        return {lang: probabilities[lang] for lang in languages}
+    return {lang: calculate_language_score(text, lang) for lang in registry.enabled if lang in LANGUAGE_STATS}
+
+def detect_language(text, registry=REGISTRY):
+    """Detect the language of an utterance with the trained model, or statistical analysis without one
+
+    Returns ``(language, details)``; ``details`` is None for text too short
+    to score.
+    """
+    if not text or len(text.strip()) < 2:
+        return 'en', None
+    
+    text = text.strip()
+    
+    # Segment-level detection for code-mixed speech
+    segmentation = detect_segments(text, registry)
+    
+    # The model (and NumPy) load on the first utterance, not at app start
+    model = lazy_import("language_model").get_language_model()
+    if too_short_for_model(text):
+        model = None
+    scores = None
+    if segmentation['dominant'] in scored_languages(model):
+        scores = utterance_scores(text, model, registry)
+    return language_from_scores(segmentation, scores, model)
+
+
+def scored_languages(model=None):
+    """Languages the utterance scorer can score: the model's, or the statistical scorer's"""
+    return model.languages if model is not None else LANGUAGE_STATS
+
+
+def language_from_scores(segmentation, scores, model=None):
+    """Pick the utterance language from its scores and its segmentation
+
+    ``scores`` is None when the dominant segment language is one the scorer
+    cannot score. Returns ``(language, details)`` as ``detect_language`` does.
+    """
+    if scores is None:
+        # A script the scorer knows nothing about names its language directly
+        scores = {segmentation['dominant']: 1.0 - segmentation['mix_ratio']}
+    
+    # Get the best matching language
+    best_lang = max(scores.items(), key=lambda x: x[1]) if scores else (segmentation['dominant'], 0.0)
+    confidence = best_lang[1]
+    
+    details = {
+        'detected_lang': best_lang[0],
+        'confidence': confidence,
+        'scores': scores,
+        'scorer': 'model' if model is not None else 'statistical',
+        'dominant_segment_lang': segmentation['dominant'],
+        'mix_ratio': segmentation['mix_ratio'],
+        'segments': len(segmentation['segments'])
+    }
+    
+    # Only return a language if confidence is high enough
+    if confidence >= DETECTION_CONFIDENCE_THRESHOLD:
+        return best_lang[0], details
+    
+    # If confidence is too low, fall back to the dominant language of the segments
+    # (English for plain English text) instead of always assuming English
+    details['fallback'] = True
+    return segmentation['dominant'], details
+
+
+def _latin_token_language(token, enabled=None):
+    """Classify a Latin-script token as English or romanized Hindi/Tamil"""
+    word = token.lower().strip(".,!?;:'\"()[]-")
+    for lang, lexicon in ROMANIZED_LEXICON.items():
+        if word in lexicon and (enabled is None or lang in enabled):
+            return lang
+    if len(word) > 4:
+        for lang, suffixes in ROMANIZED_SUFFIXES.items():
+            if word.endswith(suffixes) and (enabled is None or lang in enabled):
+                return lang
+    return 'en'
+
+
+def segment_languages(registry=REGISTRY):
+    """Languages ``detect_segments`` can label letters of each registry script with"""
+    romanized = {lang for lang in (*ROMANIZED_LEXICON, *ROMANIZED_SUFFIXES) if lang in registry.enabled}
+    return {script: ({'en'} | romanized if label == 'latin' else {label} if label else set())
+            for script, label in zip(registry.scripts, registry.script_labels)}
+
+
+def detect_segments(text, registry=REGISTRY):
+    """Split text into same-language segments in a single pass
+
+    Each whitespace-delimited token is labelled by its dominant script,
+    looked up per character in the registry's code point pages, so the cost
+    does not grow with the number of languages. Latin tokens are further
+    split into English vs. romanized Hindi/Tamil by lexicon and suffix.
+    Tokens without letters (numbers, punctuation) join the surrounding
+    segment. Returns the segments with character offsets, the
+    dominant language and the mix ratio (share of letters outside the
+    dominant language).
+    """
+    segments = []
+    letter_counts = defaultdict(int)
+    char_label = registry.char_label
+    enabled = registry.enabled
+
+    token_start = None
+    token_scripts = defaultdict(int)
+
+    def close_token(end):
+        if token_start is None:
+            return
+        if token_scripts:
+            script = max(token_scripts.items(), key=lambda x: x[1])[0]
+            lang = _latin_token_language(text[token_start:end], enabled) if script == 'latin' else script
+            letter_counts[lang] += sum(token_scripts.values())
+        else:
+            lang = None
+        if segments and (lang is None or segments[-1]['lang'] == lang):
+            segments[-1]['end'] = end
+        elif segments and segments[-1]['lang'] is None:
+            segments[-1]['lang'] = lang
+            segments[-1]['end'] = end
+        else:
+            segments.append({'lang': lang, 'start': token_start, 'end': end})
+        token_scripts.clear()
+
+    for index, char in enumerate(text):
+        if char.isspace():
+            close_token(index)
+            token_start = None
+            continue
+        if token_start is None:
+            token_start = index
+        script = char_label(ord(char))
+        if script:
+            token_scripts[script] += 1
+    close_token(len(text))
+
+    total_letters = sum(letter_counts.values())
+    if total_letters:
+        dominant = max(letter_counts.items(), key=lambda x: x[1])[0]
+        mix_ratio = 1.0 - letter_counts[dominant] / total_letters
+    else:
+        dominant, mix_ratio = 'en', 0.0
+
+    for segment in segments:
+        if segment['lang'] is None:
+            segment['lang'] = dominant
+        segment['text'] = text[segment['start']:segment['end']]
+
+    return {
+        'segments': segments,
+        'dominant': dominant,
+        'mix_ratio': mix_ratio,
+        'letter_counts': dict(letter_counts),
+    }
+
+
+def merge_short_segments(text, segments, min_chars=12):
+    """Fold segments shorter than ``min_chars`` into a neighbouring segment
+
+    Switching TTS voices for a single borrowed word sounds choppy, so short
+    segments are spoken in the voice of the surrounding text.
+    """
+    merged = []
+    for segment in segments:
+        if merged and (segment['lang'] == merged[-1]['lang'] or len(segment['text'].strip()) < min_chars):
+            merged[-1]['end'] = segment['end']
+        elif len(merged) == 1 and len(merged[0]['text'].strip()) < min_chars:
+            merged[0]['lang'] = segment['lang']
+            merged[0]['end'] = segment['end']
+        else:
+            merged.append(dict(segment))
+        merged[-1]['text'] = text[merged[-1]['start']:merged[-1]['end']]
+    return merged
@@ -0,0 +1,323 @@
+"""Trained language-ID model for utterance-level detection.
+
+``calculate_language_score`` gives each language a hand-weighted sum of
+all-or-nothing tests (script ratio within 0.1, average word length within
+0.5, ...). Real utterances rarely pass enough of them to reach the 0.7
+cutoff, so most Hindi and Tamil text fell through to the segment fallback,
+and romanized text was never scored as anything but English.
+
+This module fits a multinomial logistic regression with NumPy instead:
+
+  * features are hashed character 1-3-grams of the lowercased text (word
+    boundaries included) plus the share of each registry script and of
+    other characters
+  * the n-gram hashing is vectorized over the UTF-32 code points, so a
+    text becomes one feature vector without a per-character Python loop
+  * training is full-batch gradient descent with momentum and L2 on a
+    labeled corpus (``language_corpus.tsv``), augmented with word spans so
+    short utterances are covered
+  * the model is saved as compact arrays (float16 weights) in an ``.npz``
+    file; inference is one ``weights @ x + bias`` and a softmax
+
+    python language_model.py train
+    python language_model.py evaluate "mera order kab aayega"
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from language_registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+LANGUAGE_MODEL_PATH = os.getenv("LANGUAGE_MODEL_PATH", os.path.join(_HERE, "language_model.npz"))
+LANGUAGE_CORPUS_PATH = os.getenv("LANGUAGE_CORPUS_PATH", os.path.join(_HERE, "language_corpus.tsv"))
+
+# Hashed n-gram buckets are 2 ** HASH_BITS
+HASH_BITS = 12
+NGRAM_ORDERS = (1, 2, 3)
+
+# Training defaults
+TRAIN_EPOCHS = 400
+TRAIN_LEARNING_RATE = 2.0
+TRAIN_MOMENTUM = 0.9
+TRAIN_L2 = 1e-4
+# Word spans sampled from each corpus line, and the shortest span as a share of the line
+AUGMENT_SPANS = 6
+AUGMENT_MIN_SHARE = 0.5
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_STEP = np.uint64(0x100000001B3)
+
+
+def feature_size(hash_bits=HASH_BITS):
+    # Hashed n-grams, then the share of each registry script and of other characters
+    return (1 << hash_bits) + len(REGISTRY.scripts) + 1
+
+
+def text_features(text, hash_bits=HASH_BITS, orders=NGRAM_ORDERS):
+    """Feature vector of one text: L2-normalized sqrt n-gram counts, then script shares"""
+    size = 1 << hash_bits
+    padded = " " + " ".join(text.lower().split()) + " "
+    points = np.frombuffer(padded.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    vector = np.zeros(feature_size(hash_bits), dtype=np.float32)
+
+    # Rolling FNV-style combine: the order-n hashes extend the order-(n-1) ones by one code point
+    windows = []
+    hashed = points + _STEP
+    for order in range(1, max(orders) + 1):
+        if order > 1:
+            hashed = (hashed[:-1] * _STEP) ^ points[order - 1:]
+        if not len(hashed):
+            break
+        if order in orders:
+            windows.append(hashed)
+    if windows:
+        # Fibonacci hashing into the buckets
+        buckets = (np.concatenate(windows) * _MIX) >> np.uint64(64 - hash_bits)
+        found, counts = np.unique(buckets.astype(np.intp), return_counts=True)
+        weights = np.sqrt(counts)
+        vector[found] = weights / np.sqrt(np.dot(weights, weights))
+
+    letters = points[1:-1]
+    letters = letters[letters != 0x20]
+    if len(letters):
+        vector[size:] = np.bincount(REGISTRY.script_indices(letters), minlength=REGISTRY.other_script + 1) / len(letters)
+    return vector
+
+
+def feature_matrix(texts, hash_bits=HASH_BITS, orders=NGRAM_ORDERS):
+    """``text_features`` of many texts, hashed in one pass over the concatenated chunk"""
+    size = 1 << hash_bits
+    matrix = np.zeros((len(texts), feature_size(hash_bits)), dtype=np.float32)
+    if not texts:
+        return matrix
+    padded = [" " + " ".join(text.lower().split()) + " " for text in texts]
+    lengths = np.array([len(text) for text in padded], dtype=np.int64)
+    points = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    ends = np.cumsum(lengths)
+    row_ends = ends[rows]
+
+    # Same rolling hashes as text_features; windows that run into the next text are dropped
+    keys = []
+    hashed = points + _STEP
+    for order in range(1, max(orders) + 1):
+        if order > 1:
+            hashed = (hashed[:-1] * _STEP) ^ points[order - 1:]
+        if order in orders:
+            valid = np.arange(len(hashed)) + order <= row_ends[:len(hashed)]
+            buckets = (hashed[valid] * _MIX) >> np.uint64(64 - hash_bits)
+            keys.append(rows[:len(hashed)][valid] * size + buckets.astype(np.int64))
+    keys, counts = np.unique(np.concatenate(keys), return_counts=True)
+    key_rows = keys // size
+    weights = np.sqrt(counts)
+    norms = np.sqrt(np.bincount(key_rows, weights=weights * weights, minlength=len(texts)))
+    matrix[key_rows, keys % size] = weights / norms[key_rows]
+
+    # Script shares of the letters between the padding spaces
+    letters = points != 0x20
+    letters[ends - lengths] = False
+    letters[ends - 1] = False
+    slots = REGISTRY.other_script + 1
+    counts = np.bincount(rows[letters] * slots + REGISTRY.script_indices(points[letters]),
+                         minlength=len(texts) * slots).reshape(len(texts), slots)
+    totals = counts.sum(axis=1, keepdims=True)
+    matrix[:, size:] = np.where(totals > 0, counts / np.maximum(totals, 1), 0.0)
+    return matrix
+
+
+def softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+class LanguageModel:
+    """Linear language classifier over hashed character n-grams"""
+
+    def __init__(self, weights, bias, languages, hash_bits=HASH_BITS, scripts=REGISTRY.scripts):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.languages = [str(lang) for lang in languages]
+        self.hash_bits = int(hash_bits)
+        self.scripts = tuple(str(script) for script in scripts)
+        self._masks = {}
+
+    def probabilities(self, text, languages=None):
+        """Probability of each language for one text, renormalized over ``languages`` if given"""
+        logits = self.weights @ text_features(text, self.hash_bits) + self.bias
+        if languages is not None:
+            logits = logits + self._mask(tuple(languages))
+        return dict(zip(self.languages, softmax(logits).tolist()))
+
+    def _mask(self, languages):
+        mask = self._masks.get(languages)
+        if mask is None:
+            # A model language outside ``languages`` gets probability 0
+            mask = np.array([0.0 if lang in languages else -np.inf for lang in self.languages], dtype=np.float32)
+            self._masks[languages] = mask
+        return mask
+
+    def predict(self, text, languages=None):
+        """Most likely language and its probability"""
+        probabilities = self.probabilities(text, languages)
+        lang = max(probabilities, key=probabilities.get)
+        return lang, probabilities[lang]
+
+    def probabilities_batch(self, texts, languages=None):
+        """Probabilities of each text, one row per text in ``self.languages`` order, renormalized over ``languages`` if given"""
+        return self.probabilities_features(feature_matrix(texts, self.hash_bits), languages)
+
+    def probabilities_features(self, features, languages=None):
+        """``probabilities_batch`` for an already computed ``feature_matrix``"""
+        logits = features @ self.weights.T + self.bias
+        if languages is not None:
+            logits = logits + self._mask(tuple(languages))
+        return softmax(logits)
+
+    def predict_batch(self, texts):
+        """Most likely language of each text"""
+        logits = feature_matrix(texts, self.hash_bits) @ self.weights.T + self.bias
+        return [self.languages[index] for index in logits.argmax(axis=1)]
+
+    def save(self, path=LANGUAGE_MODEL_PATH):
+        np.savez_compressed(
+            path, weights=self.weights.astype(np.float16), bias=self.bias,
+            languages=np.array(self.languages), hash_bits=np.array(self.hash_bits), scripts=np.array(self.scripts),
+        )
+
+    @classmethod
+    def load(cls, path=LANGUAGE_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as arrays:
+            model = cls(arrays['weights'], arrays['bias'], arrays['languages'], arrays['hash_bits'], arrays['scripts'])
+        if model.scripts != REGISTRY.scripts:
+            raise ValueError(f"{path} was trained for scripts {model.scripts}; retrain it for the current registry")
+        return model
+
+
+def read_corpus(path=LANGUAGE_CORPUS_PATH):
+    """``(lang, text)`` pairs from a tab-separated corpus; ``#`` lines are comments"""
+    samples = []
+    with open(path, encoding="utf-8") as corpus:
+        for line in corpus:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            lang, text = line.split("\t", 1)
+            samples.append((lang.strip(), text.strip()))
+    return samples
+
+
+def split_corpus(samples, holdout_every=5):
+    """Deterministic split: every ``holdout_every``-th line of each language is held out"""
+    train, held_out = [], []
+    seen = {}
+    for lang, text in samples:
+        seen[lang] = seen.get(lang, 0) + 1
+        (held_out if seen[lang] % holdout_every == 0 else train).append((lang, text))
+    return train, held_out
+
+
+def augment(samples, rng, spans=AUGMENT_SPANS, min_share=AUGMENT_MIN_SHARE):
+    """Each sample plus random contiguous word spans of it, without trailing punctuation"""
+    augmented = list(samples)
+    for lang, text in samples:
+        words = text.split()
+        shortest = max(1, int(np.ceil(len(words) * min_share)))
+        for _ in range(spans if len(words) > shortest else 0):
+            length = int(rng.integers(shortest, len(words) + 1))
+            start = int(rng.integers(0, len(words) - length + 1))
+            augmented.append((lang, " ".join(words[start:start + length]).strip(".,!?")))
+    return augmented
+
+
+def train(samples, epochs=TRAIN_EPOCHS, learning_rate=TRAIN_LEARNING_RATE, momentum=TRAIN_MOMENTUM,
+          l2=TRAIN_L2, hash_bits=HASH_BITS, seed=0):
+    """Fit a softmax regression to ``(lang, text)`` samples"""
+    rng = np.random.default_rng(seed)
+    samples = augment(samples, rng)
+    languages = sorted({lang for lang, _ in samples})
+    features = feature_matrix([text for _, text in samples], hash_bits)
+    targets = np.zeros((len(samples), len(languages)), dtype=np.float32)
+    targets[np.arange(len(samples)), [languages.index(lang) for lang, _ in samples]] = 1.0
+
+    weights = np.zeros((len(languages), features.shape[1]), dtype=np.float32)
+    bias = np.zeros(len(languages), dtype=np.float32)
+    weight_step = np.zeros_like(weights)
+    bias_step = np.zeros_like(bias)
+    for _ in range(epochs):
+        error = softmax(features @ weights.T + bias) - targets
+        weight_grad = error.T @ features / len(samples) + l2 * weights
+        bias_grad = error.mean(axis=0)
+        weight_step = momentum * weight_step - learning_rate * weight_grad
+        bias_step = momentum * bias_step - learning_rate * bias_grad
+        weights += weight_step
+        bias += bias_step
+    return LanguageModel(weights, bias, languages, hash_bits, REGISTRY.scripts)
+
+
+def accuracy(model, samples):
+    predictions = model.predict_batch([text for _, text in samples])
+    return sum(predicted == lang for predicted, (lang, _) in zip(predictions, samples)) / max(1, len(samples))
+
+
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_language_model():
+    """Process-wide trained model, or None when no usable model file is present"""
+    global _model, _model_loaded
+    with _model_lock:
+        if not _model_loaded:
+            _model_loaded = True
+            if os.path.exists(LANGUAGE_MODEL_PATH):
+                try:
+                    _model = LanguageModel.load(LANGUAGE_MODEL_PATH)
+                except ValueError as e:
+                    logger.warning("%s; using the statistical scorer", e)
+        return _model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or try the language-ID model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    fit = subparsers.add_parser("train", help="fit the model on the labeled corpus and save it")
+    fit.add_argument("--corpus", default=LANGUAGE_CORPUS_PATH)
+    fit.add_argument("-o", "--output", default=LANGUAGE_MODEL_PATH)
+    fit.add_argument("--epochs", type=int, default=TRAIN_EPOCHS)
+    fit.add_argument("--holdout", action="store_true", help="hold out every fifth line and report its accuracy")
+    evaluate = subparsers.add_parser("evaluate", help="print the language probabilities of texts")
+    evaluate.add_argument("texts", nargs="+")
+    evaluate.add_argument("--model", default=LANGUAGE_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        samples = read_corpus(args.corpus)
+        training, held_out = split_corpus(samples) if args.holdout else (samples, [])
+        start = time.perf_counter()
+        model = train(training, epochs=args.epochs)
+        print(f"trained on {len(training)} lines in {time.perf_counter() - start:.1f}s; "
+              f"training accuracy {accuracy(model, training):.1%}")
+        if held_out:
+            print(f"held-out accuracy {accuracy(model, held_out):.1%} on {len(held_out)} lines")
+        model.save(args.output)
+        print(f"wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+        return
+
+    model = LanguageModel.load(args.model)
+    for text in args.texts:
+        probabilities = model.probabilities(text)
+        ranked = ", ".join(f"{lang} {p:.2f}" for lang, p in sorted(probabilities.items(), key=lambda x: -x[1]))
+        print(f"{text!r}: {ranked}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Per-session language prior for auto-detect recognition.
+
+Auto-detect mode used to run speech recognition once per supported
+language on every turn. ``LanguagePrior`` keeps an exponentially-decayed
+distribution over the languages the caller has actually been using.
+``recognition_results.recognize_nbest`` uses it to order the recognition
+attempts and to stop after the first one when the prior and the detector
+agree with high confidence.
+"""
+
+
+class LanguagePrior:
+    """Exponentially-decayed distribution over session languages"""
+
+    def __init__(self, languages, decay=0.7, min_observations=2,
+                 short_circuit_prob=0.75, short_circuit_confidence=0.6):
+        self.languages = list(languages)
+        self.decay = decay
+        self.min_observations = min_observations
+        self.short_circuit_prob = short_circuit_prob
+        self.short_circuit_confidence = short_circuit_confidence
+        self.probs = {lang: 1.0 / len(self.languages) for lang in self.languages}
+        self.observations = 0
+
+    def update(self, lang, confidence=1.0):
+        """Fold one detection result into the distribution"""
+        if lang not in self.probs:
+            return
+        weight = (1.0 - self.decay) * max(0.0, min(1.0, confidence))
+        for code in self.probs:
+            self.probs[code] *= (1.0 - weight)
+        self.probs[lang] += weight
+        total = sum(self.probs.values())
+        for code in self.probs:
+            self.probs[code] /= total
+        self.observations += 1
+
+    def ordered_languages(self):
+        """Languages ordered by current probability, most likely first"""
+        return sorted(self.languages, key=lambda code: self.probs[code], reverse=True)
+
+    def expected_language(self):
+        """Most likely language, or None while the prior is still uninformed"""
+        if self.observations < self.min_observations:
+            return None
+        return self.ordered_languages()[0]
+
+    def can_short_circuit(self, recognition_lang, detected_lang, confidence):
+        """True if a single recognition result is trustworthy enough to stop the sweep"""
+        return (
+            recognition_lang == detected_lang
+            and detected_lang == self.expected_language()
+            and self.probs[detected_lang] >= self.short_circuit_prob
+            and confidence >= self.short_circuit_confidence
+        )
+
+
+def score_recognition(text, recognition_lang, detected_lang, confidence):
+    """Total score for one recognition attempt (recognition success + language match + confidence)"""
+    lang_match_bonus = 1.0 if detected_lang == recognition_lang else 0.5
+    return confidence + lang_match_bonus + (len(text.split()) * 0.1)
@@ -0,0 +1,172 @@
+"""Declarative registry of the languages the voice bot can handle.
+
+Adding a language used to mean editing the recognition locales, TTS
+codes, script ranges, display names and selectbox options in separate
+tables. Script classification was an ``if`` chain with one range test
+per script. Here each language is one ``LANGUAGE_REGISTRY`` entry.
+``ENABLED_LANGUAGES`` picks the ones offered for recognition, and the
+registry is built once at import:
+
+  * every table the app uses is derived from the entries
+  * a two-level lookup maps a code point to its script or language in
+    O(1), whatever the number of languages: ``cp >> 7`` selects a
+    128-code-point block, and the block's page holds one label per code
+    point. Blocks a script fills completely share one page; the ASCII
+    block gets its own so only letters count as Latin.
+
+The same pages serve the vectorized per-script counts of the language
+model; their NumPy copies are built on the first vectorized lookup, so
+importing the registry does not load NumPy on a cold start. Recognition
+fan-out follows the enabled languages in the order of the session prior.
+"""
+import os
+import threading
+
+from startup_profiler import lazy_import
+
+# One entry per language; the first enabled language of a script labels native-script text
+LANGUAGE_REGISTRY = (
+    {'code': 'en', 'name': 'English', 'native_name': 'English', 'speech_locale': 'en-US', 'tts': 'en',
+     'script': 'latin'},
+    {'code': 'hi', 'name': 'Hindi', 'native_name': 'हिंदी', 'speech_locale': 'hi-IN', 'tts': 'hi',
+     'script': 'devanagari'},
+    {'code': 'ta', 'name': 'Tamil', 'native_name': 'தமிழ்', 'speech_locale': 'ta-IN', 'tts': 'ta',
+     'script': 'tamil'},
+    {'code': 'te', 'name': 'Telugu', 'native_name': 'తెలుగు', 'speech_locale': 'te-IN', 'tts': 'te',
+     'script': 'telugu'},
+    {'code': 'kn', 'name': 'Kannada', 'native_name': 'ಕನ್ನಡ', 'speech_locale': 'kn-IN', 'tts': 'kn',
+     'script': 'kannada'},
+    {'code': 'ml', 'name': 'Malayalam', 'native_name': 'മലയാളം', 'speech_locale': 'ml-IN', 'tts': 'ml',
+     'script': 'malayalam'},
+    {'code': 'bn', 'name': 'Bengali', 'native_name': 'বাংলা', 'speech_locale': 'bn-IN', 'tts': 'bn',
+     'script': 'bengali'},
+    {'code': 'mr', 'name': 'Marathi', 'native_name': 'मराठी', 'speech_locale': 'mr-IN', 'tts': 'mr',
+     'script': 'devanagari'},
+    {'code': 'gu', 'name': 'Gujarati', 'native_name': 'ગુજરાતી', 'speech_locale': 'gu-IN', 'tts': 'gu',
+     'script': 'gujarati'},
+    {'code': 'pa', 'name': 'Punjabi', 'native_name': 'ਪੰਜਾਬੀ', 'speech_locale': 'pa-Guru-IN', 'tts': 'pa',
+     'script': 'gurmukhi'},
+)
+
+# Code point ranges of each script (inclusive)
+SCRIPT_BLOCKS = {
+    'latin': ((0x0041, 0x005A), (0x0061, 0x007A)),
+    'devanagari': ((0x0900, 0x097F),),
+    'bengali': ((0x0980, 0x09FF),),
+    'gurmukhi': ((0x0A00, 0x0A7F),),
+    'gujarati': ((0x0A80, 0x0AFF),),
+    'tamil': ((0x0B80, 0x0BFF),),
+    'telugu': ((0x0C00, 0x0C7F),),
+    'kannada': ((0x0C80, 0x0CFF),),
+    'malayalam': ((0x0D00, 0x0D7F),),
+}
+
+# Languages offered for recognition and detection: comma-separated codes, or "all"
+ENABLED_LANGUAGES = os.getenv("ENABLED_LANGUAGES", "en,hi,ta")
+
+BLOCK_BITS = 7
+BLOCK_SIZE = 1 << BLOCK_BITS
+
+
+class LanguageRegistry:
+    """Enabled languages, the tables derived from them and the code point lookup"""
+
+    def __init__(self, entries=LANGUAGE_REGISTRY, enabled=ENABLED_LANGUAGES, script_blocks=SCRIPT_BLOCKS):
+        self.entries = {entry['code']: entry for entry in entries}
+        if isinstance(enabled, str):
+            enabled = list(self.entries) if enabled.strip() == "all" else [
+                code.strip() for code in enabled.split(",") if code.strip()]
+        unknown = [code for code in enabled if code not in self.entries]
+        if unknown:
+            raise ValueError(f"Languages not in the registry: {', '.join(unknown)}")
+        # Registry order, so ties in the session prior fall back to it
+        self.enabled = [code for code in self.entries if code in enabled]
+        self.scripts = tuple(script_blocks)
+        self.other_script = len(self.scripts)
+
+        # Native-script text is labelled with the first enabled language of its script; Latin stays 'latin'
+        self.script_labels = tuple('latin' if script == 'latin' else next(
+            (code for code in self.enabled if self.entries[code]['script'] == script), None)
+            for script in self.scripts)
+
+        # Label every code point of the registered blocks, then keep one page per distinct block
+        last_block = max(high for ranges in script_blocks.values() for _, high in ranges) >> BLOCK_BITS
+        dense = bytearray([self.other_script]) * ((last_block + 1) << BLOCK_BITS)
+        for index, ranges in enumerate(script_blocks.values()):
+            for low, high in ranges:
+                dense[low:high + 1] = bytes([index]) * (high + 1 - low)
+        empty = bytes([self.other_script]) * BLOCK_SIZE
+        page_ids = {empty: 0}
+        self._page_bytes = [empty]
+        block_pages = []
+        for start in range(0, len(dense), BLOCK_SIZE):
+            block = bytes(dense[start:start + BLOCK_SIZE])
+            if block not in page_ids:
+                page_ids[block] = len(self._page_bytes)
+                self._page_bytes.append(block)
+            block_pages.append(page_ids[block])
+        # One extra block for every code point beyond the registered blocks
+        self._block_page_list = block_pages + [0]
+        self._last_block = len(self._block_page_list) - 1
+
+        labels = list(self.script_labels) + [None]
+        self._label_pages = [[labels[index] for index in page] for page in self._page_bytes]
+        self._arrays = None
+        self._arrays_lock = threading.Lock()
+
+    def char_label(self, code_point):
+        """'latin' for Latin letters, the language code of a native script, or None"""
+        block = code_point >> BLOCK_BITS
+        if block > self._last_block:
+            return None
+        return self._label_pages[self._block_page_list[block]][code_point & (BLOCK_SIZE - 1)]
+
+    def script_of(self, code_point):
+        """Registered script of a code point ('latin' for ASCII letters only), or None"""
+        block = code_point >> BLOCK_BITS
+        if block > self._last_block:
+            return None
+        index = self._page_bytes[self._block_page_list[block]][code_point & (BLOCK_SIZE - 1)]
+        return self.scripts[index] if index < self.other_script else None
+
+    def _page_arrays(self):
+        """NumPy copies of the pages and the block-to-page map, built on first use"""
+        with self._arrays_lock:
+            if self._arrays is None:
+                np = lazy_import("numpy")
+                pages = np.frombuffer(b"".join(self._page_bytes), dtype=np.int8).reshape(-1, BLOCK_SIZE)
+                self._arrays = pages, np.array(self._block_page_list, dtype=np.int16)
+            return self._arrays
+
+    def script_indices(self, points):
+        """Index into ``scripts`` of each code point in an integer array; ``other_script`` for the rest"""
+        np = lazy_import("numpy")
+        pages, block_pages = self._page_arrays()
+        blocks = np.minimum(points >> BLOCK_BITS, self._last_block).astype(np.intp)
+        return pages[block_pages[blocks], (points & (BLOCK_SIZE - 1)).astype(np.intp)]
+
+    def speech_locales(self):
+        """Recognition locale of each enabled language"""
+        return {code: self.entries[code]['speech_locale'] for code in self.enabled}
+
+    def tts_codes(self):
+        """gTTS language of every registered language, so segments in any script can be spoken"""
+        return {code: entry['tts'] for code, entry in self.entries.items()}
+
+    def display_names(self):
+        return {code: entry['name'] if entry['native_name'] == entry['name']
+                else f"{entry['name']} ({entry['native_name']})" for code, entry in self.entries.items()}
+
+    def english_names(self):
+        return {code: entry['name'] for code, entry in self.entries.items()}
+
+
+REGISTRY = LanguageRegistry()
+
+# Tables derived from the registry
+SUPPORTED_LANGUAGES = REGISTRY.speech_locales()
+TTS_LANGUAGE_MAPPING = REGISTRY.tts_codes()
+LANGUAGE_NAMES = REGISTRY.display_names()
+LANGUAGE_NAMES_EN = REGISTRY.english_names()
+# Selectbox options (display name -> language code) for the enabled languages
+LANGUAGE_OPTIONS = {LANGUAGE_NAMES[code]: code for code in REGISTRY.enabled}
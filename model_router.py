@@ -0,0 +1,218 @@
+"""Model routing: send cheap requests to a smaller, faster model.
+
+Every request, from one-line chit-chat to conversation summaries, used to
+go to the 70B model. ``ModelRouter`` sits in front of
+``get_watsonx_response``. It classifies each request by cheap features:
+
+  * profile: summary, detailed or voice
+  * input length in words and number of questions
+  * wording that asks for reasoning ("why", "explain", "compare", ...)
+  * conversation length in turns (including turns folded into the memory
+    summary, which are no longer in the prompt history) and language
+
+It then looks up the class in ``ROUTE_TABLE`` to get a tier and a
+confidence. Using the small tier costs confidence for non-English input
+and deep histories. Below ``ROUTER_MIN_CONFIDENCE`` the request goes to
+the large tier instead. If the small tier fails, the request is retried on
+the large tier. Latency, fallbacks and token spend are tracked per tier.
+
+Model ids and the table can be overridden with ``SMALL_MODEL_ID``,
+``LARGE_MODEL_ID`` and ``MODEL_ROUTES`` (JSON, e.g. ``{"simple": "large"}``;
+an invalid value is logged and ignored). Set ``MODEL_ROUTING=0`` to send
+everything to the large tier.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from watsonx_client import MODEL_ID, get_model_stats, get_watsonx_response
+
+MODEL_TIERS = {
+    'small': {'model_id': os.getenv("SMALL_MODEL_ID", "meta-llama/llama-3-1-8b-instruct")},
+    'large': {'model_id': os.getenv("LARGE_MODEL_ID", MODEL_ID)},
+}
+
+# Tier used on low confidence and when the routed tier fails
+FALLBACK_TIER = 'large'
+
+logger = logging.getLogger(__name__)
+
+
+def parse_route_overrides(value):
+    """``MODEL_ROUTES`` JSON as {request_class: (tier, 1.0)}; an invalid value is logged and ignored"""
+    try:
+        overrides = json.loads(value)
+        if not isinstance(overrides, dict) or not all(tier in MODEL_TIERS for tier in overrides.values()):
+            raise ValueError(f"expected an object mapping request classes to one of {sorted(MODEL_TIERS)}")
+    except ValueError as e:
+        logger.warning("Ignoring invalid MODEL_ROUTES %r: %s", value, e)
+        return {}
+    return {request_class: (tier, 1.0) for request_class, tier in overrides.items()}
+
+
+# Request class -> (tier, confidence that the tier can handle it)
+ROUTE_TABLE = {
+    'summary': ('small', 0.9),
+    'chitchat': ('small', 0.95),
+    'simple': ('small', 0.75),
+    'complex': ('large', 1.0),
+}
+ROUTE_TABLE.update(parse_route_overrides(os.getenv("MODEL_ROUTES", "{}")))
+
+ROUTING_ENABLED = os.getenv("MODEL_ROUTING", "1") != "0"
+
+# Below this confidence the request goes to FALLBACK_TIER
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.6"))
+
+# Feature thresholds
+CHITCHAT_MAX_WORDS = 6
+SIMPLE_MAX_WORDS = 30
+DEEP_HISTORY_TURNS = 20
+
+# Confidence lost by the small tier for non-English input and for deep histories
+NON_ENGLISH_PENALTY = 0.1
+DEEP_HISTORY_PENALTY = 0.1
+
+_CHITCHAT = re.compile(
+    r'^\W*(?:hi|hello|hey|thanks|thank you|ok|okay|yes|no|sure|bye|goodbye|good (?:morning|afternoon|evening)'
+    r'|नमस्ते|धन्यवाद|शुक्रिया|हाँ|नहीं|ठीक है|வணக்கம்|நன்றி|சரி|ஆம்|இல்லை)\b',
+    re.IGNORECASE
+)
+_COMPLEX = re.compile(
+    r'\b(?:why|explain|compare|difference|how (?:do|does|can|should|would)|steps|troubleshoot|calculate|'
+    r'policy|pros and cons)\b',
+    re.IGNORECASE
+)
+
+
+def request_features(history, user_input, detected_lang='en', profile=None, total_turns=None):
+    """Cheap features of a request used for routing
+
+    ``total_turns`` is the length of the whole conversation; ``history``
+    alone is bounded once older turns are folded into the memory summary.
+    """
+    return {
+        'profile': profile,
+        'words': len(user_input.split()),
+        'questions': user_input.count('?'),
+        'reasoning': bool(_COMPLEX.search(user_input)),
+        'chitchat': bool(_CHITCHAT.search(user_input)),
+        'history_turns': len(history) if total_turns is None else total_turns,
+        'language': detected_lang,
+    }
+
+
+def classify_request(features):
+    """Request class for a set of features (a key of ``ROUTE_TABLE``)"""
+    if features['profile'] == 'summary':
+        return 'summary'
+    if features['profile'] == 'detailed':
+        return 'complex'
+    if features['chitchat'] and features['words'] <= CHITCHAT_MAX_WORDS and not features['reasoning']:
+        return 'chitchat'
+    if features['reasoning'] or features['questions'] > 1 or features['words'] > SIMPLE_MAX_WORDS:
+        return 'complex'
+    return 'simple'
+
+
+def route_request(history, user_input, detected_lang='en', profile=None, total_turns=None):
+    """Pick a tier for a request; returns a dict with tier, model_id, class, confidence and features"""
+    features = request_features(history, user_input, detected_lang, profile, total_turns)
+    request_class = classify_request(features)
+    tier, confidence = ROUTE_TABLE.get(request_class, (FALLBACK_TIER, 1.0))
+    if tier != FALLBACK_TIER:
+        if detected_lang != 'en':
+            confidence -= NON_ENGLISH_PENALTY
+        if features['history_turns'] > DEEP_HISTORY_TURNS:
+            confidence -= DEEP_HISTORY_PENALTY
+    reason = request_class
+    if not ROUTING_ENABLED:
+        tier, reason = FALLBACK_TIER, 'disabled'
+    elif confidence < ROUTER_MIN_CONFIDENCE:
+        tier, reason = FALLBACK_TIER, 'low_confidence'
+    return {
+        'tier': tier,
+        'model_id': MODEL_TIERS[tier]['model_id'],
+        'request_class': request_class,
+        'confidence': confidence,
+        'reason': reason,
+        'features': features,
+    }
+
+
+class ModelRouter:
+    """Routes generation requests to model tiers and tracks latency and spend per tier"""
+
+    def __init__(self):
+        self.stats = {
+            tier: {'calls': 0, 'errors': 0, 'fallbacks': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+            for tier in MODEL_TIERS
+        }
+        self.classes = {}
+        self._lock = threading.Lock()
+
+    def _call(self, tier, history, user_input, bearer_token, detected_lang, profile, memory):
+        start = time.perf_counter()
+        try:
+            reply = get_watsonx_response(
+                history, user_input, bearer_token, detected_lang, profile, memory,
+                model_id=MODEL_TIERS[tier]['model_id']
+            )
+        except Exception as e:
+            reply = f"Error: {e}"
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self.stats[tier]
+            stats['calls'] += 1
+            stats['seconds'] += elapsed
+            stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+            if reply.startswith("Error"):
+                stats['errors'] += 1
+        return reply
+
+    def generate(self, history, user_input, bearer_token, detected_lang='en', profile=None, memory=None,
+                 total_turns=None):
+        """Same contract as ``get_watsonx_response``, with the model picked by ``route_request``"""
+        decision = route_request(history, user_input, detected_lang, profile, total_turns)
+        with self._lock:
+            self.classes[decision['reason']] = self.classes.get(decision['reason'], 0) + 1
+        tier = decision['tier']
+        reply = self._call(tier, history, user_input, bearer_token, detected_lang, profile, memory)
+        # A busy rate limiter is shared by every tier, so retrying on the large model would not help
+        if reply.startswith("Error") and tier != FALLBACK_TIER and "busy" not in reply:
+            with self._lock:
+                self.stats[tier]['fallbacks'] += 1
+            reply = self._call(FALLBACK_TIER, history, user_input, bearer_token, detected_lang, profile, memory)
+        return reply
+
+    def snapshot(self):
+        """Per-tier calls, latency, fallbacks and token spend, plus counts per routing reason"""
+        model_stats = get_model_stats()
+        with self._lock:
+            tiers = {}
+            for tier, stats in self.stats.items():
+                usage = model_stats.get(MODEL_TIERS[tier]['model_id'], {})
+                tiers[tier] = dict(
+                    stats,
+                    model_id=MODEL_TIERS[tier]['model_id'],
+                    avg_seconds=stats['seconds'] / stats['calls'] if stats['calls'] else 0.0,
+                    input_tokens=usage.get('input_tokens', 0),
+                    generated_tokens=usage.get('generated_tokens', 0)
+                )
+            return {'tiers': tiers, 'classes': dict(self.classes)}
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Process-wide model router"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
@@ -0,0 +1,235 @@
+"""Pre-synthesized audio for fixed status and error prompts.
+
+Status prompts (greeting, "could not understand", timeouts, busy) used to
+exist only as on-screen text, and speaking them would have needed a TTS
+round trip every time. ``build_bundle`` renders the ``PROMPT_CATALOG`` in
+every language once into a single bundle file:
+
+    MAGIC | uint32 index length | JSON index | audio blobs
+
+At runtime ``PromptBundle`` memory-maps the file and reads only the
+index. A lookup slices the clip straight out of the map, with no network
+call and no decoding. Each index entry records a hash of the text it was
+rendered from, so an entry whose catalog text has changed since the
+build counts as missing rather than playing the old wording. A truncated
+or corrupt bundle is logged and ignored, and its prompts are synthesized
+live until it is rebuilt.
+
+    python prompt_audio.py build -o prompt_audio.bundle --engine gtts
+    python prompt_audio.py list
+"""
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+PROMPT_AUDIO_BUNDLE = os.getenv("PROMPT_AUDIO_BUNDLE", "prompt_audio.bundle")
+
+MAGIC = b"VBPROMPT1"
+_LENGTH = struct.Struct("<I")
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CATALOG = {
+    'greeting': {
+        'en': "Hi, I'm Ava. I'm listening, go ahead and speak.",
+        'hi': "नमस्ते, मैं एवा हूँ। मैं सुन रही हूँ, बोलिए।",
+        'ta': "வணக்கம், நான் ஏவா. நான் கேட்கிறேன், பேசுங்கள்.",
+    },
+    'not_understood': {
+        'en': "Sorry, I could not understand that. Please try speaking again.",
+        'hi': "माफ़ कीजिए, मैं समझ नहीं पाई। कृपया फिर से बोलिए।",
+        'ta': "மன்னிக்கவும், எனக்குப் புரியவில்லை. தயவுசெய்து மீண்டும் பேசுங்கள்.",
+    },
+    'timeout': {
+        'en': "I didn't hear anything. Please try speaking again.",
+        'hi': "मुझे कुछ सुनाई नहीं दिया। कृपया फिर से बोलिए।",
+        'ta': "எனக்கு எதுவும் கேட்கவில்லை. தயவுசெய்து மீண்டும் பேசுங்கள்.",
+    },
+    'cut_off': {
+        'en': "I think you were cut off. Please say that again.",
+        'hi': "लगता है आपकी बात अधूरी रह गई। कृपया दोबारा कहिए।",
+        'ta': "நீங்கள் சொன்னது முழுமையாக வரவில்லை. தயவுசெய்து மீண்டும் சொல்லுங்கள்.",
+    },
+    'busy': {
+        'en': "I'm a little busy right now. Please try again in a moment.",
+        'hi': "मैं अभी थोड़ी व्यस्त हूँ। कृपया कुछ देर बाद फिर कोशिश कीजिए।",
+        'ta': "நான் இப்போது சற்று பிஸியாக இருக்கிறேன். சிறிது நேரம் கழித்து மீண்டும் முயற்சிக்கவும்.",
+    },
+    'ai_error': {
+        'en': "Sorry, something went wrong while getting an answer. Please try again.",
+        'hi': "माफ़ कीजिए, जवाब लाने में कुछ गड़बड़ हो गई। कृपया फिर से कोशिश कीजिए।",
+        'ta': "மன்னிக்கவும், பதிலைப் பெறுவதில் பிழை ஏற்பட்டது. மீண்டும் முயற்சிக்கவும்.",
+    },
+}
+
+
+def text_hash(text):
+    """Short hash of a prompt's text, stored with its clip"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def render_with_pipeline(engine):
+    """Renderer for build_bundle that uses the regular TTS pipeline"""
+    from audio_pipeline import synthesize_speech
+
+    def render(text, language):
+        audio = synthesize_speech([(language, text)], engine=engine)
+        return audio['data'], audio['format']
+
+    return render
+
+
+def build_bundle(path, render, catalog=PROMPT_CATALOG):
+    """Render every catalog entry with ``render(text, language)`` and write the bundle
+
+    ``render`` returns ``(audio_bytes, mime_type)``. The file is written
+    next to ``path`` and renamed into place, so running workers keep
+    reading their existing map until they reopen.
+    """
+    entries = {}
+    blobs = []
+    offset = 0
+    for key, texts in catalog.items():
+        for language, text in texts.items():
+            data, audio_format = render(text, language)
+            entries[f"{key}/{language}"] = {
+                'offset': offset,
+                'length': len(data),
+                'format': audio_format,
+                'text_hash': text_hash(text)
+            }
+            blobs.append(data)
+            offset += len(data)
+
+    index = json.dumps({'built_at': time.time(), 'entries': entries}, ensure_ascii=False).encode('utf-8')
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as bundle_file:
+        bundle_file.write(MAGIC)
+        bundle_file.write(_LENGTH.pack(len(index)))
+        bundle_file.write(index)
+        for data in blobs:
+            bundle_file.write(data)
+    os.replace(temp_path, path)
+    return len(entries), offset
+
+
+class PromptBundle:
+    """Memory-mapped prompt audio bundle with a lookup API
+
+    Raises ``ValueError`` if ``path`` exists but is not a complete bundle.
+    ``error`` is set on the empty bundle ``get_prompt_bundle`` falls back to.
+    """
+
+    def __init__(self, path=None, catalog=PROMPT_CATALOG):
+        self.path = path
+        self.catalog = catalog
+        self.entries = {}
+        self.error = None
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0}
+        self._map = None
+        self._data_start = 0
+        if path and os.path.exists(path):
+            try:
+                self._open(path)
+            except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+                self.close()
+                self.entries = {}
+                raise ValueError(f"{path} is not a valid prompt audio bundle: {e}") from e
+
+    def _open(self, path):
+        with open(path, 'rb') as bundle_file:
+            self._map = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError("bad magic")
+        (index_length,) = _LENGTH.unpack_from(self._map, len(MAGIC))
+        index_start = len(MAGIC) + _LENGTH.size
+        index = json.loads(self._map[index_start:index_start + index_length].decode('utf-8'))
+        self.entries = index['entries']
+        self._data_start = index_start + index_length
+        end = max((entry['offset'] + entry['length'] for entry in self.entries.values()), default=0)
+        if self._data_start + end > len(self._map):
+            raise ValueError(f"truncated: {len(self._map)} of {self._data_start + end} bytes")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def text(self, key, language):
+        """Catalog text for a prompt, falling back to English"""
+        texts = self.catalog.get(key, {})
+        return texts.get(language) or texts.get('en')
+
+    def lookup(self, key, language):
+        """Return {'data', 'format', 'text'} for a prompt, falling back to English, or None"""
+        for lang in (language, 'en'):
+            text = self.catalog.get(key, {}).get(lang)
+            entry = self.entries.get(f"{key}/{lang}")
+            if text is None or entry is None:
+                continue
+            if entry['text_hash'] != text_hash(text):
+                self.stats['stale'] += 1
+                continue
+            start = self._data_start + entry['offset']
+            self.stats['hits'] += 1
+            return {'data': self._map[start:start + entry['length']], 'format': entry['format'], 'text': text}
+        self.stats['misses'] += 1
+        return None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+_bundle = None
+_bundle_lock = threading.Lock()
+
+
+def get_prompt_bundle():
+    """Process-wide bundle for ``PROMPT_AUDIO_BUNDLE`` (empty if it has not been built or is damaged)"""
+    global _bundle
+    with _bundle_lock:
+        if _bundle is None:
+            try:
+                _bundle = PromptBundle(PROMPT_AUDIO_BUNDLE)
+            except ValueError as e:
+                logger.warning("Ignoring prompt audio bundle, prompts will be synthesized live "
+                               "(rebuild with `python prompt_audio.py build`): %s", e)
+                _bundle = PromptBundle()
+                _bundle.error = str(e)
+        return _bundle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the prompt audio bundle")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="synthesize the prompt catalog into a bundle")
+    build.add_argument("-o", "--output", default=PROMPT_AUDIO_BUNDLE)
+    build.add_argument("--engine", choices=["gtts", "pyttsx3"], default="gtts")
+    listing = subparsers.add_parser("list", help="show the entries of a bundle")
+    listing.add_argument("bundle", nargs="?", default=PROMPT_AUDIO_BUNDLE)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        count, size = build_bundle(args.output, render_with_pipeline(args.engine))
+        print(f"{count} prompts, {size / 1024:.0f} KiB of audio in {time.perf_counter() - start:.1f} s -> {args.output}",
+              file=sys.stderr)
+    else:
+        bundle = PromptBundle(args.bundle)
+        for name, entry in sorted(bundle.entries.items()):
+            key, language = name.split("/")
+            current = bundle.catalog.get(key, {}).get(language)
+            state = "ok" if current and text_hash(current) == entry['text_hash'] else "stale"
+            print(f"{name:<24} {entry['format']:<10} {entry['length']:>8} B  {state}")
+        bundle.close()
+
+
+if __name__ == "__main__":
+    main()
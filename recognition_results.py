@@ -0,0 +1,149 @@
+"""N-best recognition results with rescoring.
+
+``recognize_google`` only returns its top transcript by default, and
+auto-detect mode made up for that by recognizing again in every
+language. With ``show_all=True`` one call returns the recognizer's whole
+alternatives list. Google attaches a confidence to the first alternative
+only; the rest get a decayed share of it.
+
+``recognize_nbest`` keeps every hypothesis and rescores it with:
+  * the recognizer's confidence
+  * the language detector
+  * the session prior
+It asks for another language only when the list is ambiguous:
+  * the best hypothesis is detected as a different language than the
+    one it was recognized in
+  * the recognizer's confidence is low
+  * a runner-up in another language scores within ``NBEST_MARGIN``
+
+Languages are tried in the order of the session prior over the enabled
+languages. When a transcript is detected as a language not tried yet,
+that language moves to the front of the queue. Once the prior has
+learned the caller's language, calls stop after ``NBEST_MAX_CALLS`` as
+long as one of them recognized the speech confidently, so enabling more
+languages does not add recognition calls to ordinary turns.
+
+Results are dicts with ``text``, ``recognition_lang``, ``detected_lang``,
+``confidence`` and ``total_score`` (from ``score_recognition``), so
+callers pick the one with the highest total score.
+"""
+import os
+
+from language_prior import score_recognition
+
+# Recognizer confidence below which a hypothesis is not trusted on its own
+NBEST_MIN_CONFIDENCE = float(os.getenv("NBEST_MIN_CONFIDENCE", "0.7"))
+
+# Score gap to a runner-up in another language needed to call the list unambiguous
+NBEST_MARGIN = float(os.getenv("NBEST_MARGIN", "0.3"))
+
+# Most recognition calls per turn, however many languages are enabled
+NBEST_MAX_CALLS = int(os.getenv("NBEST_MAX_CALLS", "3"))
+
+# Confidence decay per rank for alternatives Google returns without a confidence
+RANK_DECAY = 0.85
+
+# Weights of recognizer confidence and session prior in the total score
+ASR_WEIGHT = 1.0
+PRIOR_WEIGHT = 0.5
+
+
+def parse_alternatives(response):
+    """Return [(transcript, recognizer confidence)] from a ``show_all`` response"""
+    if not response or not isinstance(response, dict):
+        return []
+    alternatives = []
+    top_confidence = None
+    for rank, alternative in enumerate(response.get('alternative', [])):
+        transcript = (alternative.get('transcript') or '').strip()
+        if not transcript:
+            continue
+        confidence = alternative.get('confidence')
+        if confidence is None:
+            base = top_confidence if top_confidence is not None else 0.5
+            confidence = base * RANK_DECAY ** max(rank, 1)
+        elif top_confidence is None:
+            top_confidence = confidence
+        alternatives.append((transcript, float(confidence)))
+    return alternatives
+
+
+def score_hypotheses(alternatives, recognition_lang, detect, prior):
+    """Score each alternative with the detector and the session prior, best first"""
+    hypotheses = []
+    for rank, (text, asr_confidence) in enumerate(alternatives):
+        detected_lang, confidence = detect(text)
+        total = (
+            score_recognition(text, recognition_lang, detected_lang, confidence)
+            + ASR_WEIGHT * asr_confidence
+            + PRIOR_WEIGHT * prior.probs.get(detected_lang, 0.0)
+        )
+        hypotheses.append({
+            'text': text,
+            'recognition_lang': recognition_lang,
+            'detected_lang': detected_lang,
+            'confidence': confidence,
+            'asr_confidence': asr_confidence,
+            'rank': rank,
+            'total_score': total
+        })
+    hypotheses.sort(key=lambda h: h['total_score'], reverse=True)
+    return hypotheses
+
+
+def is_confident(hypothesis, min_confidence=NBEST_MIN_CONFIDENCE):
+    """True if a hypothesis was recognized confidently and detected as the language it was recognized in"""
+    return (hypothesis['asr_confidence'] >= min_confidence
+            and hypothesis['detected_lang'] == hypothesis['recognition_lang'])
+
+
+def is_ambiguous(hypotheses, min_confidence=NBEST_MIN_CONFIDENCE, margin=NBEST_MARGIN):
+    """True if another language should be tried for these hypotheses"""
+    if not hypotheses:
+        return True
+    best = hypotheses[0]
+    if best['detected_lang'] != best['recognition_lang'] or best['asr_confidence'] < min_confidence:
+        return True
+    for other in hypotheses[1:]:
+        if other['detected_lang'] != best['detected_lang'] and best['total_score'] - other['total_score'] < margin:
+            return True
+    return False
+
+
+def recognize_nbest(recognize_all, detect, prior, on_result=None, max_calls=NBEST_MAX_CALLS):
+    """Recognize with n-best lists, trying further languages only while the result is ambiguous
+
+    ``recognize_all(lang)`` returns the ``show_all`` response (or None on
+    failure) and ``detect(text)`` returns ``(detected_lang, confidence)``.
+    ``on_result`` receives the best hypothesis of each call as soon as it is
+    available. Returns every scored hypothesis and the number of calls made.
+    """
+    results = []
+    calls = 0
+    queue = prior.ordered_languages()
+    # Until the prior has learned the caller's language, any enabled language may be needed
+    if prior.expected_language() is None:
+        max_calls = len(queue)
+    while queue:
+        # Past the cap, keep going only while no language has recognized the speech confidently
+        if calls >= max_calls and any(is_confident(h) for h in results):
+            break
+        lang_code = queue.pop(0)
+        calls += 1
+        hypotheses = score_hypotheses(parse_alternatives(recognize_all(lang_code)), lang_code, detect, prior)
+        if not hypotheses:
+            continue
+        results.extend(hypotheses)
+        best = hypotheses[0]
+        if on_result is not None:
+            on_result(best)
+
+        if not is_ambiguous(hypotheses):
+            break
+        if calls == 1 and prior.can_short_circuit(lang_code, best['detected_lang'], best['confidence']):
+            break
+        # The detector points at the language to recognize in next
+        if best['detected_lang'] in queue:
+            queue.remove(best['detected_lang'])
+            queue.insert(0, best['detected_lang'])
+    return results, calls
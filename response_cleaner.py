@@ -0,0 +1,154 @@
+"""Single-pass sanitizer for Llama 3 template tags in model output.
+
+``clean_ai_response`` removes, in one regex pass over the text:
+  * full header blocks ``<|start_header_id|>ROLE<|end_header_id|>``
+  * the echoed ``assistant<|end_header_id|>`` prefix
+  * any other special token of the form ``<|name|>`` (``<|eot_id|>``, ...)
+  * markdown bold markers around a span of text on one line, at most
+    ``MAX_BOLD_CHARS`` long (``**word**`` becomes ``word``). A ``**`` that
+    does not open or close such a span, as in ``2**8``, is kept.
+and then strips leading and trailing whitespace. Whitespace next to a
+removed tag is otherwise left alone.
+
+``StreamingCleaner`` applies the same rules to streamed chunks. It holds
+back any tail that could still become part of a match (a partial tag or
+``assistant`` echo, an unclosed ``**``, trailing whitespace), so the
+concatenated output always equals ``clean_ai_response`` of the full text.
+"""
+import re
+
+# Longest bold span that is unwrapped; also bounds what streaming holds back
+MAX_BOLD_CHARS = 200
+
+# Every branch starts with a literal character, so the regex engine can skip
+# straight to candidate positions instead of trying each branch everywhere
+_TAG_PATTERN = re.compile(
+    r'<\|(?:start_header_id\|>(?:assistant|system|user)<\|end_header_id\||[a-z_]+\|)>'
+    r'|assistant<\|end_header_id\|>'
+    r'|\*\*(?<!\w\*\*)(?=\S)([^\n]{1,%d}?)(?<=\S)\*\*(?!\w)' % MAX_BOLD_CHARS
+)
+
+# Tails that may still grow into a tag once more text arrives
+_PARTIAL_TAG = re.compile(
+    r'<\|start_header_id\|>[a-z]*(?:<(?:\|[a-z_]*\|?)?)?\Z'
+    r'|<(?:\|[a-z_]*\|?)?\Z'
+)
+
+# A "**" that can open a bold span: not after a word character, not before whitespace.
+# Zero-width, so in a run like "****" every position is tried, not only every other pair
+_BOLD_OPENER = re.compile(r'(?<!\w)(?=\*\*(?!\s))')
+
+_ASSISTANT_ECHO = "assistant<|end_header_id|>"
+
+
+def _replace(match):
+    bold = match.group(1)
+    if bold is None:
+        return ""
+    return _TAG_PATTERN.sub(_replace, bold)
+
+
+def _clean_matches(text, start, end, matches):
+    """Rebuild ``text[start:end]`` with ``matches`` (all inside the range) replaced"""
+    parts = []
+    position = start
+    for match in matches:
+        parts.append(text[position:match.start()])
+        parts.append(_replace(match))
+        position = match.end()
+    parts.append(text[position:end])
+    return "".join(parts)
+
+
+def clean_ai_response(response_text):
+    """Clean the AI response by removing template tags and unwanted text"""
+    if not response_text:
+        return response_text
+    if '<' not in response_text and '*' not in response_text:
+        return response_text.strip()
+    return _TAG_PATTERN.sub(_replace, response_text).strip()
+
+
+class StreamingCleaner:
+    """Incremental version of clean_ai_response for streamed chunks"""
+
+    def __init__(self):
+        # Last raw character already emitted, kept for the "**" lookbehind
+        self._context = ""
+        self._carry = ""
+        self._pending_space = ""
+        self._started = False
+
+    def _hold_from(self, buffer, start, matches):
+        """Index in ``buffer`` from which text may still change with more input"""
+        hold = len(buffer)
+
+        partial = _PARTIAL_TAG.search(buffer, start)
+        if partial:
+            hold = partial.start()
+        for size in range(min(len(_ASSISTANT_ECHO) - 1, len(buffer) - start), 0, -1):
+            if _ASSISTANT_ECHO.startswith(buffer[-size:]):
+                hold = min(hold, len(buffer) - size)
+                break
+        if buffer.endswith("*"):
+            hold = min(hold, len(buffer) - 1)
+
+        # An opener outside any complete match may still be closed on this line
+        for opener in _BOLD_OPENER.finditer(buffer, start):
+            position = opener.start()
+            if position >= hold:
+                break
+            if any(match.start() <= position < match.end() for match in matches):
+                continue
+            if "\n" not in buffer[position:] and len(buffer) - position < MAX_BOLD_CHARS + 4:
+                hold = position
+                break
+
+        # A bold span closing at the very end depends on the next character
+        if matches and matches[-1].group(1) is not None and matches[-1].end() == len(buffer):
+            hold = min(hold, matches[-1].start())
+
+        # Never cut through a complete match
+        for match in matches:
+            if match.start() < hold < match.end():
+                hold = match.start()
+        return hold
+
+    def feed(self, chunk):
+        """Add a chunk and return the cleaned text that is now final"""
+        buffer = self._context + self._carry + chunk
+        start = len(self._context)
+        matches = list(_TAG_PATTERN.finditer(buffer, start))
+        hold = max(start, self._hold_from(buffer, start, matches))
+
+        done = [match for match in matches if match.end() <= hold]
+        text = _clean_matches(buffer, start, hold, done)
+        self._carry = buffer[hold:]
+        if hold > start:
+            self._context = buffer[hold - 1]
+        return self._emit(text)
+
+    def finish(self):
+        """Flush the held-back tail at the end of the stream"""
+        buffer = self._context + self._carry
+        start = len(self._context)
+        text = _clean_matches(buffer, start, len(buffer), list(_TAG_PATTERN.finditer(buffer, start)))
+        self._carry = ""
+        # Whitespace held from earlier chunks goes out before the tail
+        output = self._emit(text)
+        self._pending_space = ""
+        return output.rstrip()
+
+    def _emit(self, text):
+        """Drop leading whitespace and hold trailing whitespace until more text follows"""
+        if not self._started:
+            text = text.lstrip()
+        body = text.rstrip()
+        if not body:
+            if self._started:
+                self._pending_space += text
+            return ""
+        output = self._pending_space + body
+        self._pending_space = text[len(body):]
+        self._started = True
+        return output
@@ -0,0 +1,181 @@
+"""Memory budgets for long-running voice sessions.
+
+A continuous session kept growing for as long as the worker ran:
+
+  * every played MP3 stayed in Streamlit's media file manager until the
+    script run ended, and in continuous mode the voice loop never ends
+  * the loaded conversation history and its rendered markdown cache
+  * ``last_detection_details`` carried full character-frequency dicts
+
+``SessionMemoryManager`` measures each session's state against a
+per-session budget. The share of the per-process budget shrinks as more
+sessions are active. It also:
+  * releases audio clips that are no longer on screen
+  * compacts detection details to the few numbers the UI shows
+
+When a session is over its budget, the oldest loaded turns are evicted.
+Only turns already covered by the conversation memory's summary are
+evicted, and they stay in the conversation store. Current usage is kept
+per session for the sidebar.
+"""
+import os
+import sys
+import threading
+import time
+
+# Budget for one session's in-memory state, in bytes
+SESSION_MEMORY_BUDGET = int(os.getenv("SESSION_MEMORY_BUDGET", str(512 * 1024)))
+
+# Budget for all sessions of this process; each session gets at most an equal share
+PROCESS_MEMORY_BUDGET = int(os.getenv("PROCESS_MEMORY_BUDGET", str(64 * 1024 * 1024)))
+
+# Sessions not measured for this long are no longer counted as active
+SESSION_IDLE_SECONDS = 3600
+
+# Detection detail fields kept by compact_detection_details
+_DETECTION_FIELDS = ('detected_lang', 'confidence', 'dominant_segment_lang', 'mix_ratio', 'segments', 'fallback')
+
+
+def estimate_size(obj, seen=None):
+    """Approximate bytes held by ``obj`` and everything it references
+
+    Objects with an ``nbytes()`` method (such as ``ConversationLog``) report
+    their own size. Containers and instance attributes are followed once
+    each.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    nbytes = getattr(obj, 'nbytes', None)
+    if callable(nbytes):
+        return nbytes()
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += estimate_size(vars(obj), seen)
+    return size
+
+
+def compact_detection_details(details):
+    """Keep only the scalar detection results; drop the per-character feature tables"""
+    if not details:
+        return details
+    compact = {field: details[field] for field in _DETECTION_FIELDS if field in details}
+    if 'scores' in details:
+        compact['scores'] = {lang: round(score, 3) for lang, score in details['scores'].items()}
+    return compact
+
+
+def evictable_turns(history_length, unloaded, summarized_turns, keep_turns):
+    """Number of the oldest loaded turns that are covered by the summary and outside the kept window"""
+    covered = summarized_turns - unloaded
+    return max(0, min(covered, history_length - keep_turns))
+
+
+class SessionMemoryManager:
+    """Per-session memory usage and budget enforcement for one process"""
+
+    def __init__(self, session_budget=SESSION_MEMORY_BUDGET, process_budget=PROCESS_MEMORY_BUDGET,
+                 idle_seconds=SESSION_IDLE_SECONDS):
+        self.session_budget = session_budget
+        self.process_budget = process_budget
+        self.idle_seconds = idle_seconds
+        self.sessions = {}
+        self.stats = {'measurements': 0, 'evicted_turns': 0, 'evicted_renders': 0, 'audio_releases': 0,
+                      'over_budget': 0}
+        self._lock = threading.Lock()
+
+    def measure(self, session_id, parts):
+        """Record the size of each named part of a session's state and return its usage"""
+        sizes = {name: estimate_size(value) for name, value in parts.items()}
+        now = time.monotonic()
+        usage = {'parts': sizes, 'total': sum(sizes.values()), 'updated': now}
+        with self._lock:
+            self.stats['measurements'] += 1
+            self.sessions[session_id] = usage
+            for idle in [sid for sid, u in self.sessions.items() if now - u['updated'] > self.idle_seconds]:
+                del self.sessions[idle]
+        return usage
+
+    def budget_for(self, session_id):
+        """This session's budget: the session budget, or its share of the process budget if smaller"""
+        with self._lock:
+            active = max(1, len(self.sessions))
+        return min(self.session_budget, self.process_budget // active)
+
+    def usage(self, session_id):
+        """Last measured usage of a session, or None"""
+        with self._lock:
+            return self.sessions.get(session_id)
+
+    def process_usage(self):
+        """Total measured bytes and number of active sessions"""
+        with self._lock:
+            return sum(u['total'] for u in self.sessions.values()), len(self.sessions)
+
+    def forget(self, session_id):
+        with self._lock:
+            self.sessions.pop(session_id, None)
+
+    def evict(self, history, rendered, unloaded, summarized_turns, keep_turns):
+        """Evict the oldest summarized turns and their cached renders; returns the number of turns evicted"""
+        count = history.drop_oldest(evictable_turns(len(history), unloaded, summarized_turns, keep_turns))
+        first_id = history.first_id()
+        stale = [message_id for message_id in rendered if first_id is None or message_id < first_id]
+        for message_id in stale:
+            del rendered[message_id]
+        with self._lock:
+            self.stats['evicted_turns'] += count
+            self.stats['evicted_renders'] += len(stale)
+        return count
+
+    def enforce(self, session_id, parts, history, rendered, unloaded, summarized_turns, keep_turns):
+        """Measure a session and evict old turns if it is over budget
+
+        Returns ``(usage, evicted_turns)``. ``parts`` should include
+        ``history`` and ``rendered`` so the usage after eviction is accurate.
+        """
+        usage = self.measure(session_id, parts)
+        if usage['total'] <= self.budget_for(session_id):
+            return usage, 0
+        evicted = self.evict(history, rendered, unloaded, summarized_turns, keep_turns)
+        if evicted:
+            usage = self.measure(session_id, parts)
+        if usage['total'] > self.budget_for(session_id):
+            with self._lock:
+                self.stats['over_budget'] += 1
+        return usage, evicted
+
+    def release_played_audio(self, media_file_manager=None):
+        """Delete media files no longer shown by any session
+
+        Clips replaced in place (the voice loop reuses one audio slot) are
+        only dropped by Streamlit when a script run ends. The voice loop
+        never ends its run, so they are released here instead.
+        """
+        if media_file_manager is None:
+            from streamlit.runtime import Runtime
+            if not Runtime.exists():
+                return
+            media_file_manager = Runtime.instance().media_file_mgr
+        media_file_manager.remove_orphaned_files()
+        with self._lock:
+            self.stats['audio_releases'] += 1
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_session_memory():
+    """Process-wide session memory manager"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SessionMemoryManager()
+        return _manager
@@ -0,0 +1,189 @@
+"""Session warm-up before the first voice turn.
+
+The first turn of a session was the slowest. It paid on the critical
+path for the IAM token, cold TLS connections, gTTS's first request and
+tokenizer, pyttsx3 initialization and the detection tables. At session
+start, ``SessionWarmup`` runs these concurrently on a small thread pool:
+
+  * token: the IAM bearer token, through the shared token cache. It runs
+    on its own executor, so authentication never queues behind the
+    other warm-ups of this or other sessions
+  * connections: keep-alive connections to IAM and watsonx.ai in the
+    ``http_pool`` session
+  * synthesis: a short gTTS clip, which also runs ffmpeg once
+  * fallback_tts: the process-wide pyttsx3 engine ``render_pyttsx3`` uses
+  * tables: the recognition imports, the language model, the registry
+    pages, the detection regexes and the fingerprint band matrix
+
+The state and duration of each task are kept for the sidebar. A failed
+task is logged and left to the first turn, which does the work itself.
+A task that is still running when its caller stops waiting is reported as
+timed out, not as failed.
+The session also records how long its turns take from the end of speech
+capture to the spoken reply, so the first turn can be compared with the
+steady state.
+"""
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from http_pool import IAM_TOKEN_URL, open_connections
+from startup_profiler import lazy_import
+from watsonx_client import WATSONX_URL
+
+# Seconds a caller waits for one warm-up task before going ahead without it
+WARMUP_TASK_TIMEOUT = float(os.getenv("WARMUP_TASK_TIMEOUT", "30"))
+
+# Short clip synthesized to warm up the TTS path
+WARMUP_PHRASE = "Hello."
+
+# Mixed-script text run through detection to build its tables
+WARMUP_TEXT = "Hello, मेरा order कहाँ है? என் ஆர்டர் எங்கே?"
+
+# Turn latencies kept per session
+_MAX_TURN_SAMPLES = 100
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="session-warmup")
+
+# The token is waited on before the UI unlocks, so it does not share workers with the other tasks
+_token_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="session-token")
+
+# Tasks that run on _token_executor
+TOKEN_TASKS = ('token',)
+
+
+def open_service_connections():
+    """Open pooled connections to IAM and watsonx.ai"""
+    return open_connections([IAM_TOKEN_URL, WATSONX_URL])
+
+
+def warm_synthesis():
+    """Render a short gTTS clip so the first reply does not pay for gTTS's first request"""
+    clip = lazy_import("audio_pipeline").synthesize_speech([('en', WARMUP_PHRASE)], engine='gtts')
+    return clip['duration']
+
+
+def warm_fallback_tts():
+    """Initialize the shared pyttsx3 engine used when gTTS fails"""
+    engine = lazy_import("audio_pipeline").get_pyttsx3_engine()
+    return len(engine.getProperty('voices'))
+
+
+def build_detection_tables():
+    """Import the recognition modules and build the detection and fingerprint tables"""
+    from language_detection import detect_language, detect_segments
+    from language_model import get_language_model
+
+    lazy_import("speech_recognition")
+    audio_preprocessing = lazy_import("audio_preprocessing")
+    transcript_cache = lazy_import("transcript_cache")
+    get_language_model()
+    detect_language(WARMUP_TEXT)
+    detect_segments(WARMUP_TEXT)
+    silence = bytes(2 * audio_preprocessing.RECOGNITION_SAMPLE_RATE)
+    transcript_cache.fingerprint_audio(silence, audio_preprocessing.RECOGNITION_SAMPLE_RATE)
+
+
+def warmup_tasks(fetch_token=None):
+    """The default warm-up tasks; ``fetch_token`` returns the bearer token (omitted without credentials)"""
+    tasks = {
+        'connections': open_service_connections,
+        'synthesis': warm_synthesis,
+        'fallback_tts': warm_fallback_tts,
+        'tables': build_detection_tables,
+    }
+    if fetch_token is not None:
+        tasks = {'token': fetch_token, **tasks}
+    return tasks
+
+
+class SessionWarmup:
+    """Background warm-up tasks of one session and the latency of its turns"""
+
+    def __init__(self, tasks, executor=_executor, token_executor=_token_executor):
+        self.started = time.perf_counter()
+        self.tasks = {}
+        self.turn_seconds = []
+        self._executor = executor
+        self._token_executor = token_executor
+        self._futures = {}
+        self._lock = threading.Lock()
+        for name, task in tasks.items():
+            self.submit(name, task)
+
+    def submit(self, name, task):
+        """Start (or restart) a task in the background"""
+        with self._lock:
+            self.tasks[name] = {'state': 'running', 'seconds': None, 'error': None, 'timed_out': False}
+        executor = self._token_executor if name in TOKEN_TASKS else self._executor
+        self._futures[name] = executor.submit(self._run, name, task)
+
+    def _run(self, name, task):
+        start = time.perf_counter()
+        try:
+            result = task()
+        except Exception as e:
+            # requests' Timeout is not a TimeoutError, so go by the class name as well
+            timed_out = isinstance(e, TimeoutError) or 'Timeout' in type(e).__name__
+            with self._lock:
+                self.tasks[name].update(state='failed', seconds=time.perf_counter() - start, error=str(e),
+                                        timed_out=timed_out)
+            logger.warning("Warm-up task %s failed: %s", name, e)
+            return None
+        with self._lock:
+            self.tasks[name].update(state='ready', seconds=time.perf_counter() - start, timed_out=False)
+        return result
+
+    def result(self, name, timeout=WARMUP_TASK_TIMEOUT):
+        """Wait for a task and return its result; None if it failed, timed out or was never started
+
+        ``status()[name]['timed_out']`` tells a timeout (the wait ran out, or
+        the task itself timed out) from a failure.
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            with self._lock:
+                self.tasks[name]['timed_out'] = True
+            return None
+
+    def status(self):
+        """Copy of each task's state ('running', 'ready' or 'failed'), duration, error and timeout flag"""
+        with self._lock:
+            return {name: dict(task) for name, task in self.tasks.items()}
+
+    def done(self):
+        """True once every task has finished, successfully or not"""
+        with self._lock:
+            return all(task['state'] != 'running' for task in self.tasks.values())
+
+    def elapsed(self):
+        """Seconds from session start until the last task finished (or until now)"""
+        with self._lock:
+            if any(task['state'] == 'running' for task in self.tasks.values()):
+                return time.perf_counter() - self.started
+            return max((task['seconds'] or 0.0 for task in self.tasks.values()), default=0.0)
+
+    def record_turn(self, seconds):
+        """Record how long a turn took from the end of speech capture to the spoken reply"""
+        with self._lock:
+            self.turn_seconds.append(seconds)
+            del self.turn_seconds[1:-_MAX_TURN_SAMPLES]
+
+    def latency_report(self):
+        """First-turn latency vs the median of later turns"""
+        with self._lock:
+            turns = list(self.turn_seconds)
+        return {
+            'turns': len(turns),
+            'first_seconds': turns[0] if turns else None,
+            'steady_seconds': statistics.median(turns[1:]) if len(turns) > 1 else None,
+        }
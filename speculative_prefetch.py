@@ -0,0 +1,189 @@
+"""Speculative LLM prefetch on partial transcripts.
+
+In auto-detect mode recognition runs once per candidate language, so the
+first usable transcript is available well before the sweep finishes.
+``SpeculativePrefetcher`` sends the LLM request for that transcript in the
+background. If the final transcript matches it within a normalized edit
+distance threshold the response is adopted; otherwise the speculation is
+cancelled (or its result discarded if it is already in flight).
+Speculation spend is capped by a per-session token budget, and saved
+latency versus wasted tokens is recorded for every attempt.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Per-session budget of estimated tokens that speculation may spend
+SPECULATION_TOKEN_BUDGET = int(os.getenv("SPECULATION_TOKEN_BUDGET", "20000"))
+
+# Maximum normalized edit distance between partial and final transcript to adopt a result
+SPECULATION_MATCH_THRESHOLD = float(os.getenv("SPECULATION_MATCH_THRESHOLD", "0.15"))
+
+# Rough characters-per-token ratio used to estimate spend
+CHARS_PER_TOKEN = 4
+
+_MAX_LOG_ENTRIES = 100
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-speculation")
+
+_NON_WORD = re.compile(r'[^\w\s]', re.UNICODE)
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_transcript(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _SPACES.sub(' ', _NON_WORD.sub('', text.lower())).strip()
+
+
+def normalized_edit_distance(a, b):
+    """Levenshtein distance between normalized strings, divided by the longer length"""
+    a, b = normalize_transcript(a), normalize_transcript(b)
+    if a == b:
+        return 0.0
+    if not a or not b:
+        return 1.0
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        previous = current
+    return previous[-1] / len(a)
+
+
+def estimate_tokens(text):
+    """Cheap token estimate from character count"""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+class SpeculativePrefetcher:
+    """Per-session speculative LLM requests with a token budget"""
+
+    def __init__(self, token_budget=SPECULATION_TOKEN_BUDGET, match_threshold=SPECULATION_MATCH_THRESHOLD):
+        self.token_budget = token_budget
+        self.match_threshold = match_threshold
+        self.tokens_spent = 0
+        self.stats = {'started': 0, 'adopted': 0, 'discarded': 0, 'skipped_budget': 0,
+                      'saved_seconds': 0.0, 'wasted_tokens': 0}
+        self.log = []
+        self._lock = threading.Lock()
+        self._current = None
+
+    def speculate(self, text, key, fetch, prompt_tokens=0):
+        """Start fetching ``fetch(text)`` in the background for a partial transcript
+
+        ``key`` must match at resolve time for the result to be adopted (for
+        example the detected language, which changes the prompt). Returns True
+        if a speculation was started.
+        """
+        if not text or not text.strip():
+            return False
+        # A previous turn never resolved its speculation; drop it
+        self.cancel()
+        estimated = prompt_tokens + estimate_tokens(text)
+        with self._lock:
+            if self.tokens_spent + estimated > self.token_budget:
+                self.stats['skipped_budget'] += 1
+                return False
+            self.tokens_spent += estimated
+
+        speculation = {'text': text, 'key': key, 'started_at': time.monotonic(),
+                       'prompt_tokens': estimated, 'finished_at': None}
+
+        def run():
+            try:
+                return fetch(text)
+            finally:
+                speculation['finished_at'] = time.monotonic()
+
+        speculation['future'] = _executor.submit(run)
+        speculation['future'].add_done_callback(self._charge_output)
+        self._current = speculation
+        self.stats['started'] += 1
+        return True
+
+    @property
+    def pending(self):
+        """True while a speculation is waiting to be resolved"""
+        return self._current is not None
+
+    def cancel(self):
+        """Discard any outstanding speculation"""
+        if self._current is not None:
+            self.resolve('', None)
+
+    def _charge_output(self, future):
+        """Count generated tokens against the budget once a request completes"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        with self._lock:
+            self.tokens_spent += estimate_tokens(result if isinstance(result, str) else '')
+
+    def resolve(self, final_text, key, timeout=None):
+        """Return the speculative response if it matches the final transcript, else None"""
+        speculation, self._current = self._current, None
+        if speculation is None:
+            return None
+
+        resolved_at = time.monotonic()
+        distance = normalized_edit_distance(speculation['text'], final_text)
+        future = speculation['future']
+        entry = {'partial': speculation['text'], 'final': final_text, 'distance': round(distance, 3)}
+
+        if distance <= self.match_threshold and key == speculation['key']:
+            try:
+                result = future.result(timeout=timeout)
+            except Exception as e:
+                result = None
+                entry['error'] = str(e)
+            if result is not None:
+                finished_at = speculation['finished_at'] or time.monotonic()
+                # Time the request was already running before the final transcript arrived
+                saved = max(0.0, min(resolved_at, finished_at) - speculation['started_at'])
+                self.stats['adopted'] += 1
+                self.stats['saved_seconds'] += saved
+                entry.update(outcome='adopted', saved_seconds=round(saved, 3))
+                self._append_log(entry)
+                return result
+
+        if future.cancel():
+            # Never started: refund its reservation
+            with self._lock:
+                self.tokens_spent -= speculation['prompt_tokens']
+        else:
+            # Already running: let it finish, but count everything it spends as waste
+            future.add_done_callback(partial(self._charge_waste, speculation['prompt_tokens']))
+        self.stats['discarded'] += 1
+        entry['outcome'] = 'discarded'
+        self._append_log(entry)
+        return None
+
+    def _charge_waste(self, prompt_tokens, future):
+        """Record the tokens of a discarded speculation as wasted"""
+        output_tokens = 0
+        if not future.cancelled() and future.exception() is None and isinstance(future.result(), str):
+            output_tokens = estimate_tokens(future.result())
+        with self._lock:
+            self.stats['wasted_tokens'] += prompt_tokens + output_tokens
+
+    def _append_log(self, entry):
+        logger.info(
+            "speculation %s: distance=%.3f saved=%.3fs total_saved=%.1fs wasted_tokens=%d",
+            entry['outcome'], entry['distance'], entry.get('saved_seconds', 0.0),
+            self.stats['saved_seconds'], self.stats['wasted_tokens']
+        )
+        self.log.append(entry)
+        del self.log[:-_MAX_LOG_ENTRIES]
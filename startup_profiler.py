@@ -0,0 +1,70 @@
+"""Startup profiler and lazy module loader for the voice bot.
+
+Heavy optional modules (speech_recognition, gTTS, pyttsx3) are imported on
+first use through ``lazy_import`` instead of at the top of VoiceAgent.py.
+Every import is timed once per process and compared against an import-time
+budget so slow cold starts show up in the sidebar instead of going unnoticed.
+"""
+import importlib
+import os
+import sys
+import time
+
+# Import-time budget for the whole process, in milliseconds
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+# Module name -> import time in milliseconds (first import only)
+_import_times = {}
+
+# Per-rerun script timings: list of (started_at, duration_ms)
+_rerun_times = []
+_MAX_RERUN_SAMPLES = 50
+_cold_run_ms = None
+
+_process_started = time.perf_counter()
+
+
+def lazy_import(module_name):
+    """Import a module on first use and record how long the import took"""
+    module = sys.modules.get(module_name)
+    # A module another thread is still importing is in sys.modules already; wait for it like ``import`` does
+    if module is not None and not getattr(getattr(module, '__spec__', None), '_initializing', False):
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_times.setdefault(module_name, (time.perf_counter() - start) * 1000)
+    return module
+
+
+def start_rerun():
+    """Mark the start of a script run and return a token for finish_rerun"""
+    return time.perf_counter()
+
+
+def finish_rerun(started_at):
+    """Record the duration of a script run started with start_rerun"""
+    global _cold_run_ms
+    duration_ms = (time.perf_counter() - started_at) * 1000
+    if _cold_run_ms is None:
+        _cold_run_ms = duration_ms
+    _rerun_times.append((started_at, duration_ms))
+    if len(_rerun_times) > _MAX_RERUN_SAMPLES:
+        del _rerun_times[0]
+    return duration_ms
+
+
+def get_startup_report():
+    """Return import timings, rerun timings and budget status"""
+    total_import_ms = sum(_import_times.values())
+    reruns = [duration for _, duration in _rerun_times]
+    return {
+        'imports': dict(sorted(_import_times.items(), key=lambda x: x[1], reverse=True)),
+        'total_import_ms': total_import_ms,
+        'budget_ms': STARTUP_IMPORT_BUDGET_MS,
+        'over_budget': total_import_ms > STARTUP_IMPORT_BUDGET_MS,
+        'cold_run_ms': _cold_run_ms,
+        'last_run_ms': reruns[-1] if reruns else None,
+        'runs': len(reruns),
+        'uptime_s': time.perf_counter() - _process_started,
+    }
@@ -0,0 +1,192 @@
+"""Transcript cache for repeated recordings.
+
+QA replays, IVR-style repeated phrases and retried uploads send the same
+or nearly the same audio to recognition again and again. Each turn is a
+full n-best pass over the recognizers. ``TranscriptCache`` keeps the
+transcript and language of recent recordings, keyed by a fingerprint of
+the preprocessed 16 kHz PCM:
+
+  * exact: a BLAKE2b digest of the samples, for byte-identical replays
+  * near: a coarse spectral fingerprint for re-recorded or re-encoded
+    copies. Band powers come from a NumPy FFT over 32 ms frames. Leading
+    and trailing frames more than 20 dB below the loudest are trimmed, so
+    lead-in silence and noise do not shift the clip. Log energies, over a
+    floor 30 dB below the peak, are averaged into a fixed number of time
+    slots. One bit is kept per slot and band: whether the band-to-band
+    energy difference rises from one slot to the next. Gain changes cancel
+    out, and clips of slightly different length still compare bit by bit.
+    A near match needs a similar duration and a small enough share of
+    differing bits.
+
+Entries are evicted least recently used beyond ``TRANSCRIPT_CACHE_SIZE``.
+Lookups and hits are counted for the sidebar. Entries are namespaced by
+recognition mode, so a transcript from auto-detect is not returned to a
+manually selected language. They also record the session that stored
+them. A near match is only an approximation of what was said, so it is
+served to the same session only. An exact hit needs the very same
+samples, so it is served across sessions.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Recordings whose transcripts are kept
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "256"))
+
+# Largest share of differing fingerprint bits for a near match, and the duration difference allowed
+NEAR_MATCH_MAX_DISTANCE = float(os.getenv("TRANSCRIPT_CACHE_MAX_DISTANCE", "0.2"))
+NEAR_MATCH_DURATION_TOLERANCE = 0.15
+
+# Spectral fingerprint: analysis frame, frequency bands and time slots
+FINGERPRINT_FRAME_SECONDS = 0.032
+FINGERPRINT_BANDS = 17
+FINGERPRINT_SLOTS = 17
+# Frames kept (within this many dB of the loudest) and the energy floor below the peak band
+FINGERPRINT_TRIM_DB = 20.0
+FINGERPRINT_FLOOR_DB = 30.0
+FINGERPRINT_MIN_HZ = 100.0
+FINGERPRINT_MAX_HZ = 4000.0
+
+_band_matrices = {}
+
+
+def _band_matrix(frame, sample_rate):
+    """One-hot map from FFT bins to log-spaced bands, cached per frame size and rate"""
+    key = (frame, sample_rate)
+    matrix = _band_matrices.get(key)
+    if matrix is None:
+        frequencies = np.fft.rfftfreq(frame, 1.0 / sample_rate)
+        edges = np.geomspace(FINGERPRINT_MIN_HZ, min(FINGERPRINT_MAX_HZ, sample_rate / 2), FINGERPRINT_BANDS + 1)
+        bands = np.searchsorted(edges, frequencies, side='right') - 1
+        matrix = np.zeros((len(frequencies), FINGERPRINT_BANDS), dtype=np.float32)
+        inside = (bands >= 0) & (bands < FINGERPRINT_BANDS)
+        matrix[np.flatnonzero(inside), bands[inside]] = 1.0
+        _band_matrices[key] = matrix
+    return matrix
+
+
+def spectral_fingerprint(pcm, sample_rate):
+    """Packed fingerprint bits and trimmed duration of int16 samples; bits are None for clips too short"""
+    frame = int(sample_rate * FINGERPRINT_FRAME_SECONDS)
+    count = len(pcm) // frame
+    if count < FINGERPRINT_SLOTS:
+        return None, len(pcm) / sample_rate
+    frames = pcm[:count * frame].astype(np.float32).reshape(count, frame) * np.hanning(frame).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2 @ _band_matrix(frame, sample_rate)
+    # Trim quiet frames at both ends
+    total = power.sum(axis=1)
+    loud = np.flatnonzero(total > total.max() * 10 ** (-FINGERPRINT_TRIM_DB / 10))
+    if len(loud) == 0 or loud[-1] - loud[0] + 1 < FINGERPRINT_SLOTS:
+        return None, len(pcm) / sample_rate
+    power = power[loud[0]:loud[-1] + 1]
+    count = len(power)
+    energies = np.log(power + power.max() * 10 ** (-FINGERPRINT_FLOOR_DB / 10))
+    # Average the frames into a fixed number of time slots
+    bounds = np.linspace(0, count, FINGERPRINT_SLOTS + 1).astype(np.intp)
+    slots = np.add.reduceat(energies, bounds[:-1], axis=0) / np.diff(bounds)[:, None]
+    band_steps = np.diff(slots, axis=1)
+    return np.packbits(np.diff(band_steps, axis=0) > 0), count * frame / sample_rate
+
+
+def fingerprint_audio(pcm_bytes, sample_rate):
+    """Exact digest, spectral fingerprint and trimmed duration of raw 16-bit mono PCM"""
+    bits, seconds = spectral_fingerprint(np.frombuffer(pcm_bytes, dtype=np.int16), sample_rate)
+    return {
+        'digest': hashlib.blake2b(pcm_bytes, digest_size=16).hexdigest(),
+        'bits': bits,
+        'seconds': seconds,
+    }
+
+
+def fingerprint_distance(bits, others):
+    """Share of differing bits between one packed fingerprint and each row of ``others``"""
+    differing = np.unpackbits(np.bitwise_xor(others, bits), axis=1).sum(axis=1)
+    return differing / (bits.size * 8)
+
+
+class TranscriptCache:
+    """LRU cache of transcripts keyed by audio fingerprints"""
+
+    def __init__(self, max_entries=TRANSCRIPT_CACHE_SIZE, max_distance=NEAR_MATCH_MAX_DISTANCE,
+                 duration_tolerance=NEAR_MATCH_DURATION_TOLERANCE):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.duration_tolerance = duration_tolerance
+        self.stats = {'lookups': 0, 'exact_hits': 0, 'near_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, fingerprint, namespace, session):
+        """Stored entry for a recording (with ``match`` and ``distance``), or None
+
+        Near matches are only searched among the entries ``session`` stored.
+        """
+        with self._lock:
+            self.stats['lookups'] += 1
+            key = (namespace, fingerprint['digest'])
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['exact_hits'] += 1
+                return dict(entry, match='exact', distance=0.0)
+
+            bits = fingerprint['bits']
+            seconds = fingerprint['seconds']
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if key[0] == namespace and entry['session'] == session
+                and entry['bits'] is not None and bits is not None
+                and abs(entry['seconds'] - seconds) <= self.duration_tolerance * max(seconds, entry['seconds'])
+            ]
+            if candidates:
+                distances = fingerprint_distance(bits, np.stack([entry['bits'] for _, entry in candidates]))
+                best = int(np.argmin(distances))
+                if distances[best] <= self.max_distance:
+                    key, entry = candidates[best]
+                    self._entries.move_to_end(key)
+                    self.stats['near_hits'] += 1
+                    return dict(entry, match='near', distance=float(distances[best]))
+            self.stats['misses'] += 1
+            return None
+
+    def store(self, fingerprint, namespace, session, text, language, details=None):
+        """Remember the transcript and language recognized for a recording"""
+        with self._lock:
+            key = (namespace, fingerprint['digest'])
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                'text': text,
+                'language': language,
+                'details': details,
+                'session': session,
+                'bits': fingerprint['bits'],
+                'seconds': fingerprint['seconds'],
+            }
+            self.stats['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def hit_rate(self):
+        with self._lock:
+            hits = self.stats['exact_hits'] + self.stats['near_hits']
+            return hits / self.stats['lookups'] if self.stats['lookups'] else 0.0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcript_cache():
+    """Process-wide transcript cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptCache()
+        return _cache
@@ -0,0 +1,251 @@
+"""On-demand CPU and allocation profiling of voice turns.
+
+Slow turns in production could not be profiled without a redeploy. A turn
+is profiled when profiling is switched on for its session (the sidebar
+toggle or ``?profile=1``), or when it is every ``PROFILE_EVERY_N_TURNS``-th
+turn of the process. For a profiled turn:
+
+  * a sampler thread reads the voice loop thread's stack from
+    ``sys._current_frames`` every ``PROFILE_SAMPLE_INTERVAL`` seconds and
+    counts stacks prefixed with the current stage
+  * ``tracemalloc`` snapshots are taken around each stage, and the
+    allocation growth is diffed by line
+
+Stages are marked with ``with stage("tts"):`` anywhere on the thread.
+When the turn ends, two files are written to ``PROFILE_DIR``:
+
+  * ``.collapsed`` stacks, for flamegraph.pl, speedscope or inferno
+  * ``.alloc.txt``: stage timings and the top allocating lines per stage
+
+Only the newest ``PROFILE_MAX_TURNS`` turns are kept. When a turn is not
+profiled, ``stage`` returns a shared no-op context manager. No thread is
+started and tracemalloc stays off.
+"""
+import contextlib
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# Profile every N-th turn of the process; 0 profiles only sessions that asked for it
+PROFILE_EVERY_N_TURNS = int(os.getenv("PROFILE_EVERY_N_TURNS", "0"))
+
+# Seconds between stack samples
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# Profiled turns kept on disk (older ones are deleted)
+PROFILE_MAX_TURNS = int(os.getenv("PROFILE_MAX_TURNS", "20"))
+
+# Frames kept per allocation traceback, and allocating lines reported per stage
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 15
+
+# Deepest stack recorded per sample
+MAX_STACK_DEPTH = 64
+
+_PROFILE_SUFFIXES = (".collapsed", ".alloc.txt")
+
+_NO_STAGE = contextlib.nullcontext()
+
+_active = threading.local()
+
+# Turns profiled at once share tracemalloc; it is stopped when the last one ends if we started it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def stage(name):
+    """Mark a stage of the current turn; a no-op unless the turn is being profiled"""
+    profile = getattr(_active, 'profile', None)
+    if profile is None:
+        return _NO_STAGE
+    return profile.stage(name)
+
+
+def _acquire_tracemalloc():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracemalloc():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}:{code.co_name}"
+
+
+class TurnProfile:
+    """Samples and allocation diffs for one profiled turn on one thread"""
+
+    def __init__(self, label, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        self.label = label
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.stages = []
+        self.timings = []
+        self.allocations = []
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="turn-profiler", daemon=True)
+        self.started = time.perf_counter()
+
+    def start(self):
+        _acquire_tracemalloc()
+        self._sampler.start()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            names.reverse()
+            prefix = ["stage:" + "/".join(self.stages)] if self.stages else ["stage:-"]
+            self.samples[";".join(prefix + names)] += 1
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self.stages.append(name)
+        path = "/".join(self.stages)
+        before = tracemalloc.take_snapshot()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            after = tracemalloc.take_snapshot()
+            self.stages.pop()
+            growth = [stat for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0]
+            self.timings.append((path, elapsed))
+            self.allocations.append((path, growth[:TOP_ALLOCATIONS]))
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        _release_tracemalloc()
+        self.elapsed = time.perf_counter() - self.started
+
+    def collapsed(self):
+        """Collapsed stack lines: ``frame;frame;frame count``"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def allocation_report(self):
+        lines = [f"turn {self.label}: {self.elapsed * 1000:.0f} ms, {sum(self.samples.values())} samples "
+                 f"every {self.interval * 1000:.1f} ms", ""]
+        lines.extend(f"{path:<24} {seconds * 1000:>9.1f} ms" for path, seconds in self.timings)
+        for path, growth in self.allocations:
+            lines.append("")
+            lines.append(f"[{path}] top allocations (growth during the stage)")
+            for stat in growth:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size_diff / 1024:>9.1f} KiB {stat.count_diff:>+7} blocks  "
+                             f"{frame.filename}:{frame.lineno}")
+            if not growth:
+                lines.append("  (no growth)")
+        return "\n".join(lines) + "\n"
+
+
+class TurnProfiler:
+    """Decides which turns are profiled and writes their reports with bounded retention"""
+
+    def __init__(self, directory=PROFILE_DIR, every_n_turns=PROFILE_EVERY_N_TURNS, max_turns=PROFILE_MAX_TURNS,
+                 interval=PROFILE_SAMPLE_INTERVAL):
+        self.directory = directory
+        self.every_n_turns = every_n_turns
+        self.max_turns = max_turns
+        self.interval = interval
+        self.stats = {'turns': 0, 'profiled': 0, 'written': 0, 'deleted': 0}
+        self._lock = threading.Lock()
+
+    def should_profile(self, session_enabled):
+        """Count a turn and decide whether to profile it"""
+        with self._lock:
+            self.stats['turns'] += 1
+            turn = self.stats['turns']
+        return session_enabled or (self.every_n_turns > 0 and turn % self.every_n_turns == 0)
+
+    @contextlib.contextmanager
+    def turn(self, session_id, session_enabled=False):
+        """Profile the enclosed turn on this thread if it is selected; yields the profile or None"""
+        if not self.should_profile(session_enabled) or getattr(_active, 'profile', None) is not None:
+            yield None
+            return
+        label = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{session_id[:8]}"
+        profile = TurnProfile(label, threading.get_ident(), self.interval)
+        _active.profile = profile
+        profile.start()
+        try:
+            yield profile
+        finally:
+            _active.profile = None
+            profile.stop()
+            with self._lock:
+                self.stats['profiled'] += 1
+            self.write(profile)
+
+    def write(self, profile):
+        """Write the collapsed stacks and allocation report, then prune old turns"""
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile.label)
+        with open(base + ".collapsed", "w", encoding="utf-8") as collapsed:
+            collapsed.write(profile.collapsed())
+        with open(base + ".alloc.txt", "w", encoding="utf-8") as report:
+            report.write(profile.allocation_report())
+        with self._lock:
+            self.stats['written'] += 1
+        self.prune()
+        return base
+
+    def prune(self):
+        """Delete all but the newest ``max_turns`` profiled turns"""
+        labels = sorted({
+            name[:-len(suffix)] for name in os.listdir(self.directory)
+            for suffix in _PROFILE_SUFFIXES if name.endswith(suffix)
+        })
+        for label in labels[:-self.max_turns] if self.max_turns > 0 else labels:
+            for suffix in _PROFILE_SUFFIXES:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.directory, label + suffix))
+            with self._lock:
+                self.stats['deleted'] += 1
+
+    def recent(self):
+        """Labels of the profiled turns on disk, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted({name[:-len(".collapsed")] for name in os.listdir(self.directory)
+                       if name.endswith(".collapsed")}, reverse=True)
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_turn_profiler():
+    """Process-wide turn profiler"""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = TurnProfiler()
+        return _profiler
@@ -0,0 +1,250 @@
+"""Admission control for the LLM, TTS and notification stages.
+
+Every stage has a fixed number of concurrent slots shared by all sessions
+in the process. Work waits for a slot in priority order:
+
+    INTERACTIVE  a turn the caller is waiting on
+    SUMMARY      a summary the user asked for
+    PERIODIC     the automatic summary every few turns
+    NOTIFY       email and Slack delivery
+
+Waiting work is shed instead of piling up without bound:
+  * past its deadline (it would be useless by the time it ran)
+  * stale: its session has started a newer turn, or ended, since it was
+    queued. Work that was already admitted runs to completion.
+  * overflow: the queue is full and the work has the lowest priority
+    (a full queue evicts lower-priority waiters to admit higher-priority
+    work)
+
+``run`` executes the work in the calling thread once admitted, so
+Streamlit calls inside it keep working. Shed work raises ``WorkShed``.
+Per-stage queue depth, slot use, shed counts and wait percentiles are
+kept for the sidebar.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+INTERACTIVE = 0
+SUMMARY = 1
+PERIODIC = 2
+NOTIFY = 3
+
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', SUMMARY: 'summary', PERIODIC: 'periodic', NOTIFY: 'notify'}
+
+# Longest time work of each priority may wait for a slot, in seconds
+DEFAULT_DEADLINES = {INTERACTIVE: 15.0, SUMMARY: 60.0, PERIODIC: 120.0, NOTIFY: 300.0}
+
+STAGE_CONCURRENCY = {
+    'llm': int(os.getenv("SCHEDULER_LLM_CONCURRENCY", "4")),
+    'tts': int(os.getenv("SCHEDULER_TTS_CONCURRENCY", "4")),
+    'notify': int(os.getenv("SCHEDULER_NOTIFY_CONCURRENCY", "2")),
+}
+
+# Waiters per stage beyond which work is shed
+MAX_QUEUE_DEPTH = int(os.getenv("SCHEDULER_MAX_QUEUE_DEPTH", "32"))
+
+# Wait times kept per stage for percentiles
+_WAIT_SAMPLES = 512
+
+# Sessions whose current turn is remembered; the least recently active are forgotten beyond this
+MAX_TRACKED_SESSIONS = 4096
+
+
+class WorkShed(RuntimeError):
+    """Raised when queued work is dropped instead of run"""
+
+    def __init__(self, stage, reason):
+        super().__init__(f"{stage} request dropped ({reason}); the service is busy")
+        self.stage = stage
+        self.reason = reason
+
+
+class _Ticket:
+    """One piece of work waiting for a slot"""
+
+    __slots__ = ('priority', 'seq', 'deadline', 'session_id', 'generation', 'shed')
+
+    def __init__(self, priority, seq, deadline, session_id, generation):
+        self.priority = priority
+        self.seq = seq
+        self.deadline = deadline
+        self.session_id = session_id
+        self.generation = generation
+        self.shed = None
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _Stage:
+    """Concurrency slots and a priority queue of waiters for one stage"""
+
+    def __init__(self, name, concurrency, max_queue):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.running = 0
+        self.waiting = []
+        self.cond = threading.Condition()
+        self.stats = {'admitted': 0, 'completed': 0, 'max_depth': 0,
+                      'shed_deadline': 0, 'shed_stale': 0, 'shed_overflow': 0}
+        self.waits = deque(maxlen=_WAIT_SAMPLES)
+
+    def _shed(self, ticket, reason):
+        ticket.shed = reason
+        self.stats[f'shed_{reason}'] += 1
+
+    def _prune(self, is_stale):
+        """Drop expired and stale waiters; call with the condition held"""
+        now = time.monotonic()
+        kept = []
+        for ticket in self.waiting:
+            if ticket.deadline is not None and ticket.deadline <= now:
+                self._shed(ticket, 'deadline')
+            elif is_stale(ticket):
+                self._shed(ticket, 'stale')
+            else:
+                kept.append(ticket)
+        if len(kept) != len(self.waiting):
+            heapq.heapify(kept)
+            self.waiting = kept
+            self.cond.notify_all()
+
+    def acquire(self, ticket, is_stale):
+        with self.cond:
+            if self.running < self.concurrency and not self.waiting:
+                self.running += 1
+                self.stats['admitted'] += 1
+                self.waits.append(0.0)
+                return
+
+            self._prune(is_stale)
+            if len(self.waiting) >= self.max_queue:
+                worst = max(self.waiting)
+                if ticket < worst:
+                    self.waiting.remove(worst)
+                    heapq.heapify(self.waiting)
+                    self._shed(worst, 'overflow')
+                    self.cond.notify_all()
+                else:
+                    self.stats['shed_overflow'] += 1
+                    raise WorkShed(self.name, 'overflow')
+
+            queued_at = time.monotonic()
+            heapq.heappush(self.waiting, ticket)
+            self.stats['max_depth'] = max(self.stats['max_depth'], len(self.waiting))
+            while True:
+                if ticket.shed:
+                    raise WorkShed(self.name, ticket.shed)
+                if self.waiting[0] is ticket and self.running < self.concurrency:
+                    heapq.heappop(self.waiting)
+                    self.running += 1
+                    self.stats['admitted'] += 1
+                    self.waits.append(time.monotonic() - queued_at)
+                    # Another slot may still be free for the next waiter
+                    self.cond.notify_all()
+                    return
+                timeout = None if ticket.deadline is None else max(0.0, ticket.deadline - time.monotonic())
+                self.cond.wait(timeout)
+                self._prune(is_stale)
+
+    def end_session(self, session_id):
+        """Shed the waiters of an ended session"""
+        with self.cond:
+            self._prune(lambda ticket: ticket.session_id == session_id and ticket.generation is not None)
+
+    def release(self):
+        with self.cond:
+            self.running -= 1
+            self.stats['completed'] += 1
+            self.cond.notify_all()
+
+    def snapshot(self):
+        with self.cond:
+            waits = sorted(self.waits)
+            snapshot = dict(self.stats, depth=len(self.waiting), running=self.running,
+                            concurrency=self.concurrency)
+        snapshot['wait_p50'] = waits[len(waits) // 2] if waits else 0.0
+        snapshot['wait_p99'] = waits[min(len(waits) - 1, int(len(waits) * 0.99))] if waits else 0.0
+        return snapshot
+
+
+class TurnScheduler:
+    """Priority admission with load shedding for each stage"""
+
+    def __init__(self, concurrency=STAGE_CONCURRENCY, max_queue=MAX_QUEUE_DEPTH, deadlines=DEFAULT_DEADLINES):
+        self.stages = {name: _Stage(name, slots, max_queue) for name, slots in concurrency.items()}
+        self.deadlines = dict(deadlines)
+        self._generations = OrderedDict()
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        # Shared by all sessions, so a forgotten session never reuses an older generation
+        self._generation_seq = itertools.count(1)
+
+    def new_generation(self, session_id):
+        """Start a new turn for ``session_id``; queued work from earlier turns becomes stale"""
+        with self._lock:
+            generation = next(self._generation_seq)
+            self._generations.pop(session_id, None)
+            self._generations[session_id] = generation
+            while len(self._generations) > MAX_TRACKED_SESSIONS:
+                self._generations.popitem(last=False)
+        for stage in self.stages.values():
+            with stage.cond:
+                stage.cond.notify_all()
+        return generation
+
+    def end_session(self, session_id):
+        """Forget ``session_id`` and shed its queued work; work already running finishes"""
+        with self._lock:
+            self._generations.pop(session_id, None)
+        for stage in self.stages.values():
+            stage.end_session(session_id)
+
+    def current_generation(self, session_id):
+        with self._lock:
+            return self._generations.get(session_id, 0)
+
+    def _is_stale(self, ticket):
+        return ticket.generation is not None and ticket.generation < self.current_generation(ticket.session_id)
+
+    def run(self, stage, work, priority=INTERACTIVE, deadline=None, session_id=None, generation=None):
+        """Run ``work()`` once a slot in ``stage`` is free and return its result
+
+        ``deadline`` is the longest wait in seconds (default per priority).
+        Pass the ``generation`` from ``new_generation`` to have the work
+        dropped while it waits if the session moves on to a newer turn.
+        Raises ``WorkShed`` if the work is dropped before it runs; once
+        admitted, its result is returned even if the turn went stale.
+        """
+        wait = self.deadlines.get(priority) if deadline is None else deadline
+        ticket = _Ticket(
+            priority, next(self._seq), None if wait is None else time.monotonic() + wait, session_id, generation
+        )
+        target = self.stages[stage]
+        target.acquire(ticket, self._is_stale)
+        try:
+            return work()
+        finally:
+            target.release()
+
+    def snapshot(self):
+        """Per-stage metrics: depth, running slots, shed counts and wait percentiles"""
+        return {name: stage.snapshot() for name, stage in self.stages.items()}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler shared by all sessions"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TurnScheduler()
+        return _scheduler
@@ -0,0 +1,247 @@
+"""Watsonx text generation client.
+
+Builds the Llama 3 chat prompt, calls the watsonx.ai text generation API
+with a named generation profile, cleans the template tags out of the
+output and, for speech profiles, trims it to whole sentences. Token counts
+and generation time are recorded per profile so caps can be tuned, and per
+model so ``model_router`` can report spend per tier. Calls go through the
+shared rate limiter and response cache in ``coordination``, over the
+pooled connections of ``http_pool``. The IAM token and the summary
+prompt live here too, so jobs outside the Streamlit app can use them.
+"""
+import os
+import re
+import threading
+import time
+
+from coordination import RESPONSE_CACHE_TTL, cache_key, get_coordinator
+from http_pool import IAM_TOKEN_URL, get_http_session
+from language_registry import LANGUAGE_NAMES_EN
+from response_cleaner import clean_ai_response
+from turn_profiler import stage as profile_stage
+
+WATSONX_URL = os.getenv("WATSONX_URL", "https://us-south.ml.cloud.ibm.com/ml/v1/text/generation?version=2023-05-29")
+MODEL_ID = "meta-llama/llama-3-3-70b-instruct"
+
+# Generation profiles: API parameters plus how the output is trimmed for speech.
+# max_sentences=None keeps the full (cleaned) text.
+GENERATION_PROFILES = {
+    'voice-short': {
+        'parameters': {
+            "decoding_method": "greedy",
+            "max_new_tokens": 300,
+            "min_new_tokens": 0,
+            "stop_sequences": ["<|eot_id|>"],
+            "repetition_penalty": 1.05
+        },
+        'max_sentences': 4
+    },
+    'summary': {
+        'parameters': {
+            "decoding_method": "greedy",
+            "max_new_tokens": 400,
+            "min_new_tokens": 0,
+            "stop_sequences": ["<|eot_id|>"],
+            "repetition_penalty": 1
+        },
+        'max_sentences': None
+    },
+    'detailed': {
+        'parameters': {
+            "decoding_method": "greedy",
+            "max_new_tokens": 1500,
+            "min_new_tokens": 0,
+            "stop_sequences": ["<|eot_id|>"],
+            "repetition_penalty": 1.05
+        },
+        'max_sentences': None
+    },
+}
+
+# Profile used for spoken replies; override with VOICE_GENERATION_PROFILE
+VOICE_PROFILE = os.getenv("VOICE_GENERATION_PROFILE", "voice-short")
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?।॥])\s+')
+
+_stats_lock = threading.Lock()
+_generation_stats = {}
+_model_stats = {}
+
+
+def truncate_at_sentence(text, max_sentences=None, drop_partial=False):
+    """Keep at most ``max_sentences`` whole sentences of ``text``
+
+    With ``drop_partial`` (used when generation hit the token cap) a trailing
+    sentence without terminal punctuation is dropped as well, so speech never
+    stops mid-sentence.
+    """
+    sentences = [s for s in _SENTENCE_BOUNDARY.split(text.strip()) if s]
+    if drop_partial and len(sentences) > 1 and not re.search(r'[.!?।॥]["\')]*$', sentences[-1]):
+        sentences = sentences[:-1]
+    if max_sentences is not None:
+        sentences = sentences[:max_sentences]
+    return " ".join(sentences)
+
+
+def record_generation(profile, input_tokens, generated_tokens, seconds, stop_reason, model_id=MODEL_ID):
+    """Accumulate token counts and generation time for a profile and for the model used"""
+    with _stats_lock:
+        for table, key in ((_generation_stats, profile), (_model_stats, model_id)):
+            stats = table.setdefault(key, {
+                'calls': 0, 'input_tokens': 0, 'generated_tokens': 0, 'seconds': 0.0, 'max_tokens_stops': 0
+            })
+            stats['calls'] += 1
+            stats['input_tokens'] += input_tokens
+            stats['generated_tokens'] += generated_tokens
+            stats['seconds'] += seconds
+            if stop_reason == 'max_tokens':
+                stats['max_tokens_stops'] += 1
+
+
+def get_generation_stats():
+    """Return per-profile totals and averages for tokens and generation time"""
+    with _stats_lock:
+        report = {}
+        for profile, stats in _generation_stats.items():
+            calls = stats['calls'] or 1
+            report[profile] = dict(
+                stats,
+                avg_input_tokens=stats['input_tokens'] / calls,
+                avg_generated_tokens=stats['generated_tokens'] / calls,
+                avg_seconds=stats['seconds'] / calls
+            )
+        return report
+
+
+def get_model_stats():
+    """Return per-model totals for tokens and generation time"""
+    with _stats_lock:
+        return {model_id: dict(stats) for model_id, stats in _model_stats.items()}
+
+
+def get_bearer_token(api_key):
+    """Get bearer token for Watsonx API authentication, shared by all workers"""
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    data = f"apikey={api_key}&grant_type=urn:ibm:params:oauth:grant-type:apikey"
+    coordinator = get_coordinator()
+
+    def fetch():
+        coordinator.acquire("iam")
+        response = get_http_session().post(IAM_TOKEN_URL, headers=headers, data=data)
+        if response.status_code == 200:
+            token_data = response.json()
+            return token_data["access_token"], token_data.get("expires_in")
+        # Raised rather than shown: the token is also fetched off the script thread (warm-up, batch jobs)
+        raise RuntimeError(f"Failed to retrieve access token: {response.text}")
+
+    # Keyed by a hash of the API key so the key itself never reaches the shared backend
+    return coordinator.shared_token(f"iam:{cache_key(api_key)}", fetch)
+
+
+def build_prompt(history, user_input, detected_lang='en', memory=None):
+    """Build the Llama 3 chat prompt for a conversation
+
+    ``memory`` is the rendered conversation memory (summary of earlier turns
+    and key details); it is sent as a system message ahead of ``history``.
+    """
+    # Add language context to the conversation
+    language_context = ""
+    if detected_lang != 'en':
+        lang_name = LANGUAGE_NAMES_EN.get(detected_lang, 'regional language')
+        language_context = f"The user is speaking in {lang_name}. Please respond appropriately and consider the cultural context. If needed, you can respond in English or the same language as appropriate."
+
+    # Construct the conversation history
+    conversation = ""
+    if memory:
+        conversation += f"<|start_header_id|>system<|end_header_id|>\n\n{memory}<|eot_id|>\n"
+    if language_context:
+        conversation += f"<|start_header_id|>system<|end_header_id|>\n\n{language_context}<|eot_id|>\n"
+    
+    conversation += "".join(
+        f"<|start_header_id|>{role}<|end_header_id|>\n\n{text}<|eot_id|>\n" 
+        for role, text in history
+    )
+    
+    conversation += f"<|start_header_id|>user<|end_header_id|>\n\n{user_input}<|eot_id|>\n"
+    return conversation
+
+
+def build_summary_prompt(conversation_history, previous_summary=None):
+    """Prompt that summarizes (role, text) turns, or folds them into ``previous_summary``"""
+    conversation_text = "\n".join([f"{role}: {text}" for role, text in conversation_history])
+    if previous_summary:
+        return f"""Here is a summary of a conversation so far:
+
+{previous_summary}
+
+Update the summary with the following new turns. Keep every name, number, date and commitment that is still relevant, and keep it concise:
+
+{conversation_text}
+
+Updated summary:"""
+    return f"""Please provide a concise summary of the following conversation:
+
+{conversation_text}
+
+Summary:"""
+
+
+def get_watsonx_response(history, user_input, bearer_token, detected_lang='en', profile=None, memory=None,
+                         model_id=None):
+    """Get response from Watsonx API using a generation profile (default: the voice profile)"""
+    profile = profile or VOICE_PROFILE
+    model_id = model_id or MODEL_ID
+    settings = GENERATION_PROFILES[profile]
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "Authorization": f"Bearer {bearer_token}"
+    }
+
+    payload = {
+        "input": build_prompt(history, user_input, detected_lang, memory),
+        "parameters": settings['parameters'],
+        "model_id": model_id,
+        "project_id": os.getenv("PROJECT_ID")
+    }
+
+    # Greedy decoding is deterministic, so identical prompts can share a cached reply across workers
+    coordinator = get_coordinator()
+    response_key = cache_key(model_id, profile, payload["input"], settings['parameters'])
+    cached = coordinator.cache_get("response", response_key)
+    if cached is not None:
+        return cached.decode('utf-8')
+
+    if not coordinator.acquire("watsonx"):
+        return "Error: Watsonx.ai is busy. Please try again in a moment."
+
+    start = time.perf_counter()
+    response = get_http_session().post(WATSONX_URL, headers=headers, json=payload)
+    elapsed = time.perf_counter() - start
+
+    if response.status_code == 200:
+        response_data = response.json()
+        if "results" in response_data and response_data["results"]:
+            result = response_data["results"][0]
+            record_generation(
+                profile,
+                result.get("input_token_count", 0),
+                result.get("generated_token_count", 0),
+                elapsed,
+                result.get("stop_reason"),
+                model_id
+            )
+            with profile_stage("clean"):
+                cleaned = clean_ai_response(result["generated_text"])
+                if settings['max_sentences'] is not None or result.get("stop_reason") == "max_tokens":
+                    cleaned = truncate_at_sentence(
+                        cleaned,
+                        settings['max_sentences'],
+                        drop_partial=result.get("stop_reason") == "max_tokens"
+                    )
+            coordinator.cache_set("response", response_key, cleaned.encode('utf-8'), RESPONSE_CACHE_TTL)
+            return cleaned
+        else:
+            return "Error: 'generated_text' not found in the response."
+    else:
+        return f"Error: Failed to fetch response from Watsonx.ai. Status code: {response.status_code}"